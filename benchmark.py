@@ -0,0 +1,205 @@
+import argparse
+import json
+import pickle
+import sys
+import timeit
+from datetime import date, timedelta
+import dltl     # Custom module
+
+SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+MEMBERS = range(1, 30)      # The frequency codes of the named frequencies, see functions.py
+
+
+def _fill(target, size):
+    """Fills the DLTL (or the DLTLGroup) with 'size' tasks. Sleepers are given increasing wake-up dates, so that they
+    can be appended directly (add_sleeper walks the list, which would make building a large list quadratic)."""
+    start = date(2020, 1, 1)
+    for i in range(size):
+        node = dltl.TaskNode(f'task {i}', MEMBERS[i % len(MEMBERS)], task_id=i, until=start + timedelta(i // 100))
+        target.append_node(node)
+    return target
+
+
+def _dltl_cases(size):
+    """Yields (name, function) pairs of the operations on a regular DLTL. Every function leaves the list as it
+    found it, so that it can be called repeatedly."""
+    tasks = _fill(dltl.DLTL(), size)
+    middle = size // 2
+    name = f'task {middle}'
+    node = tasks.fetch_node(middle)
+    spare = dltl.TaskNode("spare")
+
+    def append_detach():
+        tasks.append_node(spare)
+        tasks.detach_node(spare)
+
+    def insert_detach():
+        tasks.insert_node(spare, middle)
+        tasks.detach_node(spare)
+
+    def rename():
+        tasks.rename_node(node, "renamed")
+        tasks.rename_node(node, name)
+
+    def sort():
+        tasks.sort_by(lambda task: task.name)
+        tasks.sort_by(lambda task: task.id)     # Back to the original order
+
+    yield "fetch_node", lambda: tasks.fetch_node(middle)
+    yield "fetch_nodes_named", lambda: tasks.fetch_nodes_named(name)
+    yield "fetch_node_at_position", lambda: tasks.fetch_node_at_position(middle)
+    yield "append_node", append_detach
+    yield "insert_node", insert_detach
+    yield "move_node", lambda: tasks.move_node(node, middle)
+    yield "rename_node", rename
+    yield "sort_by", sort
+    yield "pickle", lambda: pickle.loads(pickle.dumps(tasks))
+
+
+def _sleeper_cases(size):
+    sleepers = _fill(dltl.SleeperDLTL(), size)
+    spare = dltl.TaskNode("spare")
+    middle_date = sleepers.fetch_node_at_position(size // 2).until
+
+    def add_detach():
+        spare.until = middle_date
+        sleepers.add_sleeper(spare)
+        sleepers.detach_node(spare)
+
+    def wake_up_and_add():
+        until = sleepers.head.until
+        waker = sleepers.wake_up_head()
+        waker.until = until
+        sleepers.add_sleeper(waker)     # Goes back to the start, without walking the list
+
+    yield "add_sleeper", add_detach
+    yield "wake_up_head", wake_up_and_add
+    yield "detach_all_frequency", lambda: sleepers.detach_all_frequency(-1)     # No such tasks, walks the whole list
+
+
+def _interval_cases(size):
+    intervals = dltl.IntervalDLTL()
+    _fill(intervals, size)
+    for node in intervals.glossary.values():
+        intervals.schedule(node, node.until)
+    node = intervals.fetch_node_at_position(size // 2)
+    yield "schedule", lambda: intervals.schedule(node, node.fires)
+    yield "pop_fired", lambda: intervals.pop_fired(date(2019, 1, 1))       # Nothing fires, only peeks at the top
+
+
+def _group_cases(size):
+    group = _fill(dltl.DLTLGroup(), size)
+    middle = size // 2
+    node = group.fetch_node(middle)
+    spare = dltl.TaskNode("spare", MEMBERS[0])
+
+    def append_detach():
+        group.append_node(spare)
+        group.detach_node(spare)
+
+    def change_frequency():
+        frequency = node.frequency
+        group.change_frequency(node, MEMBERS[-1] if frequency != MEMBERS[-1] else MEMBERS[0])
+        group.change_frequency(node, frequency)
+
+    yield "fetch_node", lambda: group.fetch_node(node.id)
+    yield "fetch_node_at_position", lambda: group.fetch_node_at_position(middle)
+    yield "count_to_member", lambda: group.count_to_member(middle)
+    yield "append_node", append_detach
+    yield "change_frequency", change_frequency
+    yield "pickle", lambda: pickle.loads(pickle.dumps(group))
+
+
+def _member_cases(size):
+    group = _fill(dltl.DLTLGroup(), size)
+    member = group.members[MEMBERS[len(MEMBERS) // 2]]
+    middle = member.size // 2 + 1
+    task_id = member.fetch_node_at_position(middle).id
+    spare = dltl.TaskNode("spare", MEMBERS[len(MEMBERS) // 2])
+
+    def append_detach():
+        member.append_node(spare)
+        member.detach_node(spare)
+
+    yield "fetch_node", lambda: member.fetch_node(task_id)
+    yield "fetch_node_at_position", lambda: member.fetch_node_at_position(middle)
+    yield "append_node", append_detach
+
+
+SUITES = {"DLTL": _dltl_cases, "SleeperDLTL": _sleeper_cases, "IntervalDLTL": _interval_cases,
+          "DLTLGroup": _group_cases, "MemberDLTL": _member_cases}
+
+
+def run(sizes, repeat, only=None):
+    """Runs the benchmarks, returning {"Class.operation": {size: seconds per call}}. Each time is the best of
+    'repeat' runs, each run calling the operation as many times as fits into about 0.2 seconds."""
+    results = {}
+    for size in sizes:
+        for suite, cases in SUITES.items():
+            for operation, function in cases(size):
+                key = f'{suite}.{operation}'
+                if only is not None and not any(part in key for part in only):
+                    continue
+                timer = timeit.Timer(function)
+                number, _ = timer.autorange()
+                seconds = min(timer.repeat(repeat, number)) / number
+                results.setdefault(key, {})[str(size)] = seconds
+                print(f'{key:<36}{size:>9}{seconds * 1e6:>14.2f} us')
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the (key, size, seconds, baseline seconds) of the results slower than the baseline by more than the
+    tolerance (a fraction, e.g. 0.25 for 25 %)."""
+    regressions = []
+    for key, timings in results.items():
+        for size, seconds in timings.items():
+            previous = baseline.get(key, {}).get(size)
+            if previous is not None and seconds > previous * (1 + tolerance):
+                regressions.append((key, size, seconds, previous))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the dltl data structures. Compares the results "
+                                                 "with a saved baseline and fails if any operation got slower.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="The list sizes to benchmark at. "
+                                                                            "(Default = 10^2 to 10^6)")
+    parser.add_argument("--only", nargs="+", help="Runs only the benchmarks containing any of the given texts, "
+                                                  "e.g. 'SleeperDLTL' or 'fetch_node_at_position'.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of runs to take the best of. (Default = 5)")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="The JSON file with the baseline "
+                                                                              "results.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="How much slower than the baseline (as a "
+                                                                      "fraction) a result may be. (Default = 0.25)")
+    parser.add_argument("--save", action="store_true", help="Saves the results as the new baseline instead of "
+                                                            "comparing them with it.")
+    namespace = parser.parse_args(argv)
+
+    results = run(namespace.sizes, namespace.repeat, namespace.only)
+    print()
+    if namespace.save:
+        with open(namespace.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2, sort_keys=True)
+        print(f'Baseline saved into {namespace.baseline}.')
+        return 0
+
+    try:
+        with open(namespace.baseline) as f:
+            baseline = json.load(f)["results"]
+    except FileNotFoundError:
+        print(f'No baseline found in {namespace.baseline}. Run with --save to create one.')
+        return 0
+
+    regressions = compare(results, baseline, namespace.tolerance)
+    for key, size, seconds, previous in regressions:
+        print(f'Regression: {key} at {size} tasks took {seconds * 1e6:.2f} us, the baseline is {previous * 1e6:.2f} us '
+              f'(+{(seconds / previous - 1) * 100:.0f} %).')
+    if regressions:
+        return 1
+    print(f'No regressions beyond {namespace.tolerance * 100:.0f} % of the baseline.')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
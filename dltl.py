@@ -1,41 +1,205 @@
 from datetime import date
+from bisect import bisect_left, insort
+from heapq import heapify, heappop, heappush
+from itertools import islice
+from sys import getsizeof
+
+tracing = False     # Whether the traversals below are counted, off by default as the counting costs a little
+traces = {}         # operation: [calls, node hops, list sizes, glossary hits, glossary misses], summed up
+
+
+def trace(operation, hops=0, size=0, hits=0, misses=0):
+    """Adds the counts of a single call of the operation to the traces. Only called while tracing is enabled."""
+    counts = traces.get(operation)
+    if counts is None:
+        counts = traces[operation] = [0, 0, 0, 0, 0]
+    counts[0] += 1
+    counts[1] += hops
+    counts[2] += size
+    counts[3] += hits
+    counts[4] += misses
+
+
+def trace_summary():
+    """Returns {operation: (calls, node hops per call, list size per call, glossary hits, glossary misses)} of the
+    traced operations. An operation is named by the class and the method, e.g. 'SleeperDLTL.add_sleeper'."""
+    return {operation: (calls, hops / calls, size / calls, hits, misses)
+            for operation, (calls, hops, size, hits, misses) in sorted(traces.items())}
+
+
+def reset_traces():
+    traces.clear()
+
+
+def _measure_nodes(members, usage):
+    """A helper function. Adds the bytes taken up by the nodes of the given DLTLs to the usage ([nodes, strings,
+    glossaries, other]), walking each of them once. The attribute dictionary of a node is estimated from a sample
+    node, as looking at the node's own one would make Python create it."""
+    attributes = getsizeof(dict(vars(TaskNode(""))))
+    for member in members:
+        usage[3] += getsizeof(member)
+        current = member.head
+        while current is not None:
+            usage[0] += getsizeof(current) + attributes
+            usage[1] += getsizeof(current.name)
+            if current.until is not None:
+                usage[3] += getsizeof(current.until)
+            if current.tags:
+                usage[3] += getsizeof(current.tags)     # Shared by both copies of the task, counted with each
+            current = current.next
+    return usage
 
 
 class TaskNode:
     """A node of a doubly linked list."""
 
-    def __init__(self, name, frequency="once", description="", status="due", until=None):
+    id = None               # Class level so that nodes pickled before task IDs existed have it too
+    tags = frozenset()      # Class level so that nodes pickled before tags existed have it too
+    every = None            # For tasks in an IntervalDLTL, the number of days between their triggers
+    fires = None            # and the date they trigger on next
+
+    def __init__(self, name, frequency="once", status="due", until=None, task_id=None, tags=frozenset()):
+        self.id = task_id       # Shared by both copies of the task
+        self.tags = tags        # Immutable, so both copies can share it
         self.name = name
         self.frequency = frequency
-        self.description = description
         self.status = status
         self.until = until
         self.prev = None
         self.next = None
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["prev"], state["next"]     # Pickling the links would recurse through the whole list
+        return state
+
+    def __setstate__(self, state):
+        self.prev = self.next = None    # Relinked by the list, see DLTL.__setstate__()
+        self.__dict__.update(state)     # Nodes pickled with their links keep them
+
+
+class PrefixIndex:
+    """A sorted index of task names, the secondary index of a glossary (which is keyed by task IDs). Finds tasks by
+    their name or by the start of it; names need not be unique, so every entry is a (name, task ID) pair. Lookups
+    are a binary search followed by a walk over the matching entries only."""
+
+    def __init__(self, nodes=()):
+        self.entries = sorted((node.name, node.id) for node in nodes)
+
+    def add(self, name, task_id):
+        insort(self.entries, (name, task_id))
+
+    def remove(self, name, task_id):
+        i = bisect_left(self.entries, (name, task_id))
+        if i < len(self.entries) and self.entries[i] == (name, task_id):
+            del self.entries[i]
+
+    def fetch_named(self, name):
+        """Returns the IDs of the tasks with the given name."""
+        entries = self.entries
+        i = bisect_left(entries, (name,))
+        result = []
+        while i < len(entries) and entries[i][0] == name:
+            result.append(entries[i][1])
+            i += 1
+        return result
+
+    def fetch_with_prefix(self, prefix, limit=None):
+        """Returns the (name, task ID) pairs of the names starting with the given prefix in alphabetical order (at
+        most 'limit' of them)."""
+        entries = self.entries
+        i = bisect_left(entries, (prefix,))
+        end = len(entries) if limit is None else min(len(entries), i + limit)
+        result = []
+        while i < end and entries[i][0].startswith(prefix):
+            result.append(entries[i])
+            i += 1
+        return result
+
+    def count_with_prefix(self, prefix):
+        """Returns the number of names starting with the given prefix, without visiting them."""
+        if prefix == "":
+            return len(self.entries)
+        end = prefix[:-1] + chr(ord(prefix[-1]) + 1)    # The first string past all the ones starting with prefix
+        return bisect_left(self.entries, (end,)) - bisect_left(self.entries, (prefix,))
+
 
 class DLTL:
     """A doubly linked task list."""
 
+    version = 0     # Increased on every change, see DisplayedView. Class level so that older pickles have it too.
+    _prefix_index = None
+
     def __init__(self):
         self.head = None
         self.tail = None
         self.glossary = {}
         self.size = 0
 
+    def __getstate__(self):
+        """The nodes are stored as a flat list (and linked back together when loading), so that long lists do not hit
+        the recursion limit of pickle."""
+        state = self.__dict__.copy()
+        state.pop("_prefix_index", None)     # Cheaper to rebuild than to store
+        state.pop("glossary", None)
+        del state["head"], state["tail"]
+        state["nodes"] = nodes = []
+        current = self.head
+        while current is not None:
+            nodes.append(current)
+            current = current.next
+        return state
+
+    def __setstate__(self, state):
+        nodes = state.pop("nodes", None)
+        self.__dict__.update(state)
+        if nodes is None:   # Pickled before the nodes were stored as a list
+            return None
+        self.head, self.tail = self._link(nodes)
+        if not isinstance(self, MemberDLTL):
+            self.glossary = {node.id: node for node in nodes}
+
+    @property
+    def prefix_index(self):
+        """The PrefixIndex of the names in the glossary. Built on first use, then kept up to date."""
+        if self._prefix_index is None:
+            self._prefix_index = PrefixIndex(self.glossary.values())
+        return self._prefix_index
+
+    def rebuild_glossary(self):
+        """Rebuilds the glossary from the nodes, keyed by their IDs (for lists saved when it was keyed by names)."""
+        self.glossary = {}
+        self._prefix_index = None
+        current = self.head
+        while current is not None:
+            self.glossary[current.id] = current
+            current = current.next
+
     def _add_node_to_glossary(self, node):
-        """A helper function. For regular DLTLs, it adds the key:node pair their own glossary."""
-        self.glossary[node.name] = node
+        """A helper function. For regular DLTLs, it adds the task ID:node pair their own glossary."""
+        self.glossary[node.id] = node
         self.size += 1
+        self.version += 1
+        if self._prefix_index is not None:
+            self._prefix_index.add(node.name, node.id)
 
     def _remove_node_from_glossary(self, node):
-        """A helper function. For regular DLTLs, it removes the key:node from their own glossary."""
-        del self.glossary[node.name]
+        """A helper function. For regular DLTLs, it removes the task ID:node from their own glossary."""
+        del self.glossary[node.id]
         self.size -= 1
-
-    def fetch_node(self, name):
-        """A helper function. For regular DLTLs, it fetches the node by its name from the DLTL's own glossary."""
-        node = self.glossary.get(name)
+        self.version += 1
+        if self._prefix_index is not None:
+            self._prefix_index.remove(node.name, node.id)
+
+    def fetch_nodes_named(self, name):
+        """Returns the nodes of the tasks with the given name (names need not be unique)."""
+        return [self.fetch_node(task_id) for task_id in self.prefix_index.fetch_named(name)]
+
+    def fetch_node(self, task_id):
+        """A helper function. For regular DLTLs, it fetches the node by its task ID from the DLTL's own glossary."""
+        node = self.glossary.get(task_id)
+        if tracing:
+            trace(f'{type(self).__name__}.fetch_node', hits=node is not None, misses=node is None)
         if node is None:
             print("Error: Task not found.")     # Potentially want an error instead.
         return node
@@ -57,19 +221,18 @@ class DLTL:
             self.head = node.next
         else:
             node.prev.next = node.next
-            node.prev = None
 
         if node.next is None:      # The node is the tail
             self.tail = node.prev
         else:
             node.next.prev = node.prev
-            node.next = None
+        node.prev = node.next = None
 
         self._remove_node_from_glossary(node)
 
-    def detach_node_by_name(self, name):
-        """Detaches a node from the DLTL group by its name."""
-        node = self.fetch_node(name)
+    def detach_node_by_id(self, task_id):
+        """Detaches a node from the DLTL by its task ID."""
+        node = self.fetch_node(task_id)
         if node is None:
             return None
         self.detach_node(node)
@@ -80,6 +243,8 @@ class DLTL:
         if position < 1 or position > (size := self.size):
             print("Error: Invalid position.")
             return None
+        if tracing:
+            trace(f'{type(self).__name__}.fetch_node_at_position', min(size - position, position - 1), size)
         if position > size // 2:  # Closer to the end
             current = self.tail
             for _ in range(size - position):
@@ -151,58 +316,149 @@ class DLTL:
         self._add_node_to_glossary(node)
 
     @staticmethod
-    def change_description(node, new_description):
-        """Changes the description of the given task node."""
-        node.description = new_description
+    def _link(nodes):
+        """A helper function. Links the given nodes together in the given order, returning the first and the last."""
+        previous = None
+        for node in nodes:
+            node.prev = previous
+            if previous is not None:
+                previous.next = node
+            previous = node
+        if previous is not None:
+            previous.next = None
+        return (nodes[0] if nodes else None), previous
+
+    def _relink(self, nodes):
+        """A helper function. Relinks the DLTL so that it consists of the given nodes (all of its nodes) in the given
+        order, in a single pass."""
+        self.head, self.tail = self._link(nodes)
+        self.version += 1
+
+    def sort_by(self, key, reverse=False):
+        """Sorts the DLTL by the given key function in O(n log n). Tasks with equal keys keep their order."""
+        nodes = []
+        current = self.head
+        while current is not None:
+            nodes.append(current)
+            current = current.next
+        nodes.sort(key=key, reverse=reverse)
+        self._relink(nodes)
 
-    @staticmethod
-    def change_status(node, new_status):
+    def reorder(self, positions):
+        """Moves the tasks at the given (distinct) positions to the start of the DLTL, in the given order. The other
+        tasks follow in their existing order. Returns None if a position is invalid."""
+        if len(set(positions)) != len(positions) or any(p < 1 or p > self.size for p in positions):
+            print("Error: Invalid position.")
+            return None
+        nodes = [None] * self.size
+        current = self.head
+        for i in range(self.size):
+            nodes[i] = current
+            current = current.next
+        moved = set(positions)
+        self._relink([nodes[p - 1] for p in positions] + [node for i, node in enumerate(nodes, 1) if i not in moved])
+        return True
+
+    def memory_usage(self):
+        """Returns the bytes taken up by the DLTL as [nodes, strings (the names), glossaries (with the prefix index),
+        other (the list itself, dates, tags, the heap of an IntervalDLTL)], in a single pass over the nodes."""
+        usage = [0, 0, getsizeof(self.glossary), getsizeof(getattr(self, "heap", ()))]
+        if self._prefix_index is not None:
+            usage[2] += getsizeof(self._prefix_index.entries)
+        return _measure_nodes([self], usage)
+
+    def change_status(self, node, new_status):
         """Changes the status of the given task node."""
         node.status = new_status
+        self.version += 1       # Changes the positions in the lists displayed conditionally
 
-    def display_task_names(self):
-        """Displays the names of all tasks as a numbered list and returns
-        a list of pointers to the numbered tasks."""
+    @staticmethod
+    def _describe(node):
+        """A helper function. Returns the text displayed for the given task node."""
+        return node.name
 
+    def __iter__(self):
+        """Yields the task nodes from the head to the tail."""
         current = self.head
-        result = [None]*self.size
-        for i in range(self.size):
-            print(f'{i+1})   {current.name}')
-            result[i] = current
-            i += 1
+        while current is not None:
+            yield current
             current = current.next
-        return result
 
-    def display_task_names_conditional(self, status):
-        """Displays the names of tasks of the given status as a numbered list and returns
-        a list of pointers to the numbered tasks."""
+    def __reversed__(self):
+        """Yields the task nodes from the tail to the head."""
+        current = self.tail
+        while current is not None:
+            yield current
+            current = current.prev
+
+    def iter_filtered(self, status=None, condition=None):
+        """Yields the task nodes of the given status (of any status if None) for which condition(node) is true (if
+        given), from the head to the tail."""
         current = self.head
-        result = []
-        i = 1
-        for _ in range(self.size):
-            if current.status == status:
-                print(f'{i})   {current.name}')
-                result.append(current)
-                i += 1
+        hops = 0
+        try:
+            while current is not None:
+                if (status is None or current.status == status) and (condition is None or condition(current)):
+                    yield current
+                current = current.next
+                hops += 1
+        finally:        # Also when the caller stops early
+            if tracing:
+                trace(f'{type(self).__name__}.iter_filtered', hops, self.size)
+
+    def iter_range(self, offset=0, limit=None):
+        """Yields the task nodes of a range of positions: skips the first 'offset' tasks and stops after 'limit'
+        tasks. The start of the range is reached from the closer end of the DLTL."""
+        end = self.size if limit is None else min(self.size, offset + limit)
+        if offset >= end:
+            return
+        if tracing:
+            trace(f'{type(self).__name__}.iter_range', end - offset - 1, self.size)
+        current = self.fetch_node_at_position(offset + 1)
+        for _ in range(offset, end):
+            yield current
             current = current.next
-        return result
 
-    def display_alongside_others(self, finished=False, initial_index=1):
+    def display_task_names(self, offset=0, limit=None, initial_index=1):
+        """Displays the names of all tasks as a numbered list (starting from a given index). Optionally displays only
+        a page of them, skipping the first 'offset' tasks and stopping after 'limit' tasks. Returns the number of
+        tasks up to the end of the displayed page."""
+        for i, node in enumerate(self.iter_range(offset, limit), initial_index + offset):
+            print(f'{i})   {self._describe(node)}')
+        return self.size if limit is None else min(self.size, offset + limit)
+
+    def display_task_names_conditional(self, status, offset=0, limit=None):
+        """Displays the names of tasks of the given status as a numbered list (optionally only a page of them,
+        see display_task_names). Returns the number of such tasks up to the end of the displayed page."""
+        i = 0
+        for i, node in enumerate(self.iter_filtered(status), 1):
+            if i > offset:
+                print(f'{i})   {self._describe(node)}')
+            if limit is not None and i >= offset + limit:
+                break
+        return i
+
+    def display_alongside_others(self, finished=False, initial_index=1, first=1, last=None, title=None):
         """Meant for displaying the contents of multiple DLTLs at once. Displays the names of all (optionally only
-        finished) tasks as a numbered list (starting from a given index) and returns the last displayed index + 1."""
-        current = self.head
+        finished) tasks as a numbered list (starting from a given index), but only those numbered from 'first' to
+        'last'. The optional title is displayed above the first displayed task. Returns the last counted index + 1,
+        which is past 'last' when the page got filled."""
         if finished:
-            for _ in range(self.size):
-                if current.status == "finished":
-                    print(f'{initial_index})   {current.name}')
-                    initial_index += 1
-                current = current.next
-        else:
-            for _ in range(self.size):
-                print(f'{initial_index})   {current.name}')
-                initial_index += 1
-                current = current.next
-        return initial_index
+            nodes, index = self.iter_filtered("finished"), initial_index
+        else:   # Without the filter, the tasks in front of the page can be skipped over
+            skipped = min(max(first - initial_index, 0), self.size)
+            nodes, index = self.iter_range(skipped), initial_index + skipped
+        for node in nodes:
+            if last is not None and index > last:
+                break
+            if index >= first:
+                if title is not None:
+                    print(title)
+                    print()
+                    title = None
+                print(f'{index})   {self._describe(node)}')
+            index += 1
+        return index
 
 
 class SleeperDLTL(DLTL):
@@ -213,8 +469,12 @@ class SleeperDLTL(DLTL):
         until = node.until
 
         successor = self.head
+        hops = 0
         while successor is not None and until > successor.until:
             successor = successor.next
+            hops += 1
+        if tracing:
+            trace("SleeperDLTL.add_sleeper", hops, self.size)
         if successor is None:       # The added task goes at the end
             if self.tail is None:   # The list is empty
                 self.head = self.tail = node
@@ -253,6 +513,8 @@ class SleeperDLTL(DLTL):
 
     def detach_all_frequency(self, frequency):
         """Removes all tasks of the given frequency from the SleeperDLTL."""
+        if tracing:
+            trace("SleeperDLTL.detach_all_frequency", self.size, self.size)
         current = self.head
         while current is not None:
             next_node = current.next
@@ -265,17 +527,65 @@ class SleeperDLTL(DLTL):
         """Changes the frequency of the given task node."""
         node.frequency = new_frequency
 
-    def display_task_names(self):
-        """Displays the names AND wake-up ('until') date of all tasks as a numbered list
-        and a list of pointers to the numbered tasks."""
+    def iter_waking(self, low=None, high=None):
+        """Yields the sleepers waking up from the date 'low' to the date 'high' (both included, either may be None
+        for no bound). As the sleepers are ordered by their wake-up dates, the walk stops at the first one past
+        'high'."""
         current = self.head
-        result = [None] * self.size
-        for i in range(self.size):
-            print(f'{i+1})   {current.name}   awakens in {(current.until-date.today()).days} days, on {current.until}.')
-            result[i] = current
-            i += 1
-            current = current.next
-        return result
+        hops = 0
+        try:
+            while current is not None and low is not None and current.until < low:
+                current = current.next
+                hops += 1
+            while current is not None and (high is None or current.until <= high):
+                yield current
+                current = current.next
+                hops += 1
+        finally:
+            if tracing:
+                trace("SleeperDLTL.iter_waking", hops, self.size)
+
+    @staticmethod
+    def _describe(node):
+        """A helper function. Sleeping tasks are displayed with their wake-up ('until') date."""
+        return f'{node.name}   awakens in {(node.until-date.today()).days} days, on {node.until}.'
+
+
+class IntervalDLTL(DLTL):
+    """A DLTL of tasks which trigger every given number of days, each on its own schedule. Alongside the list, it keeps
+    a heap of the tasks keyed by the date they trigger on next, so that only the triggered tasks are ever visited."""
+
+    def __init__(self):
+        super().__init__()
+        self.heap = []          # (trigger date, push counter, node), the counter only breaks ties
+        self.pushes = 0
+
+    def schedule(self, node, fires):
+        """Schedules the node (which has to be in the list) to trigger on the given date. Entries of nodes which have
+        been rescheduled or detached since are left in the heap and skipped once they reach the top."""
+        node.fires = fires
+        self.pushes += 1
+        heappush(self.heap, (fires, self.pushes, node))
+        if len(self.heap) > 2 * self.size + 16:     # Too many skipped entries, rebuild the heap from the list
+            self.heap = [(node.fires, i, node) for i, node in enumerate(self.glossary.values())
+                         if node.fires is not None]
+            self.pushes = len(self.heap)
+            heapify(self.heap)
+
+    def pop_fired(self, day):
+        """Returns the (trigger date, node) pairs of the nodes triggering on or before the given date, in the order of
+        their trigger dates, removing them from the heap. The caller is expected to schedule them again."""
+        fired = []
+        hops = 0
+        while self.heap and self.heap[0][0] <= day:
+            fires, _, node = heappop(self.heap)
+            if node.fires == fires and self.glossary.get(node.id) is node:
+                node.fires = None       # Any other entry of the node is now outdated
+                fired.append((fires, node))
+            hops += 1
+        if tracing:
+            trace("IntervalDLTL.pop_fired", hops, len(self.heap) + hops)     # Hops are the entries popped off the heap
+        return fired
 
 
 class MemberDLTL(DLTL):
@@ -288,57 +598,95 @@ class MemberDLTL(DLTL):
         self.size = 0
 
     def _add_node_to_glossary(self, node):
-        """A helper function. For member DLTLs, it adds the key:node pair to the parent's glossary."""
-        self.parent.glossary[node.name] = node
+        """A helper function. For member DLTLs, it adds the task ID:node pair to the parent's glossary."""
+        self.parent.glossary[node.id] = node
         self.parent.size += 1
+        self.parent.version += 1
         self.size += 1
+        self.version += 1
+        if self.parent._prefix_index is not None:
+            self.parent._prefix_index.add(node.name, node.id)
 
     def _remove_node_from_glossary(self, node):
-        """A helper function. For member DLTLs, it removes the key:node from the parent's glossary."""
-        del self.parent.glossary[node.name]
+        """A helper function. For member DLTLs, it removes the task ID:node from the parent's glossary."""
+        del self.parent.glossary[node.id]
         self.parent.size -= 1
+        self.parent.version += 1
         self.size -= 1
-
-    def fetch_node(self, name):
-        """A helper function. For member DLTLs, it fetches the node by its name from the parent's glossary."""
-        node = self.parent.glossary.get(name)
+        self.version += 1
+        if self.parent._prefix_index is not None:
+            self.parent._prefix_index.remove(node.name, node.id)
+
+    @property
+    def prefix_index(self):
+        """For member DLTLs, the PrefixIndex of the parent's glossary."""
+        return self.parent.prefix_index
+
+    def _relink(self, nodes):
+        """A helper function. For member DLTLs, the parent's positions change as well."""
+        super()._relink(nodes)
+        self.parent.version += 1
+
+    def fetch_node(self, task_id):
+        """A helper function. For member DLTLs, it fetches the node by its task ID from the parent's glossary."""
+        node = self.parent.glossary.get(task_id)
+        if tracing:
+            trace("MemberDLTL.fetch_node", hits=node is not None, misses=node is None)
         if node is None:
             print("Error: Task not found.")     # Potentially want an error instead.
         return node
 
-    def display_task_names(self, target_list, initial_index=1):
-        """Displays the names of all tasks as a numbered list (starting from a given list index) and alters the
-        given list in the corresponding manner. Returns the changed list AND the last displayed index + 1."""
-
-        current = self.head
-        for _ in range(self.size):
-            print(f'{initial_index})   {current.name}')
-            target_list[initial_index-1] = current
-            initial_index += 1
-            current = current.next
-        return target_list, initial_index
-
 
 class DLTLGroup:
     """A group of DLTLs with a common glossary."""
 
+    version = 0     # Increased by the members on every change, see DisplayedView
+    _prefix_index = None
+
     def __init__(self):
         self.members = {}
         self.glossary = {}
         self.ordering = []
         self.size = 0
 
-    def initiate_member(self, member_name, ordering_key: dict):
-        """Creates an empty member DLTL of the given name and adds it to the group, to the appropriate position."""
-        self.members[member_name] = MemberDLTL(self)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_prefix_index", None)     # Cheaper to rebuild than to store
+        state.pop("glossary", None)         # As are the references to the nodes the members already store
+        return state
 
-        # Add the member to the ordering. The search could be optimized, but that wouldn't change O(n) complexity.
-        self.ordering.append(member_name)
-        i = 0
-        while ordering_key[self.ordering[i]] < ordering_key[member_name]:
-            i += 1
-        self.ordering.insert(i, member_name)
-        self.ordering.pop()
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "glossary" not in state:
+            self.rebuild_glossary()
+
+    def rebuild_glossary(self):
+        """Rebuilds the shared glossary from the nodes of the members, keyed by their IDs."""
+        self.glossary = {}
+        self._prefix_index = None
+        for member in self.members.values():
+            current = member.head
+            while current is not None:
+                self.glossary[current.id] = current
+                current = current.next
+
+    @property
+    def prefix_index(self):
+        """The PrefixIndex of the names in the shared glossary. Built on first use, then kept up to date by the
+        members."""
+        if self._prefix_index is None:
+            self._prefix_index = PrefixIndex(self.glossary.values())
+        return self._prefix_index
+
+    def fetch_nodes_named(self, name):
+        """Returns the nodes of the tasks in the group with the given name (names need not be unique)."""
+        return [self.fetch_node(task_id) for task_id in self.prefix_index.fetch_named(name)]
+
+    def initiate_member(self, member_name):
+        """Creates an empty member DLTL of the given name and adds it to the group, to the appropriate position. The
+        members are ordered by their names (frequency codes, see functions.py)."""
+        self.members[member_name] = MemberDLTL(self)
+        insort(self.ordering, member_name)
 
     def delete_member(self, member_name):
         """Removes the specified DLTL from the group, deleting all the tasks in it."""
@@ -353,17 +701,19 @@ class DLTLGroup:
             member.detach_node(member.head)
         return True
 
-    def fetch_node(self, name):
-        """A helper function. For regular DLTLs, it fetches the node by its name from the DLTL's own glossary."""
-        node = self.glossary.get(name)
+    def fetch_node(self, task_id):
+        """A helper function. Fetches the node by its task ID from the shared glossary."""
+        node = self.glossary.get(task_id)
+        if tracing:
+            trace(f'{type(self).__name__}.fetch_node', hits=node is not None, misses=node is None)
         if node is None:
             print("Error: Task not found.")     # Potentially want an error instead.
         return node
 
-    def append_node(self, node, ordering_key: dict):
+    def append_node(self, node):
         """Appends the node to the appropriate member of the group (if said member doesn't exist, it creates it)"""
         if (freq := node.frequency) not in self.members:
-            self.initiate_member(freq, ordering_key)
+            self.initiate_member(freq)
         self.members[freq].append_node(node)
 
     def detach_node(self, node):
@@ -376,37 +726,73 @@ class DLTLGroup:
             del self.members[freq]
             self.ordering.remove(freq)
 
-    def detach_node_by_name(self, name):
-        """Detaches a node from the DLTL group by its name."""
-        node = self.fetch_node(name)
+    def detach_node_by_id(self, task_id):
+        """Detaches a node from the DLTL group by its task ID."""
+        node = self.fetch_node(task_id)
         if node is None:
             return None
         self.detach_node(node)
         return node
 
-    def move_across_group(self, node, new_dltl, ordering_key: dict):
+    def move_across_group(self, node, new_dltl):
         """Moves the given node to the specified DLTL in the group (which it creates if necessary)."""
         self.detach_node(node)
         node.frequency = new_dltl
-        self.append_node(node, ordering_key)
+        self.append_node(node)
+
+    def __iter__(self):
+        """Yields the task nodes of all members, in the order of the members. Like the walks of a DLTL, the generators
+        of a group must not outlive a change of it, so the ordering is walked without copying it. Whoever changes the
+        tasks walked collects them first, as _fetch_many_from_ld() in functions.py does."""
+        for frequency in self.ordering:
+            yield from self.members[frequency]
 
-    def display_task_names(self):
-        """Displays the names of all tasks (in the group) as a numbered list
-        and returns a list of pointers to the numbered tasks."""
+    def __reversed__(self):
+        """Yields the task nodes of all members from the last one to the first one."""
+        for frequency in reversed(self.ordering):
+            yield from reversed(self.members[frequency])
 
-        result = [None] * self.size
-        initial_index = 1
+    def iter_filtered(self, status=None, condition=None):
+        """Yields the task nodes of the given status (of any status if None) for which condition(node) is true (if
+        given), in the order of the members."""
         for frequency in self.ordering:
-            print(frequency, ":", sep="")
-            result, initial_index = self.members[frequency].display_task_names(result, initial_index)
+            yield from self.members[frequency].iter_filtered(status, condition)
+
+    def iter_range(self, offset=0, limit=None):
+        """Yields the task nodes of a range of positions in the group (see DLTL.iter_range). Members in front of the
+        range are skipped without being walked."""
+        end = self.size if limit is None else min(self.size, offset + limit)
+        position = 0        # The number of tasks in the members before the current one
+        for frequency in self.ordering:
+            if position >= end:
+                break
+            member = self.members[frequency]
+            if position + member.size > offset:
+                start = max(offset - position, 0)
+                yield from member.iter_range(start, end - position - start)
+            position += member.size
+
+    def display_task_names(self, offset=0, limit=None, initial_index=1, title=str):
+        """Displays the names of all tasks (in the group) as a numbered list, optionally only a page of them (see
+        DLTL.display_task_names), under the titles of their members (made by the given function from their names).
+        Returns the number of tasks up to the end of the displayed page."""
+        frequency = None
+        for i, node in enumerate(self.iter_range(offset, limit), initial_index + offset):
+            if node.frequency != frequency:     # The first task of a member
+                if frequency is not None:
+                    print()
+                frequency = node.frequency
+                print(title(frequency), ":", sep="")
+            print(f'{i})   {node.name}')
+        if frequency is not None:
             print()
-        return result
+        return self.size if limit is None else min(self.size, offset + limit)
 
     def count_to_member(self, node_position, search_reversed=False):
         """Finds the member DLTL which contains the node of the given position in the group and its position in it."""
         if search_reversed:      # Searching from the back
             i = -1
-            current = self.members[self.ordering[-i]]
+            current = self.members[self.ordering[i]]
             while node_position > current.size:
                 node_position -= current.size
                 i -= 1
@@ -419,6 +805,8 @@ class DLTLGroup:
                 node_position -= current.size
                 i += 1
                 current = self.members[self.ordering[i]]
+        if tracing:     # Hops are the members passed, the size the number of members
+            trace("DLTLGroup.count_to_member", abs(i) - search_reversed, len(self.ordering))
         return current, node_position
 
     def fetch_node_at_position(self, position):
@@ -461,16 +849,92 @@ class DLTLGroup:
             return None
         return self.move_node_ab(node, node_b)
 
-    def change_frequency(self, node, new_frequency, ordering_key: dict):
+    def clear(self):
+        """Removes all tasks from the group. Done in place, so that the views displaying the group (or any of its
+        members) become stale, instead of still pointing at the removed tasks."""
+        for member in self.members.values():
+            member.version += 1
+        self.members = {}
+        self.glossary = {}
+        self.ordering = []
+        self.size = 0
+        self._prefix_index = None
+        self.version += 1
+
+    def change_frequency(self, node, new_frequency):
         self.detach_node(node)
         node.frequency = new_frequency
-        self.append_node(node, ordering_key)
+        self.append_node(node)
 
     def rename_node(self, node, new_name):
         """Renames the given task node and updates the glossary."""
         self.members[node.frequency].rename_node(node, new_name)
 
-    @staticmethod
-    def change_description(node, new_description):
-        """Changes the description of the given task node."""
-        node.description = new_description
+    def memory_usage(self):
+        """Returns the bytes taken up by the group as [nodes, strings, glossaries, other] (see DLTL.memory_usage),
+        in a single pass over the nodes of its members."""
+        usage = [0, 0, getsizeof(self.glossary), getsizeof(self) + getsizeof(self.members) + getsizeof(self.ordering)]
+        if self._prefix_index is not None:
+            usage[2] += getsizeof(self._prefix_index.entries)
+        return _measure_nodes(self.members.values(), usage)
+
+
+class DisplayedView:
+    """A lightweight stand-in for a displayed numbered list of tasks. Instead of holding a pointer to every displayed
+    node, it remembers the displayed lists (shown one after another) and the status filter, and resolves positions
+    on demand. Displays that are not simply the contents of lists instead provide 'stream', a function producing
+    a fresh iterator over the displayed nodes. Any change to the underlying lists makes the view stale."""
+
+    def __init__(self, sources, size, status=None, stream=None):
+        self.sources = sources
+        self.size = size
+        self.status = status
+        self.stream = stream
+        self.versions = [source.version for source in sources]
+
+    def __len__(self):
+        return self.size
+
+    def is_stale(self):
+        """Checks whether any of the underlying lists changed since the view was made."""
+        return any(source.version != version for source, version in zip(self.sources, self.versions))
+
+    def fetch_node_at_position(self, position):
+        """Fetches the node at the given position in the displayed list. Unfiltered lists use their own positional
+        lookup, filtered ones (only ever plain DLTLs) have to be walked."""
+        if position < 1 or position > self.size:
+            print("Error: Invalid position.")
+            return None
+        if self.stream is not None:
+            return next(islice(self.stream(), position - 1, None), None)
+
+        if self.status is not None:
+            return next(islice(self._iterate(), position - 1, None), None)
+        for source in self.sources:
+            if position <= source.size:
+                return source.fetch_node_at_position(position)
+            position -= source.size
+        return None     # Only if the view is stale
+
+    def _iterate(self):
+        """A helper function. Yields the displayed nodes in order."""
+        if self.stream is not None:
+            yield from self.stream()
+            return
+        for source in self.sources:
+            yield from source.iter_filtered(self.status)
+
+    def fetch_nodes_in_ranges(self, ranges):
+        """Fetches the nodes in the given (sorted, disjoint) ranges of positions, given as (start, end) with both
+        included, in a single pass over the displayed list."""
+        result = []
+        wanted = iter(ranges)
+        start, end = next(wanted, (None, None))
+        for position, node in enumerate(self._iterate(), 1):
+            if start is None:
+                break
+            if position >= start:
+                result.append(node)
+                if position == end:
+                    start, end = next(wanted, (None, None))
+        return result
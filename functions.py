@@ -1,27 +1,62 @@
+import csv
 import pickle
+import re
 import sys
-from os import path, remove
+import threading
+import tracemalloc
 from datetime import date, datetime, timedelta
-from bisect import insort
+from bisect import insort, bisect_left, bisect_right
+from fnmatch import fnmatchcase
+from collections import deque
+from itertools import islice
 import dltl     # Custom module
+import history  # Custom module
+import indexes  # Custom module
+import profiling    # Custom module
+import storage  # Custom module
 
 
-def pickle_into_file(contents, file_name):
-    with open(f'{file_name}.pkl', "wb") as f:
-        pickle.dump(contents, f)
+def _rarely_used(key):
+    """Not meant for the end user. Whether the key is of a list triggered only a few times a year (dates, yearly,
+    months and seasons)."""
+    return type(key) is int and (key < 0 or key == YEARLY or MONTH_BASE < key < INTERVAL)
+
+
+def _tier_of(key):
+    """Not meant for the end user. The rarely used lists start out compressed in the cold tier, everything else is
+    kept in the hot one. A cold list is promoted to the hot tier once it is used (see _pull_file()) and stays there
+    until a refresh finds it unused again, see _demote_unused_lists()."""
+    if _rarely_used(key):
+        return storage.tier_of(_file_name_of(key)) or storage.COLD
+    return storage.HOT
+
+
+def _file_name_of(key):
+    """Not meant for the end user. Frequency lists are stored under the name of their frequency, the other files
+    (status lists, config, indexes) under their own name."""
+    return _frequency_name(key) if type(key) is int else key
 
 
 def unpickle_file(file_name, failsafe):
-    if path.exists(f'{file_name}.pkl'):
-        with open(f'{file_name}.pkl', "rb") as f:
-            return pickle.load(f)
-    return failsafe
+    return storage.load(file_name, failsafe)
 
 
 config = unpickle_file("config", {"last_refresh": date.today(),
                                   "auto_refresh": False,
-                                  "ordering_key": {date(2020, 1, 1): -366, date(2020, 1, 2): -365, date(2020, 1, 3): -364, date(2020, 1, 4): -363, date(2020, 1, 5): -362, date(2020, 1, 6): -361, date(2020, 1, 7): -360, date(2020, 1, 8): -359, date(2020, 1, 9): -358, date(2020, 1, 10): -357, date(2020, 1, 11): -356, date(2020, 1, 12): -355, date(2020, 1, 13): -354, date(2020, 1, 14): -353, date(2020, 1, 15): -352, date(2020, 1, 16): -351, date(2020, 1, 17): -350, date(2020, 1, 18): -349, date(2020, 1, 19): -348, date(2020, 1, 20): -347, date(2020, 1, 21): -346, date(2020, 1, 22): -345, date(2020, 1, 23): -344, date(2020, 1, 24): -343, date(2020, 1, 25): -342, date(2020, 1, 26): -341, date(2020, 1, 27): -340, date(2020, 1, 28): -339, date(2020, 1, 29): -338, date(2020, 1, 30): -337, date(2020, 1, 31): -336, date(2020, 2, 1): -335, date(2020, 2, 2): -334, date(2020, 2, 3): -333, date(2020, 2, 4): -332, date(2020, 2, 5): -331, date(2020, 2, 6): -330, date(2020, 2, 7): -329, date(2020, 2, 8): -328, date(2020, 2, 9): -327, date(2020, 2, 10): -326, date(2020, 2, 11): -325, date(2020, 2, 12): -324, date(2020, 2, 13): -323, date(2020, 2, 14): -322, date(2020, 2, 15): -321, date(2020, 2, 16): -320, date(2020, 2, 17): -319, date(2020, 2, 18): -318, date(2020, 2, 19): -317, date(2020, 2, 20): -316, date(2020, 2, 21): -315, date(2020, 2, 22): -314, date(2020, 2, 23): -313, date(2020, 2, 24): -312, date(2020, 2, 25): -311, date(2020, 2, 26): -310, date(2020, 2, 27): -309, date(2020, 2, 28): -308, date(2020, 2, 29): -307, date(2020, 3, 1): -306, date(2020, 3, 2): -305, date(2020, 3, 3): -304, date(2020, 3, 4): -303, date(2020, 3, 5): -302, date(2020, 3, 6): -301, date(2020, 3, 7): -300, date(2020, 3, 8): -299, date(2020, 3, 9): -298, date(2020, 3, 10): -297, date(2020, 3, 11): -296, date(2020, 3, 12): -295, date(2020, 3, 13): -294, date(2020, 3, 14): -293, date(2020, 3, 15): -292, date(2020, 3, 16): -291, date(2020, 3, 17): -290, date(2020, 3, 18): -289, date(2020, 3, 19): -288, date(2020, 3, 20): -287, date(2020, 3, 21): -286, date(2020, 3, 22): -285, date(2020, 3, 23): -284, date(2020, 3, 24): -283, date(2020, 3, 25): -282, date(2020, 3, 26): -281, date(2020, 3, 27): -280, date(2020, 3, 28): -279, date(2020, 3, 29): -278, date(2020, 3, 30): -277, date(2020, 3, 31): -276, date(2020, 4, 1): -275, date(2020, 4, 2): -274, date(2020, 4, 3): -273, date(2020, 4, 4): -272, date(2020, 4, 5): -271, date(2020, 4, 6): -270, date(2020, 4, 7): -269, date(2020, 4, 8): -268, date(2020, 4, 9): -267, date(2020, 4, 10): -266, date(2020, 4, 11): -265, date(2020, 4, 12): -264, date(2020, 4, 13): -263, date(2020, 4, 14): -262, date(2020, 4, 15): -261, date(2020, 4, 16): -260, date(2020, 4, 17): -259, date(2020, 4, 18): -258, date(2020, 4, 19): -257, date(2020, 4, 20): -256, date(2020, 4, 21): -255, date(2020, 4, 22): -254, date(2020, 4, 23): -253, date(2020, 4, 24): -252, date(2020, 4, 25): -251, date(2020, 4, 26): -250, date(2020, 4, 27): -249, date(2020, 4, 28): -248, date(2020, 4, 29): -247, date(2020, 4, 30): -246, date(2020, 5, 1): -245, date(2020, 5, 2): -244, date(2020, 5, 3): -243, date(2020, 5, 4): -242, date(2020, 5, 5): -241, date(2020, 5, 6): -240, date(2020, 5, 7): -239, date(2020, 5, 8): -238, date(2020, 5, 9): -237, date(2020, 5, 10): -236, date(2020, 5, 11): -235, date(2020, 5, 12): -234, date(2020, 5, 13): -233, date(2020, 5, 14): -232, date(2020, 5, 15): -231, date(2020, 5, 16): -230, date(2020, 5, 17): -229, date(2020, 5, 18): -228, date(2020, 5, 19): -227, date(2020, 5, 20): -226, date(2020, 5, 21): -225, date(2020, 5, 22): -224, date(2020, 5, 23): -223, date(2020, 5, 24): -222, date(2020, 5, 25): -221, date(2020, 5, 26): -220, date(2020, 5, 27): -219, date(2020, 5, 28): -218, date(2020, 5, 29): -217, date(2020, 5, 30): -216, date(2020, 5, 31): -215, date(2020, 6, 1): -214, date(2020, 6, 2): -213, date(2020, 6, 3): -212, date(2020, 6, 4): -211, date(2020, 6, 5): -210, date(2020, 6, 6): -209, date(2020, 6, 7): -208, date(2020, 6, 8): -207, date(2020, 6, 9): -206, date(2020, 6, 10): -205, date(2020, 6, 11): -204, date(2020, 6, 12): -203, date(2020, 6, 13): -202, date(2020, 6, 14): -201, date(2020, 6, 15): -200, date(2020, 6, 16): -199, date(2020, 6, 17): -198, date(2020, 6, 18): -197, date(2020, 6, 19): -196, date(2020, 6, 20): -195, date(2020, 6, 21): -194, date(2020, 6, 22): -193, date(2020, 6, 23): -192, date(2020, 6, 24): -191, date(2020, 6, 25): -190, date(2020, 6, 26): -189, date(2020, 6, 27): -188, date(2020, 6, 28): -187, date(2020, 6, 29): -186, date(2020, 6, 30): -185, date(2020, 7, 1): -184, date(2020, 7, 2): -183, date(2020, 7, 3): -182, date(2020, 7, 4): -181, date(2020, 7, 5): -180, date(2020, 7, 6): -179, date(2020, 7, 7): -178, date(2020, 7, 8): -177, date(2020, 7, 9): -176, date(2020, 7, 10): -175, date(2020, 7, 11): -174, date(2020, 7, 12): -173, date(2020, 7, 13): -172, date(2020, 7, 14): -171, date(2020, 7, 15): -170, date(2020, 7, 16): -169, date(2020, 7, 17): -168, date(2020, 7, 18): -167, date(2020, 7, 19): -166, date(2020, 7, 20): -165, date(2020, 7, 21): -164, date(2020, 7, 22): -163, date(2020, 7, 23): -162, date(2020, 7, 24): -161, date(2020, 7, 25): -160, date(2020, 7, 26): -159, date(2020, 7, 27): -158, date(2020, 7, 28): -157, date(2020, 7, 29): -156, date(2020, 7, 30): -155, date(2020, 7, 31): -154, date(2020, 8, 1): -153, date(2020, 8, 2): -152, date(2020, 8, 3): -151, date(2020, 8, 4): -150, date(2020, 8, 5): -149, date(2020, 8, 6): -148, date(2020, 8, 7): -147, date(2020, 8, 8): -146, date(2020, 8, 9): -145, date(2020, 8, 10): -144, date(2020, 8, 11): -143, date(2020, 8, 12): -142, date(2020, 8, 13): -141, date(2020, 8, 14): -140, date(2020, 8, 15): -139, date(2020, 8, 16): -138, date(2020, 8, 17): -137, date(2020, 8, 18): -136, date(2020, 8, 19): -135, date(2020, 8, 20): -134, date(2020, 8, 21): -133, date(2020, 8, 22): -132, date(2020, 8, 23): -131, date(2020, 8, 24): -130, date(2020, 8, 25): -129, date(2020, 8, 26): -128, date(2020, 8, 27): -127, date(2020, 8, 28): -126, date(2020, 8, 29): -125, date(2020, 8, 30): -124, date(2020, 8, 31): -123, date(2020, 9, 1): -122, date(2020, 9, 2): -121, date(2020, 9, 3): -120, date(2020, 9, 4): -119, date(2020, 9, 5): -118, date(2020, 9, 6): -117, date(2020, 9, 7): -116, date(2020, 9, 8): -115, date(2020, 9, 9): -114, date(2020, 9, 10): -113, date(2020, 9, 11): -112, date(2020, 9, 12): -111, date(2020, 9, 13): -110, date(2020, 9, 14): -109, date(2020, 9, 15): -108, date(2020, 9, 16): -107, date(2020, 9, 17): -106, date(2020, 9, 18): -105, date(2020, 9, 19): -104, date(2020, 9, 20): -103, date(2020, 9, 21): -102, date(2020, 9, 22): -101, date(2020, 9, 23): -100, date(2020, 9, 24): -99, date(2020, 9, 25): -98, date(2020, 9, 26): -97, date(2020, 9, 27): -96, date(2020, 9, 28): -95, date(2020, 9, 29): -94, date(2020, 9, 30): -93, date(2020, 10, 1): -92, date(2020, 10, 2): -91, date(2020, 10, 3): -90, date(2020, 10, 4): -89, date(2020, 10, 5): -88, date(2020, 10, 6): -87, date(2020, 10, 7): -86, date(2020, 10, 8): -85, date(2020, 10, 9): -84, date(2020, 10, 10): -83, date(2020, 10, 11): -82, date(2020, 10, 12): -81, date(2020, 10, 13): -80, date(2020, 10, 14): -79, date(2020, 10, 15): -78, date(2020, 10, 16): -77, date(2020, 10, 17): -76, date(2020, 10, 18): -75, date(2020, 10, 19): -74, date(2020, 10, 20): -73, date(2020, 10, 21): -72, date(2020, 10, 22): -71, date(2020, 10, 23): -70, date(2020, 10, 24): -69, date(2020, 10, 25): -68, date(2020, 10, 26): -67, date(2020, 10, 27): -66, date(2020, 10, 28): -65, date(2020, 10, 29): -64, date(2020, 10, 30): -63, date(2020, 10, 31): -62, date(2020, 11, 1): -61, date(2020, 11, 2): -60, date(2020, 11, 3): -59, date(2020, 11, 4): -58, date(2020, 11, 5): -57, date(2020, 11, 6): -56, date(2020, 11, 7): -55, date(2020, 11, 8): -54, date(2020, 11, 9): -53, date(2020, 11, 10): -52, date(2020, 11, 11): -51, date(2020, 11, 12): -50, date(2020, 11, 13): -49, date(2020, 11, 14): -48, date(2020, 11, 15): -47, date(2020, 11, 16): -46, date(2020, 11, 17): -45, date(2020, 11, 18): -44, date(2020, 11, 19): -43, date(2020, 11, 20): -42, date(2020, 11, 21): -41, date(2020, 11, 22): -40, date(2020, 11, 23): -39, date(2020, 11, 24): -38, date(2020, 11, 25): -37, date(2020, 11, 26): -36, date(2020, 11, 27): -35, date(2020, 11, 28): -34, date(2020, 11, 29): -33, date(2020, 11, 30): -32, date(2020, 12, 1): -31, date(2020, 12, 2): -30, date(2020, 12, 3): -29, date(2020, 12, 4): -28, date(2020, 12, 5): -27, date(2020, 12, 6): -26, date(2020, 12, 7): -25, date(2020, 12, 8): -24, date(2020, 12, 9): -23, date(2020, 12, 10): -22, date(2020, 12, 11): -21, date(2020, 12, 12): -20, date(2020, 12, 13): -19, date(2020, 12, 14): -18, date(2020, 12, 15): -17, date(2020, 12, 16): -16, date(2020, 12, 17): -15, date(2020, 12, 18): -14, date(2020, 12, 19): -13, date(2020, 12, 20): -12, date(2020, 12, 21): -11, date(2020, 12, 22): -10, date(2020, 12, 23): -9, date(2020, 12, 24): -8, date(2020, 12, 25): -7, date(2020, 12, 26): -6, date(2020, 12, 27): -5, date(2020, 12, 28): -4, date(2020, 12, 29): -3, date(2020, 12, 30): -2, date(2020, 12, 31): -1, 'once': 1, 'daily': 2, 'weekly': 3, 'monthly': 4, 'seasonally': 5, 'yearly': 6, 'monday': 7, 'tuesday': 8, 'wednesday': 9, 'thursday': 10, 'friday': 11, 'saturday': 12, 'sunday': 13, 'january': 14, 'february': 15, 'march': 16, 'april': 17, 'may': 18, 'june': 19, 'july': 20, 'august': 21, 'september': 22, 'october': 23, 'november': 24, 'december': 25, 'winter': 26, 'spring': 27, 'summer': 28, 'fall': 29}
+                                  "autosave_interval": 0,     # In seconds, 0 means autosave is disabled
+                                  "autosave_threshold": 1,    # The number of changed lists needed to trigger autosave
+                                  "next_task_id": 1,
+                                  "id_keys": True,           # Whether the lists are keyed by task IDs, see below
+                                  "profiling": False,        # Whether the commands' timings are recorded, see stats
+                                  "slow_io_threshold": 0,    # In milliseconds, 0 means slow I/O is not logged
                                   })
+config.setdefault("autosave_interval", 0)     # Configurations saved by older versions lack these
+config.setdefault("autosave_threshold", 1)
+config.setdefault("next_task_id", 1)
+config.setdefault("profiling", False)
+profiling.enabled = dltl.tracing = config["profiling"]
+config.setdefault("slow_io_threshold", 0)
+storage.slow_threshold = config["slow_io_threshold"] / 1000
 
 due = unpickle_file("due", dltl.DLTLGroup())
 overdue = unpickle_file("overdue", dltl.DLTLGroup())
@@ -35,45 +70,110 @@ week = {1: "monday", 2: "tuesday", 3: "wednesday", 4: "thursday", 5: "friday", 6
 months = {1: 'january', 2: 'february', 3: 'march', 4: 'april', 5: 'may', 6: 'june', 7: 'july', 8: 'august',
           9: 'september', 10: 'october', 11: 'november', 12: 'december'}
 seasons = {1: "winter", 2:  "spring", 3: "summer", 0: "fall"}
+
+# Every frequency is encoded as a small integer, whose natural order is the display order: the dates (of the leap
+# year 2020) are -366 to -1, followed by the ordinary frequencies (1-6, the keys of 'ordinary'), the days of the week,
+# the months, the seasons and lastly the interval ('every N days') tasks. 0 stands for all frequencies.
+FREQUENCY_ALL = 0
+ONCE, DAILY, WEEKLY, MONTHLY, SEASONALLY, YEARLY = ordinary
+WEEK_BASE, MONTH_BASE, SEASON_BASE = 6, 13, 25      # Added to the keys of 'week', 'months' and 'seasons'
+INTERVAL = SEASON_BASE + 5
+_YEAR_END = date(2021, 1, 1).toordinal()
+_frequency_names = [None, *ordinary.values(), *week.values(), *months.values(),
+                    *(seasons[i % 4] for i in range(1, 5)), "intervals"]
+_frequency_codes = {name: code for code, name in enumerate(_frequency_names) if name is not None}
+
+
+def _date_code(month, day):
+    """Not meant for the end user. Encodes the given date frequency."""
+    return date(2020, month, day).toordinal() - _YEAR_END
+
+
+def _season_code(season):
+    """Not meant for the end user. Encodes the given key of 'seasons' (0 being fall)."""
+    return SEASON_BASE + (season or 4)
+
+
+def _frequency_name(code):
+    """Not meant for the end user. Returns the name of the encoded frequency, which is also the name of its file."""
+    if code < 0:
+        return str(date.fromordinal(code + _YEAR_END))
+    return _frequency_names[code]
+
+
 # counting = unpickle_file("counting")
-dates = unpickle_file("dates", [])      # An ordered list of dates we are using.
+# An ordered list of the dates we are using, as recorded by the storage manifest
+dates = sorted(_date_code(int(name[5:7]), int(name[8:10])) for name in storage.stored_names()
+               if re.fullmatch(r"\d{4}-\d{2}-\d{2}", name))
+search_index = unpickle_file("search", None)    # Both built on first use if missing, see _build_indexes()
+tag_index = unpickle_file("tags", None)
+counters = unpickle_file("counters", None)      # (status, frequency): number of tasks, see _fetch_counters()
+descriptions = None     # task ID: description, kept apart from the lists and loaded on first use
+removed_descriptions = set()    # IDs of the tasks removed while the descriptions were not loaded, see below
+HISTORY_FILE = "history.bin"
+history_log = history.History()     # The events not saved yet, the saved ones are only read when needed
+_history_checked = False    # Whether the history file was checked for a torn block yet, see _repair_history()
 
 in_memory = {}
 changed = {"config": True}
-last_displayed = []
+last_displayed = None    # A dltl.DisplayedView of the last displayed list
 ld_origin = None     # Stores what the source of the ld list was
-
-
-def _pull_file(frequency):
-    """Not meant for the end user. Pulls the desired file into memory (if it exists), or returns an empty DLTL."""
+page_cursor = None   # The last display limited to a page, with the offset of the following page and the page size
+
+state_lock = threading.RLock()      # Held by whoever reads or alters the lists above, see main.py and the autosave
+_write_lock = threading.Lock()      # Serializes the writing of snapshots onto the disk
+_snapshot_generation = 0
+_written_generations = {}           # file name: generation of the last snapshot written into it
+_history_generations = deque()      # Generations of the snapshots with a history block not appended yet, in order
+_held_history = {}                  # generation: history block waiting for the blocks of older snapshots
+_autosave_stop = threading.Event()
+_midnight_timer = None
+
+
+def _pull_file(frequency, promote=True):
+    """Not meant for the end user. Pulls the desired file into memory (if it exists), or returns an empty DLTL. A list
+    loaded from the cold tier is moved into the hot one, unless promote is unset (for the walks over all lists, which
+    would otherwise promote every one of them)."""
+    profiling.count("lists pulled")
     if frequency in in_memory:
         temp = in_memory[frequency]
     else:
-        if path.exists(f'{frequency}.pkl'):
-            temp = unpickle_file(frequency, None)
+        profiling.count("lists loaded")
+        name = _frequency_name(frequency)
+        if promote and storage.tier_of(name) == storage.COLD:
+            with _write_lock:       # Rewrites the file and the manifest, which the autosave may be writing
+                temp = storage.load(name, None, promote=True)
         else:
-            temp = dltl.DLTL()
+            temp = unpickle_file(name, None)
+        if temp is None:
+            temp = dltl.IntervalDLTL() if frequency == INTERVAL else dltl.DLTL()
             # If we are creating a date entry, we have to add it to the list
-            if isinstance(frequency, date):
+            if frequency < 0:
                 insort(dates, frequency)
-                changed["dates"] = True
 
         in_memory[frequency] = temp
     return temp
 
 
+def _demote_unused_lists():
+    """Not meant for the end user. Moves the rarely used lists promoted to the hot tier back into the cold one, once
+    they are no longer in memory (at the first refresh of a later session)."""
+    with _write_lock:
+        for frequency in _stored_frequencies():
+            if _rarely_used(frequency) and frequency not in in_memory:
+                storage.move(_frequency_name(frequency), storage.COLD)
+
+
 def _delete_file(frequency):
-    """Not meant for the end user. Permanently deletes the specified file and all the tasks in it."""
-    # Remove the file and prevent it from being constructed again
-    if path.exists(f'{frequency}.pkl'):
-        remove(f'{frequency}.pkl')
+    """Not meant for the end user. Permanently deletes the specified task list and all the tasks in it. The file itself
+    is removed once the snapshot containing the deletion is written."""
+    # Prevent the file from being constructed again
     in_memory.pop(frequency, None)
     changed.pop(frequency, None)
 
     # If it was a date, remove it from the list of used dates
-    if isinstance(frequency, date):
+    if frequency < 0:
         dates.remove(frequency)
-        changed["dates"] = True
 
     # Remove all tasks of the given frequency from elsewhere
     for group in groups.values():
@@ -82,17 +182,140 @@ def _delete_file(frequency):
 
 
 def _push_file(frequency):
-    """Not meant for the end user. Pushes the current state of the given task list into the corresponding file."""
+    """Not meant for the end user. Snapshots the current state of the given task list, returning the file name and
+    its contents (None if the file is to be removed)."""
     if in_memory[frequency].size == 0:
         _delete_file(frequency)     # Prevents us saving empty lists and cluttering the folder
-    else:
-        pickle_into_file(in_memory[frequency], frequency)
-    changed.pop(frequency, None)
+        return frequency, None, None, None
+    return _push_special_file(frequency, in_memory[frequency])
 
 
 def _push_special_file(file_name, contents):
-    pickle_into_file(contents, file_name)
+    """Not meant for the end user. Snapshots the given contents, returning the file name, the pickled contents and
+    the size and version for the storage manifest (None if the contents have none)."""
     changed.pop(file_name, None)
+    return file_name, pickle.dumps(contents), getattr(contents, "size", None), getattr(contents, "version", None)
+
+
+def _snapshot_changes():
+    """Not meant for the end user. Serializes everything marked in 'changed' (and clears the marks), so that it can be
+    written onto the disk later, even while the lists keep changing. Has to be called while holding state_lock."""
+    global _snapshot_generation, history_log, descriptions
+    _snapshot_generation += 1
+    contents = []
+    if removed_descriptions and descriptions is None:
+        # Only the store file is loaded (without it, the store is later built from the lists, which lack the tasks)
+        descriptions = unpickle_file("descriptions", None)
+        if descriptions is None:
+            removed_descriptions.clear()
+    _drop_removed_descriptions()
+
+    for name, status_list in statuses.items():
+        if name in changed:
+            contents.append(_push_special_file(name, status_list))
+    if "config" in changed:
+        contents.append(_push_special_file("config", config))
+    if "search" in changed:
+        contents.append(_push_special_file("search", search_index))
+    if "tags" in changed:
+        contents.append(_push_special_file("tags", tag_index))
+    if "descriptions" in changed:
+        contents.append(_push_special_file("descriptions", descriptions))
+    if "counters" in changed:
+        contents.append(_push_special_file("counters", counters))
+    if changed.pop("history", None) and len(history_log):
+        contents.append(("history", history_log.to_bytes(), None, None))
+        history_log = history.History()
+        _history_generations.append(_snapshot_generation)
+
+    for frequency in list(changed.keys()):      # The list is there since we are changed the dict while iterating
+        contents.append(_push_file(frequency))
+
+    if storage.exists("dates"):     # Kept by older versions, the manifest has replaced it
+        contents.append(("dates", None, None, None))
+    return _snapshot_generation, contents
+
+
+def _append_held_history():
+    """Not meant for the end user. Appends the held history blocks to the history file in the order of their
+    snapshots. A block waits until the blocks of all older snapshots are appended, so that the days in the file stay
+    sorted even if a manual save overtakes the autosave. A block is only let go once appended, a failed append is
+    retried on the next save. Has to be called while holding _write_lock. Returns the summary as _write_snapshot()."""
+    summary = [0, 0, 0.0, 0.0]
+    while _history_generations and _history_generations[0] in _held_history:
+        data = _held_history[_history_generations[0]]
+        _repair_history()
+        written = storage.append(HISTORY_FILE, data)
+        del _held_history[_history_generations.popleft()]
+        summary = [summary[0] + 1, summary[1] + len(data), summary[2] + written[0], summary[3] + written[1]]
+    return summary
+
+
+def _write_snapshot(snapshot):
+    """Not meant for the end user. Writes a snapshot made by _snapshot_changes() onto the disk. A file is skipped if
+    a newer snapshot has already been written into it (the autosave and a manual save may overtake each other), the
+    history block is appended in the order of the snapshots instead (see _append_held_history()).
+    Returns the number of files written, the bytes written, the seconds it took and the seconds spent in fsync."""
+    generation, contents = snapshot
+    with _write_lock:
+        for file_name, data, *_ in contents:
+            if file_name == "history":      # Held first, so that it is not lost if writing the rest fails
+                _held_history[generation] = data
+        summary = _append_held_history()
+        for file_name, data, size, version in contents:
+            if file_name == "history":
+                continue
+            if _written_generations.get(file_name, 0) > generation:
+                continue
+            _written_generations[file_name] = generation
+            if data is not None:
+                written = storage.store(_file_name_of(file_name), data, _tier_of(file_name), size, version)
+                summary = [summary[0] + 1] + [a + b for a, b in zip(summary[1:], written)]
+            else:
+                storage.discard(_file_name_of(file_name))
+        written = storage.save_manifest()     # Last, so that it never lists a file that has not been written yet
+    if written[0]:
+        summary = [summary[0] + 1] + [a + b for a, b in zip(summary[1:], written)]
+    if storage.slow_threshold and summary[2] >= storage.slow_threshold:
+        storage.log_slow(f'save  {summary[0]} files: {summary[1]} bytes in {summary[2] * 1000:.1f} ms '
+                         f'(fsync {summary[3] * 1000:.1f} ms)')
+    return summary
+
+
+def _requeue_snapshot(snapshot):
+    """Not meant for the end user. Marks the files of a snapshot that failed to be written as changed again, so that
+    the next save writes them. Has to be called while holding state_lock."""
+    for file_name, data, *_ in snapshot[1]:
+        if file_name == "history":      # Stays held by _write_snapshot(), appended on the next save
+            changed["history"] = True
+        elif data is not None and (file_name in in_memory or file_name in statuses
+                                   or file_name in ("config", "search", "tags", "descriptions", "counters")):
+            changed[file_name] = True
+
+
+def _autosave_worker(stop):
+    """Not meant for the end user. Runs in the background, periodically saving the changed lists once there are
+    enough of them. Only the snapshot is taken under state_lock, the slow writing does not block the user."""
+    while not stop.wait(config["autosave_interval"]):
+        with state_lock:
+            if len(changed) < config["autosave_threshold"]:
+                continue
+            snapshot = _snapshot_changes()
+        try:
+            _write_snapshot(snapshot)
+        except OSError as e:
+            print(f'Error: Autosave failed -- reason: {e}. Your changes will be saved on the next attempt.')
+            with state_lock:
+                _requeue_snapshot(snapshot)
+
+
+def _start_autosave():
+    """Not meant for the end user. (Re)starts the autosave worker according to the current configurations."""
+    global _autosave_stop
+    _autosave_stop.set()        # Stops the previous worker, if there is one
+    _autosave_stop = threading.Event()
+    if config["autosave_interval"] > 0:
+        threading.Thread(target=_autosave_worker, args=(_autosave_stop,), daemon=True).start()
 
 
 def _update_dltl(target_name, contents):
@@ -100,6 +323,7 @@ def _update_dltl(target_name, contents):
     (= marks that it should be saved onto a file later)."""
     in_memory[target_name] = contents
     changed[target_name] = True
+    profiling.count("lists updated")
 
 
 def _convert_to_date(days):
@@ -134,33 +358,55 @@ def _set_until_date():
 
 
 def save_changes(namespace):        # The namespace is only to prevent "expected 0 arguments received 1 error"
-    """Saves all changes and progress made to all tasks as well as programme configurations."""
-    for name, status_list in statuses.items():
-        if changed.pop(name, None) is not None:
-            _push_special_file(name, status_list)
-    if changed.pop("config", None) is not None:
-        _push_special_file("config", config)
-    hold = changed.pop("dates", None)           # In order for the empty date dltls to get removed properly (1/2)
-
-    for frequency in list(changed.keys()):      # The list is there since we are changed the dict while iterating
-        _push_file(frequency)
-
-    if changed.pop("dates", None) is not None or hold is not None:
-        _push_special_file("dates", dates)  # and also not meltdown, we have to do it weirdly like this (2/2)
+    """Saves all changes and progress made to all tasks as well as programme configurations. Returns whether it
+    succeeded."""
+    with state_lock:
+        snapshot = _snapshot_changes()
+    try:
+        files, size, seconds, synced = _write_snapshot(snapshot)
+    except OSError as e:
+        with state_lock:
+            _requeue_snapshot(snapshot)
+        print(f'Error: Saving failed -- reason: {e}. Your changes are kept, please try saving again.')
+        print()
+        return False
 
     print("Changes successfully saved!")
+    print(f'Wrote {files} files ({size / 1024:.1f} KiB) in {seconds * 1000:.1f} ms, {synced * 1000:.1f} ms of which in '
+          f'fsync.')
     print()
+    return True
+
+
+def load_summary(before=None):
+    """Not meant for the end user. Returns a line summing up the files read so far (on startup, the loading), or
+    since the given storage.io_totals() (after a command, the lists loaded on demand). None if nothing was read since
+    then."""
+    reads, size, seconds, *_ = storage.io_totals()
+    if before is not None:
+        reads, size, seconds = reads - before[0], size - before[1], seconds - before[2]
+        if not reads:
+            return None
+    return f'Loaded {reads} files ({size / 1024:.1f} KiB) in {seconds * 1000:.1f} ms.'
+
+
+def _exit(code):
+    """Not meant for the end user. Stops the autosave worker and exits. An autosave in progress is let finish writing
+    first, so that it is not killed between writing a list and the manifest."""
+    _autosave_stop.set()
+    with _write_lock:
+        sys.exit(code)
 
 
 def exit_without_saving(namespace):
     """Properly exits the programme WITHOUT saving the changes made to the tasks and programme configurations."""
-    sys.exit(42)
+    _exit(42)
 
 
 def exit_programme(namespace):
-    """Properly saves all changes made and exits the programme."""
-    save_changes(namespace)
-    exit_without_saving(namespace)
+    """Properly saves all changes made and exits the programme. Stays running if the changes could not be saved."""
+    if save_changes(namespace):
+        exit_without_saving(namespace)
 
 
 def catch_close_command():
@@ -171,12 +417,14 @@ def catch_close_command():
           "Do you wish to save data before exiting? (Y/N)\n")
     while True:
         if (response := input().casefold()) == "y":
-            save_changes("y")
+            if not save_changes("y"):
+                print("Do you wish to try saving again? Type 'n' to exit without saving. (Y/N)\n")
+                continue
             print("Data saved. Until next time!")
-            sys.exit(0)
+            _exit(0)
         elif response == "n":
             print("The changes from this session have been discarded. Until next time!")
-            sys.exit(0)
+            _exit(0)
         else:
             print("Did not understand answer. Please try again.")
             print()
@@ -202,15 +450,20 @@ def list_valid_frequencies(namespace):
         print(f"'{freq}'", end=", ")
     print()
     print()
+    print("Tasks can also trigger every given number of days or weeks, e.g. 'every_3_days' or 'every_2_weeks' "
+          "(shortened '3d' and '2w'). Such tasks are listed under 'intervals'.")
+    print()
 
 
 def _validify_frequency(frequency):
-    """Not meant for the end user. Checks whether the user input a frequency supported by the program. If so, formats
-    it to the program's needs. More specific frequency restrictions are handled by the caller function itself."""
+    """Not meant for the end user. Checks whether the user input a frequency supported by the program. If so, returns
+    its code (FREQUENCY_ALL for 'all'). More specific frequency restrictions are handled by the caller function
+    itself."""
     frequency = frequency.casefold()
-    if (frequency in ordinary.values() or frequency in week.values() or frequency in months.values()
-            or frequency in seasons.values() or frequency == "all"):
-        return frequency
+    if frequency == "all":
+        return FREQUENCY_ALL
+    if (code := _frequency_codes.get(frequency)) is not None:
+        return code
 
     # It isn't in the above, so it would have to be a date. If it isn't, then it's not valid
     if len(frequency) != 5:
@@ -219,65 +472,280 @@ def _validify_frequency(frequency):
         print()
         return None
     try:
-        frequency = date(2020, int(frequency[0:2]), int(frequency[3:5]))    # 2020 is a placeholder (leap year)
+        return _date_code(int(frequency[0:2]), int(frequency[3:5]))
     except (TypeError, ValueError) as e:
         print(f'Error: The inputted frequency could not be matched to a frequency supported by the program, and '
               f'could not be confirmed as a date -- reason: {e}. Aborting process.')
         print()
         return None
-    return frequency
+
+
+def _parse_interval(frequency):
+    """Not meant for the end user. Returns the number of days of an interval frequency (e.g. 'every_3_days', '2w'),
+    or None if the frequency is not an interval."""
+    match = re.fullmatch(r"(?:every[ _-]?)?(\d+)[ _-]?(d|days?|w|weeks?)", frequency.casefold())
+    if match is None or int(match[1]) == 0:
+        return None
+    return int(match[1]) * (7 if match[2].startswith("w") else 1)
+
+
+def _validify_task_frequency(frequency):
+    """Not meant for the end user. Like _validify_frequency(), but for the frequency of a single task, which can also
+    be an interval. Returns the code of the frequency and the number of days of the interval (None for the other
+    frequencies), or None if the frequency is not valid."""
+    if (every := _parse_interval(frequency)) is not None:
+        return INTERVAL, every
+    if (code := _validify_frequency(frequency)) is None:
+        return None
+    if code == INTERVAL:
+        print("Error: Please specify the interval, e.g. 'every_3_days' or 'every_2_weeks'. Aborting process.")
+        print()
+        return None
+    return code, None
 
 
 def _prepare_frequency(frequency):
-    """Not meant for the end user. Only serves to strip the year from date frequencies, for displaying."""
-    if isinstance(frequency, date):
-        frequency = f'{frequency.month}-{frequency.day}'
-    return frequency
+    """Not meant for the end user. Returns the name of the encoded frequency for displaying (without the year, for
+    dates)."""
+    if frequency < 0:
+        frequency = date.fromordinal(frequency + _YEAR_END)
+        return f'{frequency.month}-{frequency.day}'
+    return _frequency_names[frequency]
+
+
+def _new_task_id():
+    """Not meant for the end user. Hands out the next unused task ID."""
+    task_id = config["next_task_id"]
+    config["next_task_id"] += 1
+    changed["config"] = True
+    return task_id
+
+
+def _index_task(node, description=None):
+    """Not meant for the end user. (Re)indexes the task for searching and filtering by tags. Skipped while the
+    indexes are not built yet, as building them will catch up on everything. The description is only given if it
+    changed, otherwise the words of the old one are kept from the index (without loading the description store)."""
+    if search_index is not None:
+        if description is not None:
+            search_index.add(node.id, node.name, node.frequency, description)
+        elif search_index.update(node.id, node.name, node.frequency) is None:
+            search_index.add(node.id, node.name, node.frequency, _description_of(node))
+        changed["search"] = True
+    if tag_index is not None:
+        tag_index.add_task(node.id, node.tags)
+        changed["tags"] = True
+
+
+def _unindex_task(node):
+    """Not meant for the end user. Removes the task from the search and tag indexes, and drops its description."""
+    if descriptions is None:
+        removed_descriptions.add(node.id)       # Not worth loading the store for, dropped once it is loaded
+    elif descriptions.pop(node.id, None) is not None:
+        changed["descriptions"] = True
+    if search_index is not None:
+        search_index.remove(node.id)
+        changed["search"] = True
+    if tag_index is not None:
+        tag_index.remove_task(node.id, node.tags)
+        changed["tags"] = True
+
+
+def _count(status, frequency, change):
+    """Not meant for the end user. Adds the change to the number of tasks of the given status and frequency. Skipped
+    while the counters are not built yet, as building them will count everything."""
+    if counters is not None:
+        key = status, frequency
+        if count := counters.get(key, 0) + change:
+            counters[key] = count
+        else:
+            del counters[key]
+        changed["counters"] = True
+
+
+def _set_status(temp, frequency_copy, new_status):
+    """Not meant for the end user. Changes the status of the frequency copy of a task (in its frequency list, given
+    as temp), keeping the counters up to date."""
+    _count(frequency_copy.status, frequency_copy.frequency, -1)
+    temp.change_status(frequency_copy, new_status)
+    _count(new_status, frequency_copy.frequency, 1)
+
+
+def _fetch_counters():
+    """Not meant for the end user. Returns the counters of the tasks by status and frequency, counting all task lists
+    in one pass on first use (or if their file was lost). From then on, every change keeps them up to date."""
+    global counters
+    if counters is None:
+        counters = {}
+        for frequency in _stored_frequencies():
+            for node in _pull_file(frequency, promote=False):
+                counters[node.status, frequency] = counters.get((node.status, frequency), 0) + 1
+        changed["counters"] = True
+    return counters
+
+
+def _record_event(node, event):
+    """Not meant for the end user. Appends the event (a history event code) of the task to the history."""
+    history_log.append(node.id, date.today().toordinal(), event, node.frequency)
+    changed["history"] = True
+
+
+def _repair_history():
+    """Not meant for the end user. Cuts a block torn by an interrupted append (e.g. a crash) off the end of the
+    history file, once per session before the first append. Appending after it would turn all later events into
+    garbage. Has to be called while holding _write_lock."""
+    global _history_checked
+    if _history_checked:
+        return
+    storage.truncate_file(HISTORY_FILE, history.complete_length(storage.read_file(HISTORY_FILE)))
+    _history_checked = True
+
+
+def _fetch_history():
+    """Not meant for the end user. Returns the whole history: the saved events followed by the unsaved ones."""
+    events = history.History.from_bytes(storage.read_file(HISTORY_FILE))
+    for generation, data in sorted(list(_held_history.items())):     # Held back by an overtaking save
+        events.extend(history.History.from_bytes(data))
+    events.extend(history_log)
+    return events
+
+
+def _build_indexes(load_descriptions=False):
+    """Not meant for the end user. Builds the missing indexes and description store (on their first use, or if their
+    file was lost) from all task lists in one pass. Descriptions still kept inside the tasks by older versions are
+    moved into the store. The description store is only loaded if asked for, or if the search index (which indexes
+    the descriptions) has to be built."""
+    global search_index, tag_index, descriptions
+    wanted = load_descriptions or search_index is None
+    if descriptions is None and wanted:
+        descriptions = unpickle_file("descriptions", None)
+        _drop_removed_descriptions()
+    if search_index is not None and tag_index is not None and (descriptions is not None or not wanted):
+        return
+    new_search_index = indexes.InvertedIndex() if search_index is None else None
+    new_tag_index = indexes.TagIndex() if tag_index is None else None
+    new_descriptions = {} if descriptions is None and wanted else None
+
+    for frequency in _stored_frequencies():
+        temp = _pull_file(frequency, promote=False)
+        for current in temp:
+            status_copy = statuses[current.status].glossary.get(current.id)
+            if new_descriptions is not None and "description" in current.__dict__:
+                if text := current.__dict__.pop("description"):
+                    new_descriptions[current.id] = text
+                if status_copy is not None:
+                    status_copy.__dict__.pop("description", None)
+                    changed[current.status] = True
+                _update_dltl(frequency, temp)
+            if new_search_index is not None:
+                new_search_index.add(current.id, current.name, current.frequency,
+                                     (new_descriptions if descriptions is None else descriptions).get(current.id, ""))
+            if new_tag_index is not None:
+                new_tag_index.add_task(current.id, current.tags)
+
+    if new_descriptions is not None:
+        # Status copies whose frequency copy is gone (finished 'once' tasks)
+        for name, status_list in statuses.items():
+            for node in status_list.glossary.values():
+                if "description" in node.__dict__:
+                    if (text := node.__dict__.pop("description")) and node.id is not None:
+                        new_descriptions.setdefault(node.id, text)
+                    changed[name] = True
+        descriptions = new_descriptions
+        changed["descriptions"] = True
+        removed_descriptions.clear()    # The removed tasks are not in the lists, so neither are their descriptions
+    if new_search_index is not None:
+        search_index = new_search_index
+        changed["search"] = True
+    if new_tag_index is not None:
+        tag_index = new_tag_index
+        changed["tags"] = True
+
+
+def _drop_removed_descriptions():
+    """Not meant for the end user. Drops the descriptions of the tasks removed while the store was not loaded, if it
+    is loaded now."""
+    if descriptions is None or not removed_descriptions:
+        return
+    for task_id in removed_descriptions:
+        if descriptions.pop(task_id, None) is not None:
+            changed["descriptions"] = True
+    removed_descriptions.clear()
+
+
+def _fetch_descriptions():
+    """Not meant for the end user. Returns the description store, loading it first if necessary. Descriptions are
+    kept apart from the lists, so that loading a list (e.g. to refresh or to display it) does not load them too."""
+    if descriptions is None:
+        _build_indexes(load_descriptions=True)
+    return descriptions
+
+
+def _description_of(task):
+    """Not meant for the end user. Returns the description of the task (an empty string if it has none)."""
+    return _fetch_descriptions().get(task.id, "")
+
+
+def _fetch_search_index():
+    """Not meant for the end user. Returns the search index, building it first if necessary."""
+    _build_indexes()
+    return search_index
+
+
+def _fetch_tag_index():
+    """Not meant for the end user. Returns the tag index, building it first if necessary."""
+    _build_indexes()
+    return tag_index
+
+
+def _prepare_tags(tag_list):
+    """Not meant for the end user. Turns the tags received from argparse into the form stored in the task nodes."""
+    return frozenset(tag.casefold() for tag in tag_list)
 
 
-def create_task(name, frequency="once", task_description="", status="due"):
+def create_task(name, frequency="once", task_description="", status="due", tags=frozenset()):
     """Creates a task with the given name, frequency (= trigger condition), description and status & adds it
     to appropriate lists."""
     # Checks whether the user inputted a valid frequency. The others were handled by argparse already
-    frequency = _validify_frequency(frequency)
-    if frequency is None:
+    if (parsed := _validify_task_frequency(frequency)) is None:
         return None
-    elif frequency == "all":
+    frequency, every = parsed
+    if frequency == FREQUENCY_ALL:
         print("Error: Cannot create a task with frequency 'all'. Aborting process.")
         print()
         return None
 
     # Checks other validity concerns
-    if frequency == "once" and status == "finished":
+    if frequency == ONCE and status == "finished":
         print("Error: Cannot create a 'once' task that is already 'finished'. Task was NOT created.")
         print()
         return None
     temp = _pull_file(frequency)
-    if name in temp.glossary:
-        print(f'Error: Task with name {name} and frequency {_prepare_frequency(frequency)} already exists. '
-              f'Task was NOT created.')
-        print()
-        return None
-    if name in statuses[status].glossary:
-        print(f'Error: Task with name {name} and status {status} already exists. Task was NOT created.')
-        print()
-        return None
 
-    # Adds the task to the appropriate DLTLGroup
+    # Stores the description, then adds the task to the appropriate DLTLGroup
     until = None
-    status_copy = dltl.TaskNode(name, frequency, task_description, status)
+    task_id = _new_task_id()
+    if task_description:
+        _fetch_descriptions()[task_id] = task_description
+        changed["descriptions"] = True
+    status_copy = dltl.TaskNode(name, frequency, status, task_id=task_id, tags=tags)
     if status == "asleep":
         # Ascribes the node an until (= wake-up date), then adds it to the 'asleep' DLTL
         until = status_copy.until = _set_until_date()
         asleep.add_sleeper(status_copy)
         changed["asleep"] = True
     else:
-        statuses[status].append_node(status_copy, config["ordering_key"])
+        statuses[status].append_node(status_copy)
         changed[status] = True
 
     # Adds the task to the frequency DLTL
-    temp.append_node(dltl.TaskNode(name, frequency, task_description, status, until))
+    frequency_copy = dltl.TaskNode(name, frequency, status, until, task_id, tags)
+    temp.append_node(frequency_copy)
+    _count(status, frequency, 1)
+    if every is not None:
+        frequency_copy.every = every
+        temp.schedule(frequency_copy, date.today() + timedelta(every))
     _update_dltl(frequency, temp)
+    _index_task(frequency_copy, task_description)
 
     print(f'Task "{name}" was successfully created!')
     print()
@@ -288,46 +756,93 @@ def create_task_argparse(namespace):
     """Not meant for the end user. Handles the passing of the arguments received from the user by argparse onto
     the create_task() function. Purely for refactoring purposes"""
     namespace.description = ' '.join(namespace.description)
-    if create_task(namespace.task_name, namespace.frequency, namespace.description, namespace.status) is None:
+    if create_task(namespace.task_name, namespace.frequency, namespace.description, namespace.status,
+                   _prepare_tags(namespace.tags)) is None:
         return None
 
 
 def _fetch_position_from_ld(position: int):
     """Not meant for the end user. Fetches a task node by its position in the last_displayed list."""
+    if last_displayed.is_stale():
+        print("Error: The tasks changed since the last list was displayed. Please display it again before accessing "
+              "tasks by their position.")
+        print()
+        return None
     if position < 1 or position > len(last_displayed):
         print("Error: Invalid position. Aborting process.")
         print()
         return None
-    return last_displayed[position-1]
-
+    return last_displayed.fetch_node_at_position(position)
 
-def _fetch_name_from_ld(name):
-    """Not meant for the end user. Fetches a task node (that was in the last_displayed list) by its name."""
 
+def _ld_sources():
+    """Not meant for the end user. Returns the lists whose glossaries hold the tasks of the last_displayed list."""
     # There are only 3 options
     if ld_origin == "to_do":
-        if name in due.glossary:
-            temp = due
-        else:
-            temp = overdue
+        return [due, overdue]
     elif ld_origin in statuses:
-        temp = statuses[ld_origin]
+        return [statuses[ld_origin]]
+    elif ld_origin == "query":
+        return last_displayed.sources
+    return [_pull_file(ld_origin)]
+
+
+def _fetch_name_from_ld(name):
+    """Not meant for the end user. Fetches a task node (that was in the last_displayed list) by its name, or by
+    a prefix of its name, as long as only one task is named or starts with it. Names need not be unique, tasks
+    sharing a name can be accessed by their position."""
+    sources = _ld_sources()
+    matches = []
+    for temp in sources:
+        matches += temp.fetch_nodes_named(name)
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        print(f'Error: {len(matches)} tasks are named "{name}". Please access the one you mean by its position.')
+        return None
+
+    # Not a full name, but it may be a prefix of one
+    for temp in sources:
+        matches += [temp.glossary[task_id] for _, task_id in temp.prefix_index.fetch_with_prefix(name, 6)]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        print(f'Error: Several tasks start with "{name}", for example: '
+              f'{", ".join(node.name for node in matches[:5])}. Please be more specific.')
     else:
-        temp = _pull_file(ld_origin)
-    return temp.fetch_node(name)
+        print("Error: Task not found.")
+    return None
 
 
-def _fetch_from_ld(task):
-    """Not meant for the end user. Fetches a task node that was in the last_displayed list, after checking that it's
-    possible."""
+def task_names_with_prefix(prefix, limit=None):
+    """Not meant for the end user. Returns the names of the tasks in the last_displayed list starting with the given
+    prefix (for autocompletion)."""
+    if ld_origin is None or ld_origin == "unsupported":
+        return []
+    result = []
+    for temp in _ld_sources():
+        result += [name for name, _ in temp.prefix_index.fetch_with_prefix(prefix, limit)]
+    return sorted(set(result))
+
+
+def _check_ld():
+    """Not meant for the end user. Checks that the tasks of the last_displayed list can be accessed."""
     if ld_origin is None:
         print("Error: Please display a list first before trying to access the tasks in it.")
         print()
-        return None
+        return False
     if ld_origin == "unsupported":
         print("Error: The last displayed list is too broad and as such does not allow interaction with tasks. Please "
               "display a more specialized list to access specific tasks.")
         print()
+        return False
+    return True
+
+
+def _fetch_from_ld(task):
+    """Not meant for the end user. Fetches a task node that was in the last_displayed list, after checking that it's
+    possible."""
+    if not _check_ld():
         return None
 
     task = ' '.join(task)       # From argparse we receive a list
@@ -336,15 +851,99 @@ def _fetch_from_ld(task):
     return _fetch_name_from_ld(task)
 
 
+def _parse_positions(words):
+    """Not meant for the end user. Parses words like ['1-50', '53'] into a sorted list of disjoint (start, end)
+    position ranges (both included), merging the overlapping and adjacent ones. The ranges are never expanded, so
+    that a mistyped huge range is rejected without building all of its positions. Returns None if the words are
+    not positions and ranges of them (then they are the name of a task)."""
+    ranges = []
+    for word in words:
+        match = re.fullmatch(r"(\d+)(?:-(\d+))?", word)
+        if match is None:
+            return None
+        ranges.append(tuple(sorted((int(match[1]), int(match[2] or match[1])))))
+    ranges.sort()
+    merged = [list(ranges[0])] if ranges else []
+    for start, end in ranges[1:]:
+        if start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(span) for span in merged]
+
+
+def _fetch_many_from_ld(task):
+    """Not meant for the end user. Fetches both copies of the targeted tasks from the last_displayed list. The target
+    is either a single name or position, or several positions and ranges of them (e.g. '1-50 53 60-80'), which are
+    all resolved in a single pass over the list. Returns a list of (status copy, frequency copy) pairs sorted by
+    frequency, or None."""
+    positions = _parse_positions(task)
+    if positions is None:
+        status_copy, frequency_copy = _fetch_both_copies(task)
+        if frequency_copy is None:      # The status copy may not exist if status == "finished"
+            return None
+        return [(status_copy, frequency_copy)]
+
+    if not _check_ld():
+        return None
+    if positions == [(positions[0][0], positions[0][0])]:   # Also a range of one position (e.g. '3-3') or '2 2'
+        node = _fetch_position_from_ld(positions[0][0])
+        if node is None:
+            return None
+        status_copy, frequency_copy = _copies_of(node)
+        if frequency_copy is None:
+            return None
+        return [(status_copy, frequency_copy)]
+    if last_displayed.is_stale():
+        print("Error: The tasks changed since the last list was displayed. Please display it again before accessing "
+              "tasks by their position.")
+        print()
+        return None
+    if positions[0][0] < 1 or positions[-1][1] > len(last_displayed):
+        print("Error: Invalid position. Aborting process.")
+        print()
+        return None
+
+    # Sorting by frequency groups the changes to each frequency list together
+    targets = [_copies_of(node) for node in last_displayed.fetch_nodes_in_ranges(positions)]
+    targets.sort(key=lambda copies: copies[1].frequency)
+    return targets
+
+
+def _mark_changed(touched):
+    """Not meant for the end user. Marks each of the altered lists (frequencies or statuses) as changed, once."""
+    for name in touched:
+        changed[name] = True
+
+
+def _report(done, total, message, bulk_message):
+    """Not meant for the end user. Reports the outcome of a command which may have targeted several tasks."""
+    if total == 1 and done == 0:
+        return None     # The problem was already reported
+    print()
+    if total == 1:
+        print(message)
+    else:
+        print(bulk_message.format(done=done, total=total))
+    print()
+
+
 def _fetch_both_copies(task):
     task = _fetch_from_ld(task)
     if task is None:
         return None, None
-    if ld_origin == "to_do" or ld_origin in statuses:
+    return _copies_of(task)
+
+
+def _copies_of(task):
+    """Not meant for the end user. Returns the status copy and the frequency copy of a task node from the
+    last_displayed list."""
+    if (ld_origin == "to_do" or ld_origin in statuses
+            or (ld_origin == "query" and statuses[task.status].glossary.get(task.id) is task)):
         status_copy = task
-        frequency_copy = _pull_file(task.frequency).fetch_node(task.name)
+        frequency_copy = _pull_file(task.frequency).fetch_node(task.id)
     else:
-        status_copy = statuses[task.status].glossary.get(task.name)  # Note that this could return None for "finished"
+        status_copy = statuses[task.status].glossary.get(task.id)    # Note that this could return None for "finished"
         frequency_copy = task
     return status_copy, frequency_copy
 
@@ -355,24 +954,29 @@ def _arglist_into_text(argparse_list):
     return ' '.join(argparse_list)
 
 
-def delete_task(namespace):
-    """Deletes a task and removes it from all lists."""
-    status_copy, frequency_copy = _fetch_both_copies(namespace.target_task)
-    if frequency_copy is None:      # The status copy may not exist if status == "finished"
-        return None
-
-    freq = _pull_file(frequency_copy.frequency)
-    freq.detach_node(frequency_copy)
-    _update_dltl(frequency_copy.frequency, freq)
+def _delete_copies(status_copy, frequency_copy, touched):
+    """Not meant for the end user. Removes both copies of the task from all lists and records the altered lists."""
+    _pull_file(frequency_copy.frequency).detach_node(frequency_copy)
+    _count(frequency_copy.status, frequency_copy.frequency, -1)
+    touched.add(frequency_copy.frequency)
+    _unindex_task(frequency_copy)
 
     if status_copy is not None:
-        temp = statuses[status_copy.status]
-        temp.detach_node(status_copy)
-        changed[status_copy.status] = True
+        statuses[status_copy.status].detach_node(status_copy)
+        touched.add(status_copy.status)
 
-    print()
-    print("Task successfully deleted.")
-    print()
+
+def delete_task(namespace):
+    """Deletes the task(s) and removes them from all lists."""
+    targets = _fetch_many_from_ld(namespace.target_task)
+    if targets is None:
+        return None
+
+    touched = set()
+    for status_copy, frequency_copy in targets:
+        _delete_copies(status_copy, frequency_copy, touched)
+    _mark_changed(touched)
+    _report(len(targets), len(targets), "Task successfully deleted.", "{done} tasks successfully deleted.")
 
 
 def change_name(namespace):
@@ -384,13 +988,9 @@ def change_name(namespace):
 
     # First the frequency copy
     freq = _pull_file(frequency_copy.frequency)
-    if new_name in freq.glossary:
-        print(f'Error: Task with name {new_name} and frequency {_prepare_frequency(frequency_copy.frequency)}'
-              f'already exists. Name change was aborted.')
-        print()
-        return False
     freq.rename_node(frequency_copy, new_name)
     _update_dltl(frequency_copy.frequency, freq)
+    _index_task(frequency_copy)
 
     # Then the status copy
     if status_copy is not None:
@@ -422,10 +1022,10 @@ def change_frequency(namespace):
     """Changes the frequency (trigger condition) of the specified task."""
 
     # Checks whether the user inputted a valid frequency
-    new_frequency = _validify_frequency(namespace.new)
-    if new_frequency is None:
+    if (parsed := _validify_task_frequency(namespace.new)) is None:
         return None
-    elif new_frequency == "all":
+    new_frequency, every = parsed
+    if new_frequency == FREQUENCY_ALL:
         print("Error: Cannot create a task with frequency 'all'.")
         print()
         return None
@@ -433,35 +1033,45 @@ def change_frequency(namespace):
     status_copy, frequency_copy = _fetch_both_copies(namespace.target_task)
     if frequency_copy is None:  # The status copy may not exist if status == "finished"
         return False
-    name, old_frequency = frequency_copy.name, frequency_copy.frequency
-
+    old_frequency = frequency_copy.frequency
+
+    if new_frequency == INTERVAL == old_frequency and every != frequency_copy.every:
+        # Only the interval changes, the task is rescheduled from today
+        temp = _pull_file(INTERVAL)
+        frequency_copy.every = every
+        temp.schedule(frequency_copy, date.today() + timedelta(every))
+        _update_dltl(INTERVAL, temp)
+        print()
+        print("Task frequency change successful.")
+        print()
+        return True
     if new_frequency == old_frequency:
         print("Error: The given task already has said frequency. Process aborted.")
         print()
         return None
 
-    if new_frequency == "once" and frequency_copy.status == "finished":
+    if new_frequency == ONCE and frequency_copy.status == "finished":
         if _change_freq_ask_user():
-            delete_task(namespace.target_task)
+            delete_task(namespace)
             return True
         else:
             return False
 
     # First the frequency copy
     freq2 = _pull_file(new_frequency)
-    if name in freq2.glossary:
-        print(
-            f'Error: Task with name {name} and frequency {_prepare_frequency(new_frequency)} already exists.'
-            f'Frequency change was aborted.')
-        print()
-        return False
-
     freq1 = _pull_file(old_frequency)
     freq1.detach_node(frequency_copy)
     frequency_copy.frequency = new_frequency
+    frequency_copy.every = frequency_copy.fires = None
     freq2.append_node(frequency_copy)
+    _count(frequency_copy.status, old_frequency, -1)
+    _count(frequency_copy.status, new_frequency, 1)
+    if every is not None:
+        frequency_copy.every = every
+        freq2.schedule(frequency_copy, date.today() + timedelta(every))
     _update_dltl(old_frequency, freq1)
     _update_dltl(new_frequency, freq2)
+    _index_task(frequency_copy)
 
     # Then the status copy
     if status_copy is not None:
@@ -469,7 +1079,7 @@ def change_frequency(namespace):
         if status_copy.status == "asleep":
             status_copy.frequency = new_frequency
         else:
-            temp.change_frequency(status_copy, new_frequency, config["ordering_key"])
+            temp.change_frequency(status_copy, new_frequency)
         changed[status_copy.status] = True
 
     print()
@@ -484,93 +1094,175 @@ def change_description(namespace):
     if frequency_copy is None:  # The status copy may not exist if status == "finished"
         return False
 
-    # First the frequency copy
-    freq = _pull_file(frequency_copy.frequency)
-    freq.change_description(frequency_copy, new_description)
-    _update_dltl(frequency_copy.frequency, freq)
-
-    # Then the status copy
-    if status_copy is not None:
-        temp = statuses[status_copy.status]
-        temp.change_description(status_copy, new_description)
-        changed[status_copy.status] = True
+    # Both copies share the stored description, so the lists themselves stay untouched
+    store = _fetch_descriptions()
+    if new_description:
+        store[frequency_copy.id] = new_description
+    else:
+        store.pop(frequency_copy.id, None)
+    changed["descriptions"] = True
+    _index_task(frequency_copy, new_description)
 
     print()
     print("Task description change successful.")
     print()
 
 
-def _change_status(task, new_status):
-    """not for user -- umbrella function -- but not for asleep"""
-    status_copy, frequency_copy = _fetch_both_copies(task)
+def tag_task(namespace):
+    """Adds tags to and removes tags from the specified task."""
+    status_copy, frequency_copy = _fetch_both_copies(namespace.target_task)
     if frequency_copy is None:  # The status copy may not exist if status == "finished"
         return False
+    added, removed = _prepare_tags(namespace.add), _prepare_tags(namespace.remove)
 
-    name, old_status = frequency_copy.name, frequency_copy.status
-    if old_status == new_status:
-        print(f'Error: The given task is already {new_status}. Aborting process.')
+    _fetch_tag_index()      # Builds the index first if necessary, so that the change is not lost
+    for tag in removed & frequency_copy.tags:
+        tag_index.remove_tag(frequency_copy.id, tag)
+    frequency_copy.tags = (frequency_copy.tags - removed) | added
+    _update_dltl(frequency_copy.frequency, _pull_file(frequency_copy.frequency))
+    _index_task(frequency_copy)
+
+    if status_copy is not None:
+        status_copy.tags = frequency_copy.tags
+        changed[status_copy.status] = True
+
+    print()
+    if frequency_copy.tags:
+        print(f'Task tags changed, the task is now tagged: {", ".join(sorted(frequency_copy.tags))}.')
+    else:
+        print("Task tags changed, the task has no tags now.")
+    print()
+
+
+_sort_keys = {"name": lambda node: node.name.casefold(),
+              "until": lambda node: (node.until is None, node.until or date.min),   # Tasks without one go last
+              "status": lambda node: ("overdue", "due", "asleep", "finished").index(node.status)}
+
+
+def _fetch_sortable_list(frequency, status):
+    """Not meant for the end user. Returns the list that the sorting commands work on (the frequency list, or its
+    member of the given status group) along with its name in 'changed'. Returns None, None if there is no such list."""
+    frequency = _validify_frequency(frequency)
+    if frequency is None:
+        return None, None
+    if frequency == FREQUENCY_ALL:
+        print("Error: Only the tasks of a single frequency can be sorted. Aborting process.")
         print()
-        return False
-    if name in statuses[new_status].glossary:
-        print(
-            f'Error: Task with name {name} and status {new_status} already exists.'
-            f'Aborting process.')
+        return None, None
+    if status is None:
+        return _pull_file(frequency), frequency
+
+    if status == "finished_today":
+        status = "finished"
+    target = statuses[status].members.get(frequency)
+    if target is None:
+        print("The chosen list is empty.")
+        print()
+        return None, None
+    return target, status
+
+
+def sort_list(namespace):
+    """Sorts the tasks of the given frequency (optionally only those in the given status list) by the given key."""
+    target, name = _fetch_sortable_list(namespace.frequency, namespace.status)
+    if target is None:
+        return None
+    target.sort_by(_sort_keys[namespace.by], namespace.reverse)
+    changed[name] = True
+    print(f'Tasks sorted by {namespace.by}.')
+    print()
+
+
+def reorder(namespace):
+    """Moves the tasks at the given positions of the list to its start, in the given order."""
+    target, name = _fetch_sortable_list(namespace.frequency, namespace.status)
+    if target is None:
+        return None
+    if target.reorder(namespace.positions) is None:
         print()
+        return None
+    changed[name] = True
+    print("Tasks reordered.")
+    print()
+
+
+def _change_status_of_copies(status_copy, frequency_copy, new_status, touched):
+    """Not meant for the end user. Changes the status of both copies of the task (but not into 'asleep') and records
+    the altered lists. Returns True on success."""
+    name, old_status = frequency_copy.name, frequency_copy.status
+    if old_status == new_status:
+        print(f'Error: The task {name} is already {new_status}. Skipping it.')
         return False
 
     # First the frequency copy
-    freq = _pull_file(frequency_copy.frequency)
-    freq.change_status(frequency_copy, new_status)
+    _set_status(_pull_file(frequency_copy.frequency), frequency_copy, new_status)
     frequency_copy.until = None     # It cannot change into a sleeper, so in case it is changing from being one
-    _update_dltl(frequency_copy.frequency, freq)
+    touched.add(frequency_copy.frequency)
 
     # Then the status copy
     if status_copy is not None:
-        temp = statuses[old_status]
-        temp.detach_node(status_copy)
-        changed[old_status] = True
-    status_copy = dltl.TaskNode(name, frequency_copy.frequency, frequency_copy.description, new_status)
-    statuses[new_status].append_node(status_copy, config["ordering_key"])
-    changed[new_status] = True
+        statuses[old_status].detach_node(status_copy)
+        touched.add(old_status)
+    status_copy = dltl.TaskNode(name, frequency_copy.frequency, new_status, task_id=frequency_copy.id,
+                                tags=frequency_copy.tags)
+    statuses[new_status].append_node(status_copy)
+    touched.add(new_status)
+    if new_status == "finished":
+        _record_event(frequency_copy, history.FINISHED)
+    elif new_status == "overdue":
+        _record_event(frequency_copy, history.OVERDUE)
+    return True
 
-    print()
-    print("Task status change successful.")
-    print()
+
+def _change_status(task, new_status):
+    """Not meant for the end user. Umbrella function for changing the status of the targeted task(s), but not into
+    'asleep'."""
+    targets = _fetch_many_from_ld(task)
+    if targets is None:
+        return False
+
+    touched = set()
+    done = sum(_change_status_of_copies(status_copy, frequency_copy, new_status, touched)
+               for status_copy, frequency_copy in targets)
+    _mark_changed(touched)
+    _report(done, len(targets), "Task status change successful.", f'{{done}} of {{total}} tasks are now {new_status}.')
 
 
 def set_asleep(namespace):
-    """Sets the task to 'sleep' making become due on a specific day.
-    Note: this makes it ignore its normal trigger condition."""
-    status_copy, frequency_copy = _fetch_both_copies(namespace.target_task)
-    if frequency_copy is None:  # The status copy may not exist if status == "finished"
+    """Sets the task(s) to 'sleep' making them become due on a specific day.
+    Note: this makes them ignore their normal trigger condition."""
+    targets = _fetch_many_from_ld(namespace.target_task)
+    if targets is None:
         return False
 
-    if frequency_copy.name in asleep.glossary:
-        print(
-            f'Error: Task with name {frequency_copy.name} and status "asleep" already exists.'
-            f'Aborting process.')
+    valid = []
+    for status_copy, frequency_copy in targets:
+        if frequency_copy.status == "asleep":
+            print(f'Error: The task {frequency_copy.name} is already asleep. Skipping it.')
+        else:
+            valid.append((status_copy, frequency_copy))
+    if not valid:
         print()
         return False
 
-    frequency_copy.until = _set_until_date()
-
-    # First the frequency copy
-    freq = _pull_file(frequency_copy.frequency)
-    freq.change_status(frequency_copy, "asleep")
-    _update_dltl(frequency_copy.frequency, freq)
-
-    # Then the status copy
-    if status_copy is not None:
-        temp = statuses[status_copy.status]
-        temp.detach_node(status_copy)
-        changed[status_copy.status] = True
-    status_copy = dltl.TaskNode(frequency_copy.name, frequency_copy.frequency, frequency_copy.description, "asleep", frequency_copy.until)
-    asleep.add_sleeper(status_copy)
-    changed["asleep"] = True
-
-    print()
-    print("Task was successfully set asleep.")
-    print()
+    until = _set_until_date()       # Asked only once for all the targeted tasks
+    touched = {"asleep"}
+    for status_copy, frequency_copy in valid:
+        # First the frequency copy
+        frequency_copy.until = until
+        _set_status(_pull_file(frequency_copy.frequency), frequency_copy, "asleep")
+        touched.add(frequency_copy.frequency)
+
+        # Then the status copy
+        if status_copy is not None:
+            statuses[status_copy.status].detach_node(status_copy)
+            touched.add(status_copy.status)
+        status_copy = dltl.TaskNode(frequency_copy.name, frequency_copy.frequency, "asleep", until,
+                                    frequency_copy.id, frequency_copy.tags)
+        asleep.add_sleeper(status_copy)
+    _mark_changed(touched)
+    _report(len(valid), len(targets), "Task was successfully set asleep.",
+            "{done} of {total} tasks were successfully set asleep.")
 
 
 def renew(namespace):
@@ -584,18 +1276,31 @@ def mark_as_overdue(namespace):
 
 
 def finish(namespace):
-    """Sets a task's status to 'finished', marking its completion and taking it off the agenda. NOTE: finishing
-    a 'once' task will automatically remove it."""
-    node = _fetch_from_ld(namespace.target_task)
-    if node is None:
+    """Sets the status of the task(s) to 'finished', marking their completion and taking them off the agenda.
+    NOTE: finishing a 'once' task will automatically remove it."""
+    targets = _fetch_many_from_ld(namespace.target_task)
+    if targets is None:
         return None
-    if node.frequency == "once":
-        delete_task(namespace)
+
+    touched = set()
+    done = once = 0
+    for status_copy, frequency_copy in targets:
+        if frequency_copy.frequency == ONCE:
+            _record_event(frequency_copy, history.FINISHED)
+            _delete_copies(status_copy, frequency_copy, touched)
+            done += 1
+            once += 1
+        else:
+            done += _change_status_of_copies(status_copy, frequency_copy, "finished", touched)
+    _mark_changed(touched)
+
+    if len(targets) == 1 and once:
         print()
         print("A once task was finished. Keep up the good work!")
         print()
     else:
-        _change_status(namespace.target_task, "finished")
+        _report(done, len(targets), "Task status change successful.",
+                "{done} of {total} tasks finished. Keep up the good work!")
 
 
 def _prepare_description(task_description):
@@ -612,10 +1317,21 @@ def description(namespace):
 
     print(f'Task {task.name} description:')
     print()
-    print(_prepare_description(task.description))
+    print(_prepare_description(_description_of(task)))
     print()
 
 
+def _describe_frequency(task):
+    """Not meant for the end user. Returns the frequency of the task for displaying, with the interval and the next
+    trigger date for interval tasks."""
+    if task.frequency != INTERVAL:
+        return _prepare_frequency(task.frequency)
+    frequency_copy = _pull_file(INTERVAL).glossary.get(task.id)
+    if frequency_copy is None:      # A finished copy left behind by a frequency change
+        return _prepare_frequency(INTERVAL)
+    return f'every {frequency_copy.every} days, next on {frequency_copy.fires}'
+
+
 def detail(namespace):
     """Displays all information about the task."""
     task = _fetch_from_ld(namespace.target_task)
@@ -623,13 +1339,284 @@ def detail(namespace):
         return None
 
     print()
-    print("Task name:", task.name, "", "Task frequency:", task.frequency, "",
-          "Task description:", _prepare_description(task.description), "", "Task status:", task.status, "",
+    print("Task name:", task.name, "", "Task frequency:", _describe_frequency(task), "",
+          "Task description:", _prepare_description(_description_of(task)), "", "Task status:", task.status, "",
           "Task wake-up date:", task.until, sep="\n")
     print()
     print()
 
 
+def search(namespace):
+    """Displays the tasks whose name or description contain the searched words, best matches first."""
+    query = ' '.join(namespace.query)
+    results = _fetch_search_index().search(query, namespace.limit)
+    if not results:
+        print(f'No tasks match "{query}".')
+        print()
+        return None
+
+    for i, (_, name, frequency) in enumerate(results, 1):
+        print(f'{i})   {name}   ({_prepare_frequency(frequency)})')
+    print()
+    print("To access a found task, display the list of its frequency.")
+    print()
+
+
+_query_aliases = {"weekdays": range(WEEK_BASE + 1, WEEK_BASE + 6), "weekend": range(WEEK_BASE + 6, MONTH_BASE + 1),
+                  "week": range(WEEK_BASE + 1, MONTH_BASE + 1), "months": range(MONTH_BASE + 1, SEASON_BASE + 1),
+                  "seasons": range(SEASON_BASE + 1, SEASON_BASE + 5), "ordinary": range(ONCE, YEARLY + 1)}
+_UNLOADED_LIST_COST = 1000      # The estimated overhead of loading a list from its file, in visited tasks
+
+
+def _parse_query_frequencies(value):
+    """Not meant for the end user. Parses a comma separated list of frequencies, aliases (see _query_aliases),
+    'dates' and date ranges ('MM-DD..MM-DD', resolved through the ordered list of dates)."""
+    frequencies = set()
+    for part in value.casefold().split(","):
+        if part in _query_aliases:
+            frequencies.update(_query_aliases[part])
+        elif part == "dates":
+            frequencies.update(dates)
+        elif ".." in part:
+            start, end = (_validify_frequency(bound) for bound in part.split("..", 1))
+            if start is None or end is None or start >= 0 or end >= 0:
+                print(f'Error: "{part}" is not a valid range of dates. Aborting process.')
+                print()
+                return None
+            frequencies.update(dates[bisect_left(dates, start):bisect_right(dates, end)])
+        elif (frequency := _validify_frequency(part)) is None or frequency == FREQUENCY_ALL:
+            return None
+        else:
+            frequencies.add(frequency)
+    return frequencies
+
+
+def _parse_query_date(value):
+    """Not meant for the end user. Parses 'today', a number of days relative to today ('+7', '-1') or a date in
+    the format YYYY-MM-DD."""
+    if value == "today":
+        return date.today()
+    if value[:1] in ("+", "-") and value[1:].isdigit():
+        return date.today() + timedelta(int(value))
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        print(f'Error: "{value}" is not a date in the format YYYY-MM-DD, nor a number of days like "+7". '
+              f'Aborting process.')
+        print()
+        return None
+
+
+def _parse_query(terms):
+    """Not meant for the end user. Parses the terms of a query (see the query command) into a dictionary of
+    constraints. Returns None if a term is not valid."""
+    query = {"frequencies": None, "statuses": None, "low": None, "high": None, "name": None, "tags": None}
+    for term in terms:
+        match = re.fullmatch(r"(\w+)(<=|>=|=|<|>)(.+)", term)
+        if match is None:
+            print(f'Error: Did not understand the query term "{term}". Aborting process.')
+            print()
+            return None
+        key, operator, value = match[1].casefold(), match[2], match[3]
+
+        if key in ("freq", "frequency") and operator == "=":
+            query["frequencies"] = _parse_query_frequencies(value)
+            if query["frequencies"] is None:
+                return None
+        elif key == "status" and operator == "=":
+            query["statuses"] = set(value.casefold().split(","))
+            if not query["statuses"] <= {"due", "overdue", "asleep", "finished"}:
+                print(f'Error: "{value}" contains an unknown status. Aborting process.')
+                print()
+                return None
+        elif key == "until":
+            if (day := _parse_query_date(value)) is None:
+                return None
+            if operator in ("<", "<=", "="):
+                query["high"] = day - timedelta(1) if operator == "<" else day
+            if operator in (">", ">=", "="):
+                query["low"] = day + timedelta(1) if operator == ">" else day
+        elif key == "name" and operator == "=":
+            query["name"] = value.replace("_", " ")
+        elif key == "tags" and operator == "=":
+            query["tags"] = _fetch_tag_index().evaluate(value)
+        else:
+            print(f'Error: Did not understand the query term "{term}". Aborting process.')
+            print()
+            return None
+    return query
+
+
+def _matches_query(node, query):
+    """Not meant for the end user. Checks a task node against all the constraints of the query."""
+    if query["frequencies"] is not None and node.frequency not in query["frequencies"]:
+        return False
+    if query["statuses"] is not None and node.status not in query["statuses"]:
+        return False
+    if query["low"] is not None or query["high"] is not None:
+        if node.until is None:
+            return False
+        if query["low"] is not None and node.until < query["low"]:
+            return False
+        if query["high"] is not None and node.until > query["high"]:
+            return False
+    if query["tags"] is not None and not indexes.TagIndex.contains(query["tags"], node.id):
+        return False
+    return query["name"] is None or fnmatchcase(node.name, query["name"])
+
+
+def _plan_query(query):
+    """Not meant for the end user. Estimates the cost (in visited tasks) of every way of finding the candidates for
+    the query and picks the cheapest one. Returns its cost, its description, a function producing a fresh stream
+    of the candidates and a function returning the lists the stream reads."""
+    frequencies, wanted = query["frequencies"], query["statuses"]
+    prefix = re.split(r"[*?\[]", query["name"])[0] if query["name"] is not None else ""
+    plans = []
+
+    # 1) The sleepers, ordered by their wake-up date
+    if (wanted is not None and wanted <= {"asleep"}) or query["low"] is not None or query["high"] is not None:
+        plans.append((asleep.size, "the sleepers, ordered by their wake-up date",
+                      lambda: asleep.iter_waking(query["low"], query["high"]), lambda: [asleep]))
+        if prefix:
+            plans.append((asleep.prefix_index.count_with_prefix(prefix), f'the sleepers starting with "{prefix}"',
+                          lambda: (asleep.glossary[task_id]
+                                   for _, task_id in asleep.prefix_index.fetch_with_prefix(prefix)),
+                          lambda: [asleep]))
+
+    # 2) The due and overdue groups, only the members of the wanted frequencies
+    if wanted is not None and wanted <= {"due", "overdue"}:
+        names = sorted(wanted, reverse=True)     # Overdue first
+        chosen = [statuses[status] for status in names]
+
+        def by_members():
+            for group in chosen:
+                for frequency in list(group.ordering):
+                    if frequencies is None or frequency in frequencies:
+                        yield from group.members[frequency]
+
+        cost = sum(member.size for group in chosen for frequency, member in group.members.items()
+                   if frequencies is None or frequency in frequencies)
+        plans.append((cost, f'the {" and ".join(names)} task lists', by_members, lambda: chosen))
+        if prefix:
+            plans.append((sum(group.prefix_index.count_with_prefix(prefix) for group in chosen),
+                          f'the {" and ".join(names)} tasks starting with "{prefix}"',
+                          lambda: (group.glossary[task_id] for group in chosen
+                                   for _, task_id in group.prefix_index.fetch_with_prefix(prefix)),
+                          lambda: chosen))
+
+    # 3) The frequency lists, which hold every task (loaded only once the stream gets to them)
+    targets = list(_all_frequencies()) if frequencies is None else sorted(frequencies)
+    targets = [frequency for frequency in targets
+               if frequency in in_memory or storage.exists(_frequency_name(frequency))]
+    cost = 0
+    for frequency in targets:
+        if frequency not in in_memory:
+            cost += _UNLOADED_LIST_COST + (storage.size_of(_frequency_name(frequency)) or 0)
+        elif prefix:
+            cost += in_memory[frequency].prefix_index.count_with_prefix(prefix)
+        else:
+            cost += in_memory[frequency].size
+
+    def by_frequency():
+        for frequency in targets:
+            temp = _pull_file(frequency, promote=False)
+            if prefix:
+                yield from (temp.glossary[task_id] for _, task_id in temp.prefix_index.fetch_with_prefix(prefix))
+            else:
+                yield from temp
+
+    plans.append((cost, f'{len(targets)} frequency list(s)', by_frequency,
+                  lambda: [in_memory[frequency] for frequency in targets if frequency in in_memory]))
+
+    return min(plans, key=lambda plan: plan[0])
+
+
+def query_tasks(namespace):
+    """Displays the tasks matching all the given constraints, e.g. 'status=asleep until<=+7 freq=weekdays'.
+    The tasks are found in the cheapest available way and displayed as they are found."""
+    query = _parse_query(namespace.terms)
+    if query is None:
+        return None
+    cost, plan, candidates, sources = _plan_query(query)
+    if namespace.explain:
+        print(f'Plan: reading {plan}, estimated to visit {cost} tasks.')
+        print()
+
+    _display_stream(lambda: (node for node in candidates() if _matches_query(node, query)), sources, 0,
+                    namespace.limit)
+
+
+def _display_stream(stream, sources, offset=0, limit=None):
+    """Not meant for the end user. Displays (a page of) the tasks produced by the stream as they come, along with
+    their frequency and status, and makes them the last_displayed list. 'sources' returns the lists the stream
+    read from."""
+    i = offset
+    for i, node in enumerate(islice(stream(), offset, None if limit is None else offset + limit), offset + 1):
+        until = "" if node.until is None else f', until {node.until}'
+        print(f'{i})   {node.name}   ({_prepare_frequency(node.frequency)}, {node.status}{until})')
+
+    global last_displayed, ld_origin
+    last_displayed, ld_origin = dltl.DisplayedView(sources(), i, stream=stream), "query"
+    print()
+    if i == offset:
+        print("No tasks to display.")
+    else:
+        print("And that is all.")
+    print()
+
+
+def _display_tagged(expression, candidates, sources, offset=0, limit=None):
+    """Not meant for the end user. Displays (a page of) the candidate tasks which match the tag expression (see
+    indexes.TagIndex.evaluate)."""
+    mask = _fetch_tag_index().evaluate(expression)
+    _display_stream(lambda: (node for node in candidates() if indexes.TagIndex.contains(mask, node.id)), sources,
+                    offset, limit)
+
+
+def _group_stream(*chosen):
+    """Not meant for the end user. Returns a function producing a stream of the tasks in the given groups, in the
+    order they are displayed in."""
+    def stream():
+        for group in chosen:
+            yield from group
+    return stream
+
+
+def _frequency_lists_stream(status=None):
+    """Not meant for the end user. Returns a function producing a stream of the tasks (optionally only those of the
+    given status) in all frequency lists, loading them as it goes."""
+    def stream():
+        for frequency in _stored_frequencies():
+            yield from _pull_file(frequency, promote=False).iter_filtered(status)
+    return stream
+
+
+def _loaded_frequency_lists():
+    return [in_memory[frequency] for frequency in _all_frequencies() if frequency in in_memory]
+
+
+def export(namespace):
+    """Exports all tasks (optionally only those matching a tag expression) into a CSV file."""
+    mask = None if namespace.tags is None else _fetch_tag_index().evaluate(namespace.tags)
+    exported = 0
+    try:
+        with open(namespace.file_name, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "name", "frequency", "status", "until", "tags", "description"])
+            for node in _frequency_lists_stream()():
+                if mask is None or indexes.TagIndex.contains(mask, node.id):
+                    writer.writerow([node.id, node.name, _prepare_frequency(node.frequency), node.status,
+                                     node.until or "", " ".join(sorted(node.tags)), _description_of(node)])
+                    exported += 1
+    except OSError as e:
+        print(f'Error: Could not write into the file -- reason: {e}. Aborting process.')
+        print()
+        return None
+
+    print(f'{exported} task(s) exported into {namespace.file_name}.')
+    print()
+
+
 def _display_all_warning():
     print("You are about to tasks from all lists currently logged by the program. "
           "Please note that this may be demanding on your device AND that this display is view only, meaning "
@@ -646,46 +1633,44 @@ def _display_all_warning():
         return _display_all_warning()
 
 
-def display_all(namespace):
-    """Displays all (optionally only finished) tasks currently logged by the programme.
-    Please note that this may be demanding on your device."""
-    if _display_all_warning() is False:
-        return False
+def _all_frequencies():
+    """Not meant for the end user. Yields all the frequencies which can have a task list, in the display order."""
+    yield from range(ONCE, INTERVAL + 1)
+    # yield from counting
+    yield from dates
+
+
+def _stored_frequencies():
+    """Not meant for the end user. Yields the frequencies which have a task list (saved or in memory), in the display
+    order. Unlike _all_frequencies(), it only consults the storage manifest, so no empty lists are created."""
+    for frequency in _all_frequencies():
+        if frequency in in_memory or storage.exists(_frequency_name(frequency)):
+            yield frequency
 
-    # Sorting out argparse or internal caller
-    if namespace is True or namespace is False:
-        finished = namespace
-    else:
-        finished = namespace.finished
+
+def _display_all(finished, offset=0, limit=None, tags=None):
+    """Not meant for the end user. Displays all (optionally only finished, optionally only matching the tag
+    expression) tasks, or only a page of them. Once the page is filled, the remaining lists are not even loaded."""
+    if limit is None and _display_all_warning() is False:
+        return False
+    if tags is not None:
+        return _display_tagged(tags, _frequency_lists_stream("finished" if finished else None),
+                               _loaded_frequency_lists, offset, limit)
 
     global last_displayed, ld_origin
     last_displayed, ld_origin = None, "unsupported"
 
+    first, last = offset + 1, (None if limit is None else offset + limit)
     i = 1
-    for frequency in ordinary.values():
-        print(frequency)
-        print()
-        i = _pull_file(frequency).display_alongside_others(finished, i)
-    for frequency in week.values():
-        print(frequency)
-        print()
-        i = _pull_file(frequency).display_alongside_others(finished, i)
-    for frequency in months.values():
-        print(frequency)
-        print()
-        i = _pull_file(frequency).display_alongside_others(finished, i)
-    for frequency in seasons.values():
-        print(frequency)
-        print()
-        i = _pull_file(frequency).display_alongside_others(finished, i)
-    # for frequency in counting:
-    #    print(frequency)
-    #   print()
-    #  i = _pull_file(frequency).display_alongside_others(finished, i)
-    for frequency in dates:
-        print(f'{frequency.month}-{frequency.day}')
-        print()
-        i = _pull_file(frequency).display_alongside_others(finished, i)
+    for frequency in _stored_frequencies():
+        if last is not None and i > last:
+            break
+        size = None if finished or frequency in in_memory else storage.size_of(_frequency_name(frequency))
+        if size is not None and i + size <= first:
+            i += size       # The list is entirely in front of the page, so it does not have to be loaded
+            continue
+        temp = _pull_file(frequency, promote=False)
+        i = temp.display_alongside_others(finished, i, first, last, _prepare_frequency(frequency))
 
     print()
     print()
@@ -694,47 +1679,68 @@ def display_all(namespace):
             print("You have no finished tasks.")
         else:
             print("You have no tasks. Consider making some!")
+    elif i <= first:
+        print("There are no more tasks to display.")
     else:
         print("And that is all.")
     print()
     print()
 
 
-def display_list(frequency, status):
-    """Displays all tasks (their names) of the specified frequency and status."""
+def display_all(namespace):
+    """Displays all (optionally only finished) tasks currently logged by the programme.
+    Please note that this may be demanding on your device, unless only a page of them is displayed."""
+    _remember_page(namespace, namespace.offset, namespace.limit)
+    _display_all(namespace.finished, namespace.offset, namespace.limit, namespace.tags)
+
+
+def display_list(frequency, status, offset=0, limit=None, tags=None):
+    """Displays all tasks (their names) of the specified frequency and status, or only a page of them. Optionally
+    displays only the tasks matching the tag expression."""
     frequency = _validify_frequency(frequency)
     if frequency is None:
         return None
 
     global last_displayed, ld_origin
 
-    if frequency == "all":
+    if frequency == FREQUENCY_ALL:
         # Asleep is a special case
-        if status == "asleep":
-            last_displayed = asleep.display_task_names()
+        if status == "asleep" and tags is not None:
+            _display_tagged(tags, lambda: iter(asleep), lambda: [asleep], offset, limit)
+        elif status == "asleep":
+            last_displayed = dltl.DisplayedView([asleep], asleep.display_task_names(offset, limit))
             ld_origin = "asleep"
 
         # All and finished are the other special case
         elif status == "all":
-            display_all(False)
+            _display_all(False, offset, limit, tags)
         elif status == "finished":
-            display_all(True)
+            _display_all(True, offset, limit, tags)
 
         # All tasks from a DLTL group
         else:
             if status == "finished_today":
                 status = "finished"
-            last_displayed = statuses[status].display_task_names()
+            if tags is not None:
+                return _display_tagged(tags, _group_stream(statuses[status]), lambda: [statuses[status]], offset,
+                                       limit)
+            target = statuses[status]
+            last_displayed = dltl.DisplayedView([target],
+                                                target.display_task_names(offset, limit, title=_prepare_frequency))
             ld_origin = status
 
+    elif tags is not None and status in ("all", "asleep", "finished"):
+        temp = _pull_file(frequency)
+        return _display_tagged(tags, lambda: temp.iter_filtered(None if status == "all" else status),
+                               lambda: [temp], offset, limit)
     elif status == "all":
-        last_displayed = _pull_file(frequency).display_task_names()
-        ld_origin = frequency
-    elif status == "asleep":
-        last_displayed = _pull_file(frequency).display_task_names_conditional("asleep")
+        temp = _pull_file(frequency)
+        last_displayed = dltl.DisplayedView([temp], temp.display_task_names(offset, limit))
         ld_origin = frequency
-    elif status == "finished":
-        last_displayed = _pull_file(frequency).display_task_names_conditional("finished")
+    elif status == "asleep" or status == "finished":
+        temp = _pull_file(frequency)
+        last_displayed = dltl.DisplayedView([temp], temp.display_task_names_conditional(status, offset, limit),
+                                            status)
         ld_origin = frequency
     else:
         if status == "finished_today":
@@ -744,7 +1750,9 @@ def display_list(frequency, status):
             print("The chosen list is empty.")
             print()
             return None
-        last_displayed = target.display_task_names([None] * target.size)
+        if tags is not None:
+            return _display_tagged(tags, lambda: iter(target), lambda: [statuses[status]], offset, limit)
+        last_displayed = dltl.DisplayedView([target], target.display_task_names(offset, limit))
         ld_origin = status
 
     print()
@@ -753,95 +1761,135 @@ def display_list(frequency, status):
 
 
 def to_do(namespace):
-    """Displays all tasks on today's agenda."""
+    """Displays all tasks on today's agenda, or only a page of them. With --top, displays only the given number of
+    highest-priority tasks (overdue ones first)."""
+    offset, limit = namespace.offset, namespace.limit
+    if namespace.top is not None:
+        offset, limit = 0, namespace.top
+    _remember_page(namespace, offset, limit)
 
     if (size := (overdue.size + due.size)) == 0:
         print("You have finished all your tasks. Congratulations!")
         print()
         return
+    if namespace.tags is not None:
+        return _display_tagged(namespace.tags, _group_stream(overdue, due), lambda: [overdue, due], offset, limit)
     global last_displayed, ld_origin
-    last_displayed = [None] * size
+    end = size if limit is None else min(size, offset + limit)
+    last_displayed = dltl.DisplayedView([overdue, due], end)
     ld_origin = "to_do"
 
-    initial_index = 1
+    # The pages are cut out of the overdue and due groups as if they were one list
+    over = overdue.size
     print("---- overdue ----")
     print()
-    for frequency in overdue.ordering:
-        target = overdue.members.get(frequency)
-        if target is None:
-            continue
-        print(frequency, ":", sep="")
-        last_displayed, initial_index = target.display_task_names(last_displayed, initial_index)
-        print()
+    if offset < over:
+        overdue.display_task_names(offset, min(end, over) - offset, title=_prepare_frequency)
     print()
     print("---- due ----")
     print()
-    for frequency in due.ordering:
-        target = due.members.get(frequency)
-        if target is None:
-            continue
-        print(frequency, ":", sep="")
-        last_displayed, initial_index = target.display_task_names(last_displayed, initial_index)
-        print()
-    print("And that is all.")
+    if end > over:
+        due.display_task_names(max(offset - over, 0), end - max(offset, over), over + 1, _prepare_frequency)
+    if offset >= size:
+        print("There are no more tasks to display.")
+    else:
+        print("And that is all.")
     print()
     print()
 
 
+def _remember_page(namespace, offset, limit):
+    """Not meant for the end user. Remembers the displayed page (if any), so that next_page can continue after it."""
+    global page_cursor
+    if limit is None:
+        page_cursor = None
+    else:
+        page_cursor = namespace, offset + limit, limit
+
+
+def next_page(namespace):
+    """Displays the next page of the last display that was limited to a page."""
+    if page_cursor is None:
+        print("Error: Please display a list with a --limit (or --top) first.")
+        print()
+        return None
+    previous, offset, limit = page_cursor
+    previous.offset, previous.limit = offset, limit
+    if "top" in previous:
+        previous.top = None
+    previous.func(previous)
+
+
 def display_list_argparse(namespace):
-    display_list(namespace.frequency, namespace.status)
+    _remember_page(namespace, namespace.offset, namespace.limit)
+    display_list(namespace.frequency, namespace.status, namespace.offset, namespace.limit, namespace.tags)
 
 
 def display_status_list(namespace):
     """Not meant for the end user. Receives a command from argparse and converts it into the appropriate call
     to the display_list() function."""
+    _remember_page(namespace, namespace.offset, namespace.limit)
     if namespace.command == "due":
-        display_list("all", "due")
+        display_list("all", "due", namespace.offset, namespace.limit, namespace.tags)
     elif namespace.command == "overdue":
-        display_list("all", "overdue")
+        display_list("all", "overdue", namespace.offset, namespace.limit, namespace.tags)
     elif namespace.command == "asleep":
-        display_list("all", "asleep")
+        display_list("all", "asleep", namespace.offset, namespace.limit, namespace.tags)
     else:
-        display_list("all", "finished_today")
+        display_list("all", "finished_today", namespace.offset, namespace.limit, namespace.tags)
 
 
 def _refresh_frequency(frequency):
+    if frequency not in in_memory and not storage.exists(_frequency_name(frequency)):
+        return None     # There is no such list, nothing to refresh
     temp = _pull_file(frequency)
-    current = temp.head
-    while current is not None:
-        if current.status == "due":
-            node = due.detach_node_by_name(current.name)
-            node.status = current.status = "overdue"
-            if current.name in overdue.glossary:
-                node.name = current.name = f'{current.name} -- name collision prevention triggered {datetime.now()}'
-            overdue.append_node(node, config["ordering_key"])
-        elif current.status == "finished":
-            if current.name in due.glossary:
-                current.name = f'{current.name} -- name collision prevention triggered {datetime.now()}'
-            due.append_node(dltl.TaskNode(current.name, current.frequency, current.description, "due"),
-                            config["ordering_key"])
-            current.status = "due"
-        current = current.next
+    for current in temp:
+        _refresh_task(temp, current)
     _update_dltl(frequency, temp)
     # changed["due"] = changed["overdue"] = True -- We do this at the refresh to_do level, otherwise we would do it here
 
 
+def _refresh_task(temp, current):
+    """Not meant for the end user. Triggers the task (from the given frequency list): a due task becomes overdue and
+    a finished task becomes due again."""
+    if current.status == "due":
+        node = due.detach_node_by_id(current.id)
+        node.status = "overdue"
+        _set_status(temp, current, "overdue")
+        _record_event(current, history.OVERDUE)
+        overdue.append_node(node)
+    elif current.status == "finished":
+        due.append_node(dltl.TaskNode(current.name, current.frequency, "due", task_id=current.id,
+                                      tags=current.tags))
+        _set_status(temp, current, "due")
+
+
+def _fire_intervals(today):
+    """Not meant for the end user. Triggers the interval tasks whose trigger date has come (once, even if several of
+    their intervals have passed since) and schedules their next trigger. Only the triggered tasks are visited."""
+    if INTERVAL not in in_memory and not storage.exists(_frequency_name(INTERVAL)):
+        return None
+    temp = _pull_file(INTERVAL)
+    fired = temp.pop_fired(today)
+    for fires, node in fired:
+        _refresh_task(temp, node)
+        temp.schedule(node, fires + timedelta(((today - fires).days // node.every + 1) * node.every))
+    if fired:
+        _update_dltl(INTERVAL, temp)
+
+
 def _wake_up_sleepers(end_date):
     """Wakes up all sleepers whose wake-up ('until') date is before the end_date (included)
     and appends them to due."""
     while asleep.head is not None and asleep.head.until <= end_date:
         status_copy = asleep.wake_up_head()
         temp = _pull_file(status_copy.frequency)
-        frequency_copy = temp.fetch_node(status_copy.name)
-
-        # Prevent name collision
-        if status_copy.name in due.glossary:
-            status_copy.name = frequency_copy.name = f'{status_copy.name} -- name collision prevention triggered {datetime.now()}'
-
-        status_copy.status = frequency_copy.status = "due"
+        frequency_copy = temp.fetch_node(status_copy.id)
+        status_copy.status = "due"
+        _set_status(temp, frequency_copy, "due")
         status_copy.until = frequency_copy.until = None
 
-        due.append_node(status_copy, config["ordering_key"])
+        due.append_node(status_copy)
         _update_dltl(frequency_copy.frequency, temp)        # we update asleep and due in the caller
 
 
@@ -874,37 +1922,36 @@ def refresh_to_do(namespace):
         print()
         return
 
-    global finished_today
     refresh_year, refresh_week, refresh_weekday = config["last_refresh"].isocalendar()
     refresh_month, refresh_season = config["last_refresh"].month, _get_season(config["last_refresh"])
     today_year, today_week, today_weekday = today.isocalendar()
     today_month, today_season = today.month, _get_season(today)
 
     if today_year != refresh_year:
-        _refresh_frequency("yearly")
+        _refresh_frequency(YEARLY)
         for i in range(refresh_season + 1, 6):
-            _refresh_frequency(seasons[i // 4])     # Refresh all season up to that year's second winter included
+            _refresh_frequency(_season_code(i % 4))     # Refresh all season up to that year's second winter included
         for i in range(1, min(today_season, refresh_season) + 1):
-            _refresh_frequency(seasons[i // 4])
+            _refresh_frequency(_season_code(i % 4))
 
         if not (refresh_season == 5 and today_season == 1):
-            _refresh_frequency("seasonally")
+            _refresh_frequency(SEASONALLY)
 
-        _refresh_frequency("monthly")
+        _refresh_frequency(MONTHLY)
         for i in range(refresh_month + 1, 13):
-            _refresh_frequency(months[i])
+            _refresh_frequency(MONTH_BASE + i)
         for i in range(1, min(today_month, refresh_month) + 1):
-            _refresh_frequency(months[i])
+            _refresh_frequency(MONTH_BASE + i)
 
-        _refresh_frequency("weekly")
+        _refresh_frequency(WEEKLY)
         for i in range(refresh_weekday + 1, 8):
-            _refresh_frequency(week[i])
+            _refresh_frequency(WEEK_BASE + i)
         for i in range(1, min(today_weekday, refresh_weekday) + 1):
-            _refresh_frequency(week[i])
+            _refresh_frequency(WEEK_BASE + i)
 
         # And lastly the applicable dates
-        check1 = date(2020, today_month, today.day)
-        check2 = date(2020, refresh_month, config["last_refresh"].day)
+        check1 = _date_code(today_month, today.day)
+        check2 = _date_code(refresh_month, config["last_refresh"].day)
         for i in range(len(dates)):
             date_ = dates[i]
             if date_ <= check1 or date_ > check2:
@@ -914,29 +1961,29 @@ def refresh_to_do(namespace):
     # The year is the same
     else:
         if refresh_season != today_season:
-            _refresh_frequency("seasonally")
+            _refresh_frequency(SEASONALLY)
             for i in range(refresh_season + 1, today_season + 1):
-                _refresh_frequency(seasons[i // 4])       # A trick using the differentiation of first and second winter
+                _refresh_frequency(_season_code(i % 4))   # A trick using the differentiation of first and second winter
 
         if refresh_month != today_month:
-            _refresh_frequency("monthly")
+            _refresh_frequency(MONTHLY)
             for i in range(refresh_month + 1, today_month + 1):
-                _refresh_frequency(months[i])
+                _refresh_frequency(MONTH_BASE + i)
 
         if refresh_week != today_week:
-            _refresh_frequency("weekly")
+            _refresh_frequency(WEEKLY)
             for i in range(refresh_weekday + 1, 8):
-                _refresh_frequency(week[i])
+                _refresh_frequency(WEEK_BASE + i)
             for i in range(1, min(today_weekday, refresh_weekday) + 1):
-                _refresh_frequency(week[i])
+                _refresh_frequency(WEEK_BASE + i)
 
         else:
             for i in range(refresh_weekday + 1, today_weekday + 1):
-                _refresh_frequency(week[i])
+                _refresh_frequency(WEEK_BASE + i)
 
         # And lastly the applicable dates
-        start = date(2020, refresh_month, config["last_refresh"].day)
-        end = date(2020, today_month, today.day)
+        start = _date_code(refresh_month, config["last_refresh"].day)
+        end = _date_code(today_month, today.day)
         for i in range(len(dates)):
             date_ = dates[i]
             if date_ > start:
@@ -946,55 +1993,355 @@ def refresh_to_do(namespace):
             i += 1
 
     # The following always triggers
-    finished_today = dltl.DLTLGroup()       # Empties it
-    _refresh_frequency("daily")
+    finished_today.clear()      # In place, so that a displayed list of the finished tasks becomes stale
+    _refresh_frequency(DAILY)
+    _fire_intervals(today)
     _wake_up_sleepers(today)
+    _demote_unused_lists()
     config["last_refresh"] = today
     changed["due"] = changed["overdue"] = changed["asleep"] = changed["finished"] = changed["config"] = True
     # That might not be the case for all, but it doesn't matter, and it is neater this way
 
     print("Tasks successfully refreshed.")
     print()
+    return True
 
 
-def change_config(namespace):
-    if namespace.auto_refresh == "true":
-        config["auto_refresh"] = True
-        print("Auto-refresh enabled.")
+def _seconds_until_midnight():
+    """Not meant for the end user. Returns the number of seconds remaining until the next local midnight."""
+    now = datetime.now()
+    return (datetime.combine(now.date() + timedelta(1), datetime.min.time()) - now).total_seconds()
+
+
+def _midnight_rollover():
+    """Not meant for the end user. Runs in the background at midnight, refreshing the to-do list so that a session
+    left open overnight does not serve yesterday's agenda. The last displayed list is forgotten, as the positions
+    the user saw yesterday no longer hold. Then schedules itself for the next midnight, even if the refresh failed
+    (the error is reported, so that the user can refresh by hand)."""
+    global last_displayed, ld_origin
+    try:
+        with state_lock:
+            print()
+            print("Midnight has passed, refreshing the to-do list.")
+            last_displayed, ld_origin = None, None
+            refresh_to_do("at_midnight")
+    except Exception as e:      # Nothing would report it from the timer thread, which would die with it
+        print(f'Error: The midnight refresh failed -- reason: {e}. Please refresh the to-do list with the '
+              f'\'refresh\' command.')
+        print()
+    finally:
+        _schedule_midnight_rollover()
+
+
+def _schedule_midnight_rollover():
+    """Not meant for the end user. (Re)schedules the midnight refresh if auto-refresh is enabled. The timer sleeps
+    until midnight, so there is no polling involved."""
+    global _midnight_timer
+    if _midnight_timer is not None:
+        _midnight_timer.cancel()
+        _midnight_timer = None
+    if config["auto_refresh"]:
+        # The extra second makes sure the system date has already changed when the timer goes off
+        _midnight_timer = threading.Timer(_seconds_until_midnight() + 1, _midnight_rollover)
+        _midnight_timer.daemon = True
+        _midnight_timer.start()
+
+
+def storage_report(namespace):
+    """Displays how much disk space the saved lists take up and how long they take to load, for each storage tier."""
+    report = storage.measure()
+    print()
+    print("Saved lists by storage tier (unsaved changes are not included):")
+    for tier, (count, size, seconds) in report.items():
+        average = seconds / count * 1000 if count else 0
+        print(f'{tier.capitalize():>5}: {count} files, {size / 1024:.1f} KiB on the disk, '
+              f'{seconds * 1000:.2f} ms to load ({average:.2f} ms per file)')
+    print()
+
+    reads, read_size, read_time, writes, written_size, write_time, synced = storage.io_totals()
+    print(f'This session (including the above): read {reads} files ({read_size / 1024:.1f} KiB, '
+          f'{read_time * 1000:.1f} ms), wrote {writes} files ({written_size / 1024:.1f} KiB, {write_time * 1000:.1f} ms, '
+          f'{synced * 1000:.1f} ms of which in fsync).')
+    slowest = sorted(storage.io_stats.items(), key=lambda item: item[1][2] + item[1][5], reverse=True)[:5]
+    if slowest:
+        print("The files taking the most time:")
+        for file_name, (reads, read_size, read_time, writes, written_size, write_time, synced) in slowest:
+            print(f'    {file_name}: {reads} reads ({read_time * 1000:.1f} ms), {writes} writes '
+                  f'({write_time * 1000:.1f} ms, fsync {synced * 1000:.1f} ms), {(read_size + written_size) / 1024:.1f} '
+                  f'KiB moved')
+    if storage.slow_threshold:
+        print(f'Operations slower than {config["slow_io_threshold"]} ms are logged into {storage.SLOW_LOG}.')
+    print()
+
+
+def summary(namespace):
+    """Displays the number of tasks of each status, for every frequency (or only the given one)."""
+    if namespace.frequency is None:
+        only = None
+    elif (only := _validify_task_frequency(namespace.frequency)) is None:
+        return None
     else:
-        config["auto_refresh"] = False
-        print("Auto-refresh disabled.")
+        only = only[0]
+    counts = _fetch_counters()
+
+    rows = {}
+    for (status, frequency), count in counts.items():
+        if only in (None, FREQUENCY_ALL, frequency):
+            rows.setdefault(frequency, {})[status] = count
+    if not rows:
+        print("There are no such tasks.")
+        print()
+        return
+    columns = list(statuses)
+    print(f'{"frequency":<16}' + "".join(f'{status:>10}' for status in columns) + f'{"all":>10}')
+    for frequency in sorted(rows):
+        row = rows[frequency]
+        print(f'{_prepare_frequency(frequency):<16}' + "".join(f'{row.get(status, 0):>10}' for status in columns)
+              + f'{sum(row.values()):>10}')
+    if len(rows) > 1:
+        totals = [sum(row.get(status, 0) for row in rows.values()) for status in columns]
+        print(f'{"all":<16}' + "".join(f'{total:>10}' for total in totals) + f'{sum(totals):>10}')
+    print()
+
+
+def history_report(namespace):
+    """Displays how many tasks of each frequency were finished and how many became overdue over the last given number
+    of days, their completion rates and the streaks of days with a finished task."""
+    events = _fetch_history()
+    if len(events) == 0:
+        print("No tasks were finished or became overdue yet.")
+        print()
+        return
+    today = date.today()
+    first = today - timedelta(namespace.days - 1)
+    rates = events.completion_rates(first.toordinal(), today.toordinal())
+    print(f'Over the last {namespace.days} days ({first} to {today}):')
+    print()
+    if rates:
+        print(f'{"frequency":<16}{"finished":>10}{"overdue":>10}{"completed":>11}')
+        for frequency, (finished, overdue, rate) in rates.items():
+            print(f'{_prepare_frequency(frequency):<16}{finished:>10}{overdue:>10}{rate:>10.0%}')
+        finished = sum(finished for finished, _, _ in rates.values())
+        overdue = sum(overdue for _, overdue, _ in rates.values())
+        print(f'{"all":<16}{finished:>10}{overdue:>10}{finished / (finished + overdue):>10.0%}')
+    else:
+        print("No tasks were finished and none became overdue.")
+    print()
+    current, longest = events.streaks(today.toordinal())
+    print(f'Current streak: {current} days in a row with a finished task. The longest one: {longest} days.')
+    print()
+
+
+def memory(namespace):
+    """Displays how much memory the lists loaded into memory take up, broken down into the task nodes, their names,
+    the glossaries and the rest. With tracemalloc tracing, also displays the traced memory of the whole programme."""
+    if namespace.trace and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        print("Tracing memory allocations from now on (allocations made before are not traced).")
+        print()
+
+    rows = [(name, status_list) for name, status_list in statuses.items()]
+    rows += [(_prepare_frequency(frequency), in_memory[frequency]) for frequency in sorted(in_memory)]
+    total = [0] * 4
+    print("Memory taken up by the lists in memory, in KiB (objects shared by the lists are counted in each):")
+    print()
+    print(f'{"list":<16}{"tasks":>8}{"nodes":>10}{"names":>10}{"glossary":>10}{"other":>10}{"total":>10}')
+    for name, contents in rows:
+        usage = contents.memory_usage()
+        total = [a + b for a, b in zip(total, usage)]
+        print(f'{name:<16}{contents.size:>8}' + "".join(f'{part / 1024:>10.1f}' for part in usage)
+              + f'{sum(usage) / 1024:>10.1f}')
+    print(f'{"all":<16}{"":>8}' + "".join(f'{part / 1024:>10.1f}' for part in total) + f'{sum(total) / 1024:>10.1f}')
+    print()
+
+    if not tracemalloc.is_tracing():
+        print("For the memory of the whole programme, run 'memory --trace' (or start it with 'python -X tracemalloc').")
+        print()
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    print(f'Traced memory: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB at the peak. Largest allocation sites:')
+    for statistic in tracemalloc.take_snapshot().statistics("lineno")[:5]:
+        print(f'    {statistic}')
+    print()
+
+
+def stats(namespace):
+    """Displays the latency histograms of the commands run since profiling was enabled and the traversals done in the
+    lists, or changes the profiling settings."""
+    if namespace.enable or namespace.disable:
+        config["profiling"] = profiling.enabled = dltl.tracing = namespace.enable
+        changed["config"] = True
+        print(f'Profiling {"enabled" if namespace.enable else "disabled"}.')
+        print()
+        return
+    if namespace.reset:
+        profiling.reset()
+        dltl.reset_traces()
+        print("The recorded commands and traversals were forgotten.")
+        print()
+        return
+    if namespace.profile is not None:
+        profiling.profile_next = namespace.profile
+        print(f'The next {namespace.profile} command(s) will be run under cProfile.')
+        print()
+        return
+
+    if not profiling.enabled:
+        print("Profiling is disabled. Enable it with 'stats --enable'.")
+        print()
+        return
+    report = profiling.summary()
+    if not report:
+        print("No commands were recorded yet.")
+        print()
+        return
+    bounds = [f'{bound * 1000:g} ms' if bound < 1 else f'{bound:g} s' for bound in profiling.BUCKETS]
+    bounds = [f'<{bound}' for bound in bounds] + [f'>={bounds[-1]}']
+    print(f'Latest {profiling.WINDOW} runs of each command (times in milliseconds):')
+    print()
+    for command, (runs, p50, p95, slowest, cpu, histogram, operations) in report.items():
+        print(f'{command}: {runs} runs, wall p50 {p50 * 1000:.2f}, p95 {p95 * 1000:.2f}, max {slowest * 1000:.2f}, '
+              f'mean CPU {cpu * 1000:.2f}')
+        print("    " + " | ".join(f'{bound}: {count}' for bound, count in zip(bounds, histogram)))
+        if operations:
+            print("    per run: " + ", ".join(f'{mean:.1f} {operation}' for operation, mean in operations.items()))
+    print()
+
+    if traversals := dltl.trace_summary():
+        print("List traversals (node hops and list sizes are per call):")
+        print()
+        print(f'{"operation":<46}{"calls":>8}{"hops":>10}{"size":>10}{"hits":>8}{"misses":>8}')
+        for operation, (calls, hops, size, hits, misses) in traversals.items():
+            print(f'{operation:<46}{calls:>8}{hops:>10.1f}{size:>10.1f}{hits:>8}{misses:>8}')
+        print()
+
+
+def change_config(namespace):
+    if namespace.auto_refresh is not None:
+        if namespace.auto_refresh == "true":
+            config["auto_refresh"] = True
+            print("Auto-refresh enabled.")
+        else:
+            config["auto_refresh"] = False
+            print("Auto-refresh disabled.")
+        _schedule_midnight_rollover()
+
+    elif namespace.autosave_interval is not None:
+        if namespace.autosave_interval < 0:
+            print("Error: The autosave interval cannot be negative. Aborting process.")
+            print()
+            return None
+        config["autosave_interval"] = namespace.autosave_interval
+        _start_autosave()
+        if namespace.autosave_interval == 0:
+            print("Autosave disabled.")
+        else:
+            print(f'Autosave enabled, running every {namespace.autosave_interval} seconds.')
+
+    elif namespace.autosave_threshold is not None:
+        if namespace.autosave_threshold < 1:
+            print("Error: The autosave threshold has to be a positive integer. Aborting process.")
+            print()
+            return None
+        config["autosave_threshold"] = namespace.autosave_threshold
+        print(f'Autosave will trigger once {namespace.autosave_threshold} or more lists have been changed.')
+
+    elif namespace.slow_io_threshold is not None:
+        if namespace.slow_io_threshold < 0:
+            print("Error: The slow I/O threshold cannot be negative. Aborting process.")
+            print()
+            return None
+        config["slow_io_threshold"] = namespace.slow_io_threshold
+        storage.slow_threshold = namespace.slow_io_threshold / 1000
+        if namespace.slow_io_threshold == 0:
+            print("Slow I/O logging disabled.")
+        else:
+            print(f'Saves, reads and writes slower than {namespace.slow_io_threshold} ms will be logged into '
+                  f'{storage.SLOW_LOG}.')
     changed["config"] = True
     print()
 
 
 def _start_anew():
     """Not meant for the end user. Resets all settings and wipes TO-DO-IQ list clean, then closes the program."""
-    for file_name in ordinary.values():
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    for file_name in week.values():
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    for file_name in months.values():
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    for file_name in seasons.values():
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    for file_name in dates:
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    for file_name in statuses:
-        if path.exists(f'{file_name}.pkl'):
-            remove(f'{file_name}.pkl')
-    if path.exists('dates.pkl'):
-        remove('dates.pkl')
-    if path.exists('config.pkl'):
-        remove('config.pkl')
+    storage.discard_all()
+    storage.discard_file(HISTORY_FILE)
     print("Initialization successful. Boot up 'main.py' to begin.")
     exit_without_saving("yay")
 
 
+def _migrate_frequency_codes():
+    """Not meant for the end user. Converts everything saved by older versions (which named frequencies by strings
+    and dates, ordered through config["ordering_key"]) to frequency codes, in one pass."""
+    def code_of(frequency):
+        if isinstance(frequency, date):
+            return _date_code(frequency.month, frequency.day)
+        return _frequency_codes[frequency]
+
+    for frequency in _stored_frequencies():
+        temp = _pull_file(frequency, promote=False)
+        for node in temp:
+            node.frequency = code_of(node.frequency)
+        _update_dltl(frequency, temp)
+    for name, status_list in statuses.items():
+        for node in _status_nodes(status_list):
+            node.frequency = code_of(node.frequency)
+        if name != "asleep":
+            status_list.members = {code_of(member_name): member for member_name, member in status_list.members.items()}
+            status_list.ordering = sorted(status_list.members)
+        changed[name] = True
+    if search_index is not None:
+        for document in search_index.documents.values():
+            document[1] = code_of(document[1])
+        changed["search"] = True
+    del config["ordering_key"]
+    changed["config"] = True
+
+
+def _status_nodes(status_list):
+    """Not meant for the end user. Yields the nodes of a status list by walking it (unlike its glossary, this does not
+    rely on the tasks having IDs)."""
+    if isinstance(status_list, dltl.DLTLGroup):
+        for member in status_list.members.values():
+            yield from member
+    else:
+        yield from status_list
+
+
+def _migrate_task_ids():
+    """Not meant for the end user. Converts everything saved by older versions (which keyed the lists by task names,
+    so names had to be unique) to lists keyed by task IDs. Tasks from before task IDs existed are given one, the
+    status copy getting the ID of the frequency copy of the same name and frequency."""
+    unmatched = {}      # (status, name, frequency): status copy without an ID
+    for name, status_list in statuses.items():
+        for node in _status_nodes(status_list):
+            if node.id is None:
+                unmatched[name, node.name, node.frequency] = node
+
+    for frequency in _stored_frequencies():
+        temp = _pull_file(frequency, promote=False)
+        for node in temp:
+            if node.id is None:
+                node.id = _new_task_id()
+                if (status_copy := unmatched.pop((node.status, node.name, frequency), None)) is not None:
+                    status_copy.id = node.id
+                _index_task(node)
+        temp.rebuild_glossary()
+        _update_dltl(frequency, temp)
+    for status_copy in unmatched.values():  # Status copies whose frequency copy is gone (finished 'once' tasks)
+        status_copy.id = _new_task_id()
+    for name, status_list in statuses.items():
+        status_list.rebuild_glossary()
+        changed[name] = True
+    config["id_keys"] = True
+    changed["config"] = True
+
+
+if "ordering_key" in config:
+    _migrate_frequency_codes()
+if "id_keys" not in config:
+    _migrate_task_ids()
 if config["auto_refresh"]:
     refresh_to_do("on_startup")
+_start_autosave()
+_schedule_midnight_rollover()
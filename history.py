@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import compress
+from struct import Struct
+
+FINISHED = 1        # The event codes
+OVERDUE = 2
+
+COLUMNS = (("ids", "I"), ("days", "i"), ("events", "b"), ("frequencies", "h"))     # Name and array type code
+_header = Struct("<I")      # The number of events in a block
+_widths = [array(type_code).itemsize for _, type_code in COLUMNS]
+
+
+def _blocks(data):
+    """Yields the start of the columns and the number of events of every complete block in the data (made by
+    History.to_bytes()). Stops at a block cut short by an interrupted append."""
+    position = 0
+    while position + _header.size <= len(data):
+        count = _header.unpack_from(data, position)[0]
+        position += _header.size
+        if position + count * sum(_widths) > len(data):
+            return
+        yield position, count
+        position += count * sum(_widths)
+
+
+def complete_length(data):
+    """Returns the length of the complete blocks at the start of the data, i.e. where a block cut short (by an
+    interrupted append) starts, or the length of the data if there is none."""
+    end = 0
+    for position, count in _blocks(data):
+        end = position + count * sum(_widths)
+    return end
+
+
+class History:
+    """An append-only log of task events (a task being finished or becoming overdue), kept as array-backed columns:
+    the task ID, the day (as a date ordinal), the event code and the frequency code of the task. Events are appended
+    in the order of their days, so a date range is found by a binary search, and aggregates are single passes over
+    the columns they need, without touching the task lists."""
+
+    def __init__(self):
+        for name, type_code in COLUMNS:
+            setattr(self, name, array(type_code))
+
+    def __len__(self):
+        return len(self.days)
+
+    def append(self, task_id, day, event, frequency):
+        self.ids.append(task_id)
+        self.days.append(day)
+        self.events.append(event)
+        self.frequencies.append(frequency)
+
+    def extend(self, other):
+        """Appends all events of the other history."""
+        for name, _ in COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+
+    def to_bytes(self):
+        """Returns the events as a block to be appended to the history file: the number of events followed by the
+        columns one after another."""
+        return _header.pack(len(self)) + b"".join(getattr(self, name).tobytes() for name, _ in COLUMNS)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads the history from the blocks made by to_bytes(). A block cut short (by an interrupted append) at the
+        end is ignored. It has to be cut off the file (see complete_length) before anything else is appended."""
+        history = cls()
+        for position, count in _blocks(data):
+            for (name, _), width in zip(COLUMNS, _widths):
+                getattr(history, name).frombytes(data[position:position + count * width])
+                position += count * width
+        return history
+
+    def span(self, first_day, last_day):
+        """Returns the start and the end index of the events from first_day to last_day (both included)."""
+        return bisect_left(self.days, first_day), bisect_right(self.days, last_day)
+
+    def counts(self, first_day, last_day):
+        """Returns {(frequency, event code): number of events} of the events between the given days (included)."""
+        start, end = self.span(first_day, last_day)
+        return Counter(zip(self.frequencies[start:end], self.events[start:end]))
+
+    def completion_rates(self, first_day, last_day):
+        """Returns {frequency: (finished, overdue, completion rate)} of the events between the given days (included).
+        The completion rate is the share of the finished tasks among the finished and the overdue ones."""
+        counts = self.counts(first_day, last_day)
+        result = {}
+        for frequency in sorted({frequency for frequency, _ in counts}):
+            finished, overdue = counts[frequency, FINISHED], counts[frequency, OVERDUE]
+            result[frequency] = finished, overdue, finished / (finished + overdue)
+        return result
+
+    def streaks(self, today):
+        """Returns the current streak (up to today, or yesterday if nothing was finished today yet) and the longest
+        streak of consecutive days on which a task was finished."""
+        days = sorted(set(compress(self.days, map(FINISHED.__eq__, self.events))))
+        longest = length = 0
+        previous = None
+        for day in days:
+            length = length + 1 if previous == day - 1 else 1
+            longest = max(longest, length)
+            previous = day
+        current = length if previous is not None and previous >= today - 1 else 0
+        return current, longest
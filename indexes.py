@@ -0,0 +1,131 @@
+import re
+from heapq import nlargest
+from math import log
+
+
+def tokenize(text):
+    """Splits the text into casefolded words."""
+    return re.findall(r"\w+", text.casefold())
+
+
+class InvertedIndex:
+    """A full-text index of tasks. Maps every word to the IDs of the tasks containing it, so that a search only
+    touches the tasks that match. Also keeps the name and frequency of every indexed task, for displaying results."""
+
+    NAME_WEIGHT = 3     # A word in the name counts as much as three in the description
+
+    def __init__(self):
+        self.postings = {}      # word: {task ID: weight}
+        self.documents = {}     # task ID: [name, frequency, {word: weight}]
+
+    def add(self, task_id, name, frequency, description=""):
+        """Indexes the task, replacing its previous entry if there is one."""
+        weights = {}
+        for word in tokenize(name):
+            weights[word] = weights.get(word, 0) + self.NAME_WEIGHT
+        for word in tokenize(description):
+            weights[word] = weights.get(word, 0) + 1
+        self._insert(task_id, name, frequency, weights)
+
+    def update(self, task_id, name, frequency):
+        """Re-indexes the task under a new name and frequency. The words of its description are taken from its entry,
+        so that the description does not have to be read. Returns None if the task is not indexed."""
+        document = self.documents.get(task_id)
+        if document is None:
+            return None
+        weights = dict(document[2])
+        for word in tokenize(document[0]):
+            weights[word] -= self.NAME_WEIGHT
+            if not weights[word]:
+                del weights[word]
+        for word in tokenize(name):
+            weights[word] = weights.get(word, 0) + self.NAME_WEIGHT
+        self._insert(task_id, name, frequency, weights)
+        return True
+
+    def _insert(self, task_id, name, frequency, weights):
+        """A helper function. Indexes the task with the given word weights, replacing its previous entry."""
+        self.remove(task_id)
+        for word, weight in weights.items():
+            self.postings.setdefault(word, {})[task_id] = weight
+        self.documents[task_id] = [name, frequency, weights]
+
+    def remove(self, task_id):
+        """Removes the task from the index (if it is indexed)."""
+        document = self.documents.pop(task_id, None)
+        if document is None:
+            return None
+        for word in document[2]:
+            posting = self.postings[word]
+            del posting[task_id]
+            if not posting:
+                del self.postings[word]
+        return True
+
+    def search(self, query, limit=None):
+        """Returns the (task ID, name, frequency) of the tasks matching any word of the query, best matches first.
+        Words found in fewer tasks weigh more (tf-idf)."""
+        scores = {}
+        total = len(self.documents)
+        for word in set(tokenize(query)):
+            posting = self.postings.get(word)
+            if posting is None:
+                continue
+            rarity = log(1 + total / len(posting))
+            for task_id, weight in posting.items():
+                scores[task_id] = scores.get(task_id, 0) + weight * rarity
+
+        if limit is None:
+            best = sorted(scores, key=scores.get, reverse=True)
+        else:
+            best = nlargest(limit, scores, key=scores.get)
+        return [(task_id, *self.documents[task_id][:2]) for task_id in best]
+
+
+class TagIndex:
+    """Bitmap indexes of task tags. Every tag maps to an integer whose bit number i is set if the task with ID i has
+    the tag, so filters over any combination of tags are a handful of bitwise operations."""
+
+    def __init__(self):
+        self.bitmaps = {}       # tag: bitmap of the tasks with the tag
+        self.universe = 0       # bitmap of all indexed tasks, needed for negations
+
+    def add_task(self, task_id, tags=()):
+        """Indexes the task with the given tags."""
+        self.universe |= 1 << task_id
+        for tag in tags:
+            self.bitmaps[tag] = self.bitmaps.get(tag, 0) | 1 << task_id
+
+    def remove_task(self, task_id, tags=()):
+        """Removes the task (which has the given tags) from the index."""
+        self.universe &= ~(1 << task_id)
+        for tag in tags:
+            self.remove_tag(task_id, tag)
+
+    def remove_tag(self, task_id, tag):
+        """Removes the tag from the task."""
+        bitmap = self.bitmaps.get(tag, 0) & ~(1 << task_id)
+        if bitmap:
+            self.bitmaps[tag] = bitmap
+        else:
+            self.bitmaps.pop(tag, None)
+
+    def evaluate(self, expression):
+        """Returns the bitmap of the tasks matching the expression. The expression is a comma separated list of
+        alternatives (OR), each of which is a list of tags joined by '+' (AND). A tag prefixed by '!' is negated.
+        For example 'work+urgent,home+!done' means (work AND urgent) OR (home AND NOT done)."""
+        result = 0
+        for alternative in expression.casefold().split(","):
+            bitmap = self.universe
+            for tag in alternative.split("+"):
+                if tag.startswith("!"):
+                    bitmap &= ~self.bitmaps.get(tag[1:], 0)
+                else:
+                    bitmap &= self.bitmaps.get(tag, 0)
+            result |= bitmap
+        return result
+
+    @staticmethod
+    def contains(bitmap, task_id):
+        """Checks whether the task is in the bitmap."""
+        return bitmap >> task_id & 1 == 1
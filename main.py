@@ -1,6 +1,11 @@
 import argparse
 from functions import *
 
+try:
+    import readline     # Not available on every platform, the programme works without tab completion then
+except ImportError:
+    readline = None
+
 
 # ================
 # "Monkey patching" the behaviour of --help in argparse to NOT exit the program after displaying help:
@@ -37,6 +42,18 @@ def make_name(underscored_string):
     return ' '.join([word for word in underscored_string.split("_")])
 
 
+def non_negative_int(string):
+    if not string.isdigit():
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer, received '{string}'")
+    return int(string)
+
+
+def positive_int(string):
+    if (number := non_negative_int(string)) == 0:
+        raise argparse.ArgumentTypeError("expected a positive integer, received 0")
+    return number
+
+
 def make_description(word_list):
     print(word_list)
     if len(word_list) == 1:
@@ -51,6 +68,12 @@ entry_parser = argparse.ArgumentParser(prog="TO-DO-IQ",
                                                    "frequencies and handles automatic renewing of tasks.",
                                        epilog="-----------------------------------------------------------"
                                        )
+# Options shared by all the display commands
+paging = argparse.ArgumentParser(add_help=False)
+paging.add_argument("--limit", "-l", type=positive_int, help="Displays only a page of at most this many tasks. Use the next_page command to continue.")
+paging.add_argument("--offset", "-o", type=non_negative_int, default=0, help="The number of tasks to skip before the displayed page. (Default = 0)")
+paging.add_argument("--tags", "-t", help="Displays only the tasks matching the tag expression: alternatives separated by ',' (OR), each being tags joined by '+' (AND), '!' negates a tag. E.g. work+urgent,home+!done")
+
 # One subparser for each end-user function
 commands = entry_parser.add_subparsers(title="Available commands:\n", required=True, dest="command")
 
@@ -68,13 +91,14 @@ p_create.add_argument("task_name", type=make_name, help="The name of the task to
 p_create.add_argument("frequency", default="once", help="The frequency (trigger condition) of the task to be created. See or list_frequencies command for a list of all valid frequencies.")
 p_create.add_argument("--description", "-d", nargs="*", default="", help="A more detailed description of the task to be.")
 p_create.add_argument("status", type=casefold, choices=["due", "overdue", "asleep", "finished"], default="due", help="The starting status of the task to be.")
+p_create.add_argument("--tags", "-t", nargs="*", default=[], help="Tags of the task to be (e.g. its project, owner or context).")
 p_create.set_defaults(func=create_task_argparse)
 
 p_list_freq = commands.add_parser("list_frequencies", aliases=['lf'], help="Displays a list of all valid task frequencies (= trigger conditions).")
 p_list_freq.set_defaults(func=list_valid_frequencies)
 
 p_delete = commands.add_parser("delete_task", aliases=['dt', 'delete'], help="Deletes the specified task.")
-p_delete.add_argument("target_task", nargs="+", help="The task to be deleted. Can be its name or its index as listed in the last displayed list.")
+p_delete.add_argument("target_task", nargs="+", help="The task(s) to be deleted. Can be its name, its index as listed in the last displayed list, or several indexes and ranges of them (e.g. 1-50 53 60-80).")
 p_delete.set_defaults(func=delete_task)
 
 p_rename = commands.add_parser("rename_task", aliases=['rt', 'rename', "change_name", "cn"], help="Changes the name of the specified task.")
@@ -92,22 +116,41 @@ p_redescr.add_argument("target_task", nargs="+", help="The task to undergo descr
 p_redescr.add_argument("--new", "-n", nargs="*", default="", help="The new description for the task.")
 p_redescr.set_defaults(func=change_description)
 
+p_tag = commands.add_parser("tag", aliases=["tags"], help="Adds tags to and removes tags from the specified task.")
+p_tag.add_argument("target_task", nargs="+", help="The task to be tagged. Can be its name or its index as listed in the last displayed list.")
+p_tag.add_argument("--add", "-a", nargs="*", default=[], help="The tags to be added.")
+p_tag.add_argument("--remove", "-r", nargs="*", default=[], help="The tags to be removed.")
+p_tag.set_defaults(func=tag_task)
+
 p_set_asleep = commands.add_parser("set_asleep", aliases=["sa", "put_to_sleep", "pts", "ps"], help="Sets the task to 'sleep' making become due on a specific day. Note: this makes it ignore its normal trigger condition.")
-p_set_asleep.add_argument("target_task", nargs="+", help="The task to be put to sleep. Can be its name or its index as listed in the last displayed list.")
+p_set_asleep.add_argument("target_task", nargs="+", help="The task(s) to be put to sleep. Can be its name, its index as listed in the last displayed list, or several indexes and ranges of them (e.g. 1-50 53 60-80).")
 p_set_asleep.set_defaults(func=set_asleep)
 
 p_set_due = commands.add_parser("make_due", aliases=["md", "renew", "set_due", "sd"], help="Sets a task's status to 'due' and ads it to the agenda.")
-p_set_due.add_argument("target_task", nargs="+", help="The task to be put to renewed. Can be its name or its index as listed in the last displayed list.")
+p_set_due.add_argument("target_task", nargs="+", help="The task(s) to be put to renewed. Can be its name, its index as listed in the last displayed list, or several indexes and ranges of them (e.g. 1-50 53 60-80).")
 p_set_due.set_defaults(func=renew)
 
 p_set_overdue = commands.add_parser("mark_as_overdue", aliases=["mao", "mo", "set_overdue", "so"], help="Sets a task's status to 'overdue', marking its completion as high priority.")
-p_set_overdue.add_argument("target_task", nargs="+", help="The task to be put to made overdue. Can be its name or its index as listed in the last displayed list.")
+p_set_overdue.add_argument("target_task", nargs="+", help="The task(s) to be put to made overdue. Can be its name, its index as listed in the last displayed list, or several indexes and ranges of them (e.g. 1-50 53 60-80).")
 p_set_overdue.set_defaults(func=mark_as_overdue)
 
 p_set_fin = commands.add_parser("finish", aliases=["fin", "make_finished", "mf"], help="Sets a task's status to 'finished', marking its completion and taking it off the agenda. NOTE: finishing a 'once' task will automatically remove it")
-p_set_fin.add_argument("target_task", nargs="+", help="The task to be put to made overdue. Can be its name or its index as listed in the last displayed list.")
+p_set_fin.add_argument("target_task", nargs="+", help="The task(s) to be put to made overdue. Can be its name, its index as listed in the last displayed list, or several indexes and ranges of them (e.g. 1-50 53 60-80).")
 p_set_fin.set_defaults(func=finish)
 
+p_sort = commands.add_parser("sort_list", aliases=["sort"], help="Sorts the tasks of the given frequency by the given key. Tasks with equal keys keep their order.")
+p_sort.add_argument("frequency", help="The frequency of the tasks to be sorted.")
+p_sort.add_argument("--by", "-b", type=casefold, choices=["name", "until", "status"], default="name", help="The key to sort the tasks by. (Default = name)")
+p_sort.add_argument("--reverse", "-r", action="store_true", help="Sorts in the descending order.")
+p_sort.add_argument("--status", "-s", type=casefold, choices=["due", "overdue", "finished_today"], help="Sorts only the tasks in the given status list (the order shown by display_list) instead of the frequency list.")
+p_sort.set_defaults(func=sort_list)
+
+p_reorder = commands.add_parser("reorder", help="Moves the tasks at the given positions of the list to its start, in the given order. The other tasks keep their order.")
+p_reorder.add_argument("frequency", help="The frequency of the tasks to be reordered.")
+p_reorder.add_argument("positions", nargs="+", type=positive_int, help="The positions of the tasks, as listed by display_list.")
+p_reorder.add_argument("--status", "-s", type=casefold, choices=["due", "overdue", "finished_today"], help="Reorders the tasks in the given status list instead of the frequency list.")
+p_reorder.set_defaults(func=reorder)
+
 p_descr = commands.add_parser("description", aliases=["descr"], help="Displays the description of the task.")
 p_descr.add_argument("target_task", nargs="+", help="The task whose description is to be shown. Can be its name or its index as listed in the last displayed list.")
 p_descr.set_defaults(func=description)
@@ -116,42 +159,108 @@ p_detail = commands.add_parser("detail", help="Displays all information about th
 p_detail.add_argument("target_task", nargs="+", help="The task whose information is to be shown. Can be its name or its index as listed in the last displayed list.")
 p_detail.set_defaults(func=detail)
 
-p_disp_all = commands.add_parser("display_all", aliases=["da"], help="Displays all (optionally only finished) tasks currently logged by the programme. Please note that this may be demanding on your device.")
+p_search = commands.add_parser("search", aliases=["find", "s"], help="Searches the names and descriptions of all tasks for the given words and displays the matching tasks, best matches first.")
+p_search.add_argument("query", nargs="+", help="The words to search for.")
+p_search.add_argument("--limit", "-l", type=positive_int, default=20, help="The maximum number of displayed results. (Default = 20)")
+p_search.set_defaults(func=search)
+
+p_query = commands.add_parser("query", aliases=["q", "filter"], help="Displays the tasks matching all the given constraints, for example: query status=asleep until<=+7 freq=weekdays")
+p_query.add_argument("terms", nargs="+", help="Constraints of the form freq=F1,F2 (frequencies, 'weekdays', 'weekend', 'week', 'months', 'seasons', 'ordinary', 'dates' or MM-DD..MM-DD), status=S1,S2, until<=DATE (also <, >, >=, =; DATE is YYYY-MM-DD, 'today' or a number of days like +7) name=PATTERN (* and ? are wildcards, underscores become spaces) and tags=EXPRESSION (see the --tags option of the display commands).")
+p_query.add_argument("--limit", "-l", type=positive_int, help="The maximum number of displayed tasks.")
+p_query.add_argument("--explain", "-e", action="store_true", help="Also displays how the tasks are going to be found.")
+p_query.set_defaults(func=query_tasks)
+
+p_export = commands.add_parser("export", help="Exports all tasks (optionally only those matching a tag expression) into a CSV file.")
+p_export.add_argument("file_name", help="The file to export the tasks into.")
+p_export.add_argument("--tags", "-t", help="Exports only the tasks matching the tag expression (see the --tags option of the display commands).")
+p_export.set_defaults(func=export)
+
+p_disp_all = commands.add_parser("display_all", aliases=["da"], parents=[paging], help="Displays all (optionally only finished) tasks currently logged by the programme. Please note that this may be demanding on your device, unless --limit is used.")
 p_disp_all.add_argument("--finished", "-f", action="store_true", help="Toggles whether to display only finished tasks.")
 p_disp_all.set_defaults(func=display_all)
 
-p_disp_list = commands.add_parser("display_list", aliases=["dl", "display", "disp"], help="Displays all tasks (their names) of the specified frequency and status.")
+p_disp_list = commands.add_parser("display_list", aliases=["dl", "display", "disp"], parents=[paging], help="Displays all tasks (their names) of the specified frequency and status.")
 p_disp_list.add_argument("frequency", default="once", help="The frequency of the tasks to be displayed. Can be any frequency from the list_frequencies command, or 'all'.")
 p_disp_list.add_argument("status", type=casefold, choices=["due", "overdue", "asleep", "finished", "finished_today", "all"], default="due", help="The status of the tasks to be displayed.")
 p_disp_list.set_defaults(func=display_list_argparse)
 
-p_disp_due = commands.add_parser("due", help="Displays all due tasks except tasks that are overdue.")
+p_disp_due = commands.add_parser("due", parents=[paging], help="Displays all due tasks except tasks that are overdue.")
 p_disp_due.set_defaults(func=display_status_list)
 
-p_disp_overdue = commands.add_parser("overdue", help="Displays all overdue tasks.")
+p_disp_overdue = commands.add_parser("overdue", parents=[paging], help="Displays all overdue tasks.")
 p_disp_overdue.set_defaults(func=display_status_list)
 
-p_disp_asleep = commands.add_parser("asleep", help="Displays all tasks which are asleep.")
+p_disp_asleep = commands.add_parser("asleep", parents=[paging], help="Displays all tasks which are asleep.")
 p_disp_asleep.set_defaults(func=display_status_list)
 
-p_disp_ft = commands.add_parser("finished_today", aliases=["ft"], help="Displays all tasks which were finished today.")
+p_disp_ft = commands.add_parser("finished_today", aliases=["ft"], parents=[paging], help="Displays all tasks which were finished today.")
 p_disp_ft.set_defaults(func=display_status_list)
 
-p_to_do = commands.add_parser("to_do", aliases=["td", "todo", "to-do", "today"], help="Displays all tasks on today's agenda.")
+p_to_do = commands.add_parser("to_do", aliases=["td", "todo", "to-do", "today"], parents=[paging], help="Displays all tasks on today's agenda.")
+p_to_do.add_argument("--top", "-k", type=positive_int, help="Displays only the given number of highest-priority tasks (overdue first).")
 p_to_do.set_defaults(func=to_do)
 
+p_next_page = commands.add_parser("next_page", aliases=["np", "next", "more"], help="Displays the next page of the last display limited by --limit or --top.")
+p_next_page.set_defaults(func=next_page)
+
 p_refresh = commands.add_parser("refresh_to_do", aliases=["rtd", "refresh"], help="Updates the to-do list. Based on the system date, it wakes up sleepers, adds due tasks and potentially marks tasks that are overdue.")
 p_refresh.set_defaults(func=refresh_to_do)
 
+p_storage = commands.add_parser("storage", help="Displays the disk space taken up by the saved lists and their loading times, for both the hot (everyday) and the cold (compressed) storage tier.")
+p_storage.set_defaults(func=storage_report)
+
+p_summary = commands.add_parser("summary", aliases=["sum", "dashboard"], help="Displays the number of tasks of each status for every frequency, without going through the lists.")
+p_summary.add_argument("frequency", nargs="?", help="Displays only the tasks of this frequency.")
+p_summary.set_defaults(func=summary)
+
+p_history = commands.add_parser("history", aliases=["hist"], help="Displays how many tasks of each frequency were finished and how many became overdue recently, their completion rates and your streaks.")
+p_history.add_argument("--days", "-d", type=positive_int, default=30, help="The number of days (up to today) to sum up. (Default = 30)")
+p_history.set_defaults(func=history_report)
+
+p_memory = commands.add_parser("memory", aliases=["mem"], help="Displays how much memory each list loaded into memory takes up, broken down into the task nodes, their names, the glossaries and the rest.")
+p_memory.add_argument("--trace", action="store_true", help="Starts tracing memory allocations with tracemalloc, to also display the memory of the whole programme.")
+p_memory.set_defaults(func=memory)
+
+p_stats = commands.add_parser("stats", help="Displays the latency histograms of the commands run while profiling was enabled, and the traversals done in the lists.")
+p_stats_options = p_stats.add_mutually_exclusive_group()
+p_stats_options.add_argument("--enable", action="store_true", help="Starts recording the wall time, CPU time and list operations of every command, and the traversals done in the lists.")
+p_stats_options.add_argument("--disable", action="store_true", help="Stops recording the commands.")
+p_stats_options.add_argument("--reset", action="store_true", help="Forgets the recorded commands.")
+p_stats_options.add_argument("--profile", type=positive_int, help="Dumps the cProfile output of each of the next given number of commands.")
+p_stats.set_defaults(func=stats)
+
 p_config = commands.add_parser("change_configurations", aliases=["cc", "change_config", "config"], help="Change program configurations.")
 settings = p_config.add_mutually_exclusive_group(required=True)
-settings.add_argument("--auto_refresh", type=casefold, choices=["true", "false"], help="Toggle whether you want the program to automatically refresh the to-do list upon booting. (Default = False)")
+settings.add_argument("--auto_refresh", type=casefold, choices=["true", "false"], help="Toggle whether you want the program to automatically refresh the to-do list upon booting and at midnight. (Default = False)")
+settings.add_argument("--autosave_interval", type=int, help="How often (in seconds) the changes get saved in the background. Note: autosaved changes are kept even when exiting without saving. 0 disables autosave. (Default = 0)")
+settings.add_argument("--autosave_threshold", type=int, help="The number of changed lists needed for the autosave to trigger. (Default = 1)")
+settings.add_argument("--slow_io_threshold", type=int, help="Saves and file reads or writes taking longer than this many milliseconds get logged into slow_io.log. 0 disables the log. (Default = 0)")
 p_config.set_defaults(func=change_config)
 
 
+def complete(text, state):
+    """Tab completion for the interactive interface. Completes the command names and then the names of the tasks in
+    the last displayed list. The whole line is completed at once, since task names contain spaces."""
+    if state == 0:
+        if " " not in text:
+            complete.matches = sorted(command + " " for command in commands.choices if command.startswith(text))
+        else:
+            command, prefix = text.split(" ", 1)
+            with state_lock:
+                complete.matches = [f'{command} {name}' for name in task_names_with_prefix(prefix, 50)]
+    if state < len(complete.matches):
+        return complete.matches[state]
+    return None
+
+
 def main():
     print("Welcome to TO-DO-IQ!")
+    print(load_summary())
     print()
+    if readline is not None:
+        readline.set_completer_delims("")
+        readline.set_completer(complete)
+        readline.parse_and_bind("tab: complete")
     while True:
         try:
             print("Type in a valid command to continue. Type --help for help.")
@@ -162,7 +271,14 @@ def main():
             print()
             # print(f"Parsed arguments: {namespace}")  # Debug print
             print()
-            namespace.func(namespace)
+            with state_lock:    # Keeps the autosave from snapshotting the lists mid-change
+                before = storage.io_totals()
+                try:
+                    profiling.run(namespace.func.__name__, namespace.func, namespace)
+                finally:    # The lists loaded on demand are reported like the ones loaded on startup
+                    if (summary := load_summary(before)) is not None:
+                        print(summary)
+                        print()
             continue
         except SystemExit as e:
             if e.code == 112:  # Help was displayed
@@ -0,0 +1,90 @@
+import cProfile
+import pstats
+from collections import Counter, deque
+from time import perf_counter, process_time
+import dltl     # Custom module
+
+WINDOW = 500        # The number of latest runs of each command kept for the histograms
+BUCKETS = (0.001, 0.01, 0.1, 1)     # Upper bounds (in seconds) of the histogram buckets, the last bucket is open
+PROFILE_LINES = 25  # The number of functions shown in a cProfile dump
+
+enabled = False     # Set by functions.py from the configurations
+profile_next = 0    # The number of following commands to be run under cProfile
+_samples = {}       # command: deque of (wall seconds, CPU seconds, {operation: count}) of its latest runs
+_operations = None  # The operation counts of the command being run, None outside of a recorded command
+# The names of the dltl.traces columns counted towards the commands (None for the list sizes, which are not counts)
+TRACED = ("list operations", "node hops", None, "glossary hits", "glossary misses")
+
+
+def count(operation, amount=1):
+    """Counts an operation (e.g. a list pulled into memory) towards the command being run. Does nothing unless the
+    command is being recorded."""
+    if _operations is not None:
+        _operations[operation] += amount
+
+
+def _traced_totals():
+    """A helper function. Returns the dltl.traces summed up over all the operations, as a Counter named by TRACED."""
+    totals = Counter()
+    for counts in list(dltl.traces.values()):
+        for name, amount in zip(TRACED, counts):
+            if name is not None:
+                totals[name] += amount
+    return totals
+
+
+def run(command, function, *args):
+    """Runs the command's function, recording its wall time, CPU time and operation counts if profiling is enabled,
+    and dumping its cProfile output if it is one of the commands to be profiled. The list operations traced by dltl
+    during the command are counted towards it too."""
+    global _operations, profile_next
+    if not enabled and profile_next == 0:
+        return function(*args)
+
+    profile = None
+    if profile_next > 0:
+        profile_next -= 1
+        profile = cProfile.Profile()
+    operations = _operations = Counter()
+    traced = _traced_totals()
+    wall, cpu = perf_counter(), process_time()
+    try:
+        return function(*args) if profile is None else profile.runcall(function, *args)
+    finally:       # Also when the command exits the programme
+        wall, cpu = perf_counter() - wall, process_time() - cpu
+        _operations = None
+        operations.update(_traced_totals() - traced)     # The subtraction also drops the operations that never ran
+        if enabled:
+            _samples.setdefault(command, deque(maxlen=WINDOW)).append((wall, cpu, operations))
+        if profile is not None:
+            print()
+            print(f'---- cProfile of "{command}" ----')
+            pstats.Stats(profile).sort_stats("cumulative").print_stats(PROFILE_LINES)
+
+
+def reset():
+    """Forgets all recorded runs."""
+    _samples.clear()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summary():
+    """Returns {command: (runs, wall p50, wall p95, wall max, mean CPU time, histogram, mean operation counts)} of the
+    recorded commands, the times in seconds. The histogram counts the runs falling into each of the BUCKETS (plus one
+    for the slower runs)."""
+    result = {}
+    for command, samples in sorted(_samples.items()):
+        walls = sorted(wall for wall, _, _ in samples)
+        histogram = [0] * (len(BUCKETS) + 1)
+        for wall in walls:
+            histogram[next((i for i, bound in enumerate(BUCKETS) if wall < bound), len(BUCKETS))] += 1
+        operations = Counter()
+        for _, _, counts in samples:
+            operations.update(counts)
+        result[command] = (len(walls), _percentile(walls, 0.5), _percentile(walls, 0.95), walls[-1],
+                           sum(cpu for _, cpu, _ in samples) / len(walls), histogram,
+                           {operation: total / len(walls) for operation, total in sorted(operations.items())})
+    return result
@@ -0,0 +1,288 @@
+import pickle
+import re
+import zlib
+from datetime import datetime
+from os import listdir, path, remove, replace, fsync
+from time import perf_counter
+
+HOT = "hot"      # Plain pickles, for the lists used every day
+COLD = "cold"    # Compressed pickles, for the lists used a few times a year
+TIERS = (HOT, COLD)
+_suffixes = {HOT: ".pkl", COLD: ".pkl.z"}
+
+MANIFEST = "manifest.pkl"
+_manifest = None        # file name: [tier, size, version, checksum], see _entries()
+_manifest_changed = False
+
+SLOW_LOG = "slow_io.log"
+slow_threshold = 0      # In seconds, slower reads and writes are logged into SLOW_LOG (0 disables it), see functions.py
+io_stats = {}           # file name: [reads, bytes read, read seconds, writes, bytes written, write seconds, fsync seconds]
+
+
+def file_path(name, tier=HOT):
+    """Returns the path of the file the given list is stored in, in the given tier."""
+    return f'{name}{_suffixes[tier]}'
+
+
+def log_slow(message):
+    """Appends the message to the slow operation log, with a timestamp."""
+    with open(SLOW_LOG, "a") as f:
+        f.write(f'{datetime.now():%Y-%m-%d %H:%M:%S}  {message}\n')
+
+
+def _record(file_name, write, size, seconds, fsync_seconds=0.0):
+    """Adds a read (or a write) of the file to the I/O statistics, logging it if it was slow."""
+    counts = io_stats.get(file_name)
+    if counts is None:
+        counts = io_stats[file_name] = [0, 0, 0.0, 0, 0, 0.0, 0.0]
+    i = 3 if write else 0
+    counts[i] += 1
+    counts[i + 1] += size
+    counts[i + 2] += seconds
+    counts[6] += fsync_seconds
+    if slow_threshold and seconds >= slow_threshold:
+        log_slow(f'{"write" if write else "read "} {file_name}: {size} bytes in {seconds * 1000:.1f} ms'
+                 + (f' (fsync {fsync_seconds * 1000:.1f} ms)' if write else ""))
+
+
+def write_atomically(data, file_name):
+    """Writes the given bytes into the file through a temporary file and a rename, so that an interrupted write never
+    leaves a half-written file behind. Returns the seconds it took and the seconds of those spent in fsync."""
+    start = perf_counter()
+    with open(f'{file_name}.tmp', "wb") as f:
+        f.write(data)
+        f.flush()
+        synced = perf_counter()
+        fsync(f.fileno())
+        synced = perf_counter() - synced
+    replace(f'{file_name}.tmp', file_name)
+    seconds = perf_counter() - start
+    _record(file_name, True, len(data), seconds, synced)
+    return seconds, synced
+
+
+def append(file_name, data):
+    """Appends the given bytes to the end of the file (creating it if needed), for the append-only logs kept apart
+    from the saved lists. A failed append is cut off again, so that it never leaves half of the data behind. Returns
+    the seconds it took and the seconds of those spent in fsync."""
+    start = perf_counter()
+    with open(file_name, "ab") as f:
+        size = f.tell()
+        try:
+            f.write(data)
+            f.flush()
+            synced = perf_counter()
+            fsync(f.fileno())
+            synced = perf_counter() - synced
+        except OSError:
+            f.truncate(size)
+            raise
+    seconds = perf_counter() - start
+    _record(file_name, True, len(data), seconds, synced)
+    return seconds, synced
+
+
+def read_file(file_name):
+    """Returns the contents of a file written by append(), or empty bytes if there is no such file."""
+    if not path.exists(file_name):
+        return b""
+    start = perf_counter()
+    with open(file_name, "rb") as f:
+        data = f.read()
+    _record(file_name, False, len(data), perf_counter() - start)
+    return data
+
+
+def truncate_file(file_name, size):
+    """Cuts a file written by append() back to the given size, e.g. to drop the end of an append interrupted by
+    a crash. Returns True if anything was cut off."""
+    if not path.exists(file_name) or path.getsize(file_name) <= size:
+        return False
+    with open(file_name, "r+b") as f:
+        f.truncate(size)
+        f.flush()
+        fsync(f.fileno())
+    return True
+
+
+def discard_file(file_name):
+    """Removes a file written by append(), if there is one."""
+    if path.exists(file_name):
+        remove(file_name)
+
+
+def _scan():
+    """Builds the manifest entries of the files already in the directory (saved before the manifest existed). Their
+    size, version and checksum are unknown until they are saved again."""
+    entries = {}
+    for file_name in listdir("."):
+        if match := re.fullmatch(r"(.+?)(\.pkl|\.pkl\.z)", file_name):
+            if file_name != MANIFEST:
+                tier = HOT if match[2] == _suffixes[HOT] else COLD
+                entries[match[1]] = [tier, None, None, None]
+    return entries
+
+
+def _entries():
+    """Returns the manifest, reading it on first use. It records every stored list, so that finding out what is
+    stored (and where) never requires looking at the files themselves."""
+    global _manifest, _manifest_changed
+    if _manifest is None:
+        if path.exists(MANIFEST):
+            start = perf_counter()
+            with open(MANIFEST, "rb") as f:
+                data = f.read()
+            _record(MANIFEST, False, len(data), perf_counter() - start)
+            _manifest = pickle.loads(data)
+        else:
+            _manifest = _scan()
+            _manifest_changed = True
+    return _manifest
+
+
+def stored_names():
+    """Returns the names of all stored lists."""
+    return list(_entries())
+
+
+def exists(name):
+    """Checks whether the given list is stored."""
+    return str(name) in _entries()
+
+
+def tier_of(name):
+    """Returns the tier the given list is stored in (None if it is not stored)."""
+    entry = _entries().get(str(name))
+    return None if entry is None else entry[0]
+
+
+def size_of(name):
+    """Returns the number of tasks in the given stored list, as of its last save (None if unknown)."""
+    entry = _entries().get(str(name))
+    return None if entry is None else entry[1]
+
+
+def store(name, data, tier=HOT, size=None, version=None):
+    """Writes the pickled contents of the given list into the given tier, compressing them for the cold one, and
+    records it in the manifest. The copy in the other tier (if the list has moved between the tiers) is removed.
+    Returns the bytes written, the seconds it took and the seconds of those spent in fsync."""
+    global _manifest_changed
+    entries = _entries()
+    checksum = zlib.crc32(data)
+    if tier == COLD:
+        data = zlib.compress(data)
+    seconds, synced = write_atomically(data, file_path(name, tier))
+    previous = entries.get(str(name))
+    if previous is not None and previous[0] != tier and path.exists(file_path(name, previous[0])):
+        remove(file_path(name, previous[0]))
+    entries[str(name)] = [tier, size, version, checksum]
+    _manifest_changed = True
+    return len(data), seconds, synced
+
+
+def _read(name, tier):
+    start = perf_counter()
+    with open(file_path(name, tier), "rb") as f:
+        data = f.read()
+    size = len(data)
+    if tier == COLD:
+        data = zlib.decompress(data)
+    _record(file_path(name, tier), False, size, perf_counter() - start)
+    return data
+
+
+def move(name, tier, data=None):
+    """Moves the given list into the other tier (promoting a cold list to the hot one, or demoting it back), given its
+    pickled contents if they were already read. The manifest is saved before the old file is removed, so that it
+    never lists a file that does not exist. Returns True if the list was moved."""
+    global _manifest_changed
+    entry = _entries().get(str(name))
+    if entry is None or entry[0] == tier:
+        return False
+    if data is None:
+        data = _read(name, entry[0])
+    write_atomically(zlib.compress(data) if tier == COLD else data, file_path(name, tier))
+    previous, entry[0] = entry[0], tier
+    _manifest_changed = True
+    save_manifest()
+    if path.exists(file_path(name, previous)):
+        remove(file_path(name, previous))
+    return True
+
+
+def load(name, failsafe=None, promote=False):
+    """Returns the unpickled contents of the given list, or the failsafe if it is not stored. If promote is set, a
+    list read from the cold tier is moved into the hot one, as it is in use again."""
+    global _manifest_changed
+    entry = _entries().get(str(name))
+    if entry is None:
+        return failsafe
+    try:
+        data = _read(name, entry[0])
+    except FileNotFoundError:
+        print(f'Error: The saved list "{name}" is missing. Continuing without it.')
+        del _manifest[str(name)]
+        _manifest_changed = True
+        return failsafe
+    if entry[3] is not None and zlib.crc32(data) != entry[3]:
+        print(f'Warning: The saved list "{name}" does not match its last save. It may have been damaged.')
+    if promote and entry[0] == COLD:
+        move(name, HOT, data)
+    return pickle.loads(data)
+
+
+def discard(name):
+    """Removes the given list from the storage."""
+    global _manifest_changed
+    entry = _entries().pop(str(name), None)
+    if entry is not None:
+        if path.exists(file_path(name, entry[0])):
+            remove(file_path(name, entry[0]))
+        _manifest_changed = True
+
+
+def discard_all():
+    """Removes all stored lists and the manifest itself."""
+    global _manifest, _manifest_changed
+    for name in stored_names():
+        discard(name)
+    if path.exists(MANIFEST):
+        remove(MANIFEST)
+    _manifest, _manifest_changed = {}, False
+
+
+def save_manifest():
+    """Writes the manifest onto the disk, if it has changed since. Meant to be called after a batch of stores. Returns
+    the bytes written, the seconds it took and the seconds of those spent in fsync."""
+    global _manifest_changed
+    if not _manifest_changed:
+        return 0, 0.0, 0.0
+    data = pickle.dumps(_entries())
+    seconds, synced = write_atomically(data, MANIFEST)
+    _manifest_changed = False
+    return len(data), seconds, synced
+
+
+def io_totals():
+    """Returns the I/O statistics summed up over all files: [reads, bytes read, read seconds, writes, bytes written,
+    write seconds, fsync seconds]."""
+    totals = [0, 0, 0.0, 0, 0, 0.0, 0.0]
+    for counts in io_stats.values():
+        for i, count in enumerate(counts):
+            totals[i] += count
+    return totals
+
+
+def measure():
+    """Returns {tier: [number of lists, bytes on the disk, seconds spent loading them]} for all stored lists. Every
+    list is read and unpickled once, without being kept."""
+    report = {tier: [0, 0, 0.0] for tier in TIERS}
+    for name, (tier, *_) in list(_entries().items()):
+        if path.exists(file_path(name, tier)):
+            start = perf_counter()
+            pickle.loads(_read(name, tier))
+            entry = report[tier]
+            entry[0] += 1
+            entry[1] += path.getsize(file_path(name, tier))
+            entry[2] += perf_counter() - start
+    return report
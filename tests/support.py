@@ -0,0 +1,72 @@
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class SimulatedDate(date):
+    """Stands in for datetime.date inside functions.py, so that date.today() returns the simulated day."""
+    current = None
+
+    @classmethod
+    def today(cls):
+        return cls.current if cls.current is not None else date.today()
+
+
+class ProgrammeTestCase(unittest.TestCase):
+    """Starts the programme in an empty temporary directory (or in a copy of the 'data' directory, if given), as if
+    main.py was launched there."""
+    data = None
+
+    def setUp(self):
+        self.origin = os.getcwd()
+        self.directory = tempfile.mkdtemp(prefix="to-do-iq-test-")
+        if self.data is not None:
+            for name in os.listdir(self.data):
+                shutil.copy(os.path.join(self.data, name), self.directory)
+        os.chdir(self.directory)
+        SimulatedDate.current = None
+        self.functions = self.restart(reload_storage=True)
+
+    def tearDown(self):
+        SimulatedDate.current = None
+        os.chdir(self.origin)
+        shutil.rmtree(self.directory)
+
+    def restart(self, reload_storage=False):
+        """(Re)loads functions.py, so that everything is read from the disk again."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            if reload_storage:
+                importlib.reload(importlib.import_module("storage"))
+            if "functions" in sys.modules:
+                functions = importlib.reload(sys.modules["functions"])
+            else:
+                functions = importlib.import_module("functions")
+        functions.date = SimulatedDate
+        self.functions = functions
+        return functions
+
+    def run_quietly(self, function, *args):
+        """Calls the function, returning its result and everything it printed."""
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = function(*args)
+        return result, output.getvalue()
+
+    def command(self, function, **arguments):
+        """Runs a command function the way main.py does (with an argparse namespace), returning what it printed."""
+        return self.run_quietly(function, argparse.Namespace(**arguments))[1]
+
+    def create(self, name, frequency, status="due", description="", tags=frozenset()):
+        self.run_quietly(self.functions.create_task, name, frequency, description, status, tags)
+
+    def to_do(self):
+        return self.command(self.functions.to_do, offset=0, limit=None, top=None, tags=None)
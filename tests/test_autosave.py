@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from datetime import date
+
+from support import ProgrammeTestCase
+
+
+class ExitTest(ProgrammeTestCase):
+    """Exiting never kills an autosave in the middle of writing."""
+
+    def exit_while_writing(self, function, *args):
+        functions = self.functions
+        functions._write_lock.acquire()      # Stands in for an autosave writing a snapshot
+        threading.Timer(0.2, functions._write_lock.release).start()
+        start = time.perf_counter()
+        with self.assertRaises(SystemExit):
+            self.run_quietly(function, *args)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.15)
+        self.assertTrue(functions._autosave_stop.is_set())
+        self.assertFalse(functions._write_lock.locked())
+
+    def test_close_without_saving_waits_for_the_autosave(self):
+        self.functions.input = lambda prompt="": "n"
+        self.exit_while_writing(self.functions.catch_close_command)
+
+    def test_close_with_saving_waits_for_the_autosave(self):
+        self.functions.input = lambda prompt="": "y"
+        self.exit_while_writing(self.functions.catch_close_command)
+
+    def test_exit_without_saving_waits_for_the_autosave(self):
+        self.exit_while_writing(self.functions.exit_without_saving, None)
+
+
+class FailedSaveTest(ProgrammeTestCase):
+    """A save failing to write keeps the changes marked, so that the next save writes them."""
+
+    def test_failed_save_keeps_the_changes(self):
+        functions = self.functions
+        functions.config["last_refresh"] = date.today()
+        self.create("water plants", "daily")
+        self.create("pay rent", "daily")
+        self.to_do()
+        self.command(functions.finish, target_task=["1"])
+        marked = set(functions.changed)
+        self.assertIn("history", marked)
+
+        def store(*args):
+            raise OSError("No space left on device")
+        functions.storage.store, original = store, functions.storage.store
+        try:
+            result, output = self.run_quietly(functions.save_changes, "test")
+        finally:
+            functions.storage.store = original
+        self.assertFalse(result)
+        self.assertIn("Error: Saving failed", output)
+        self.assertLessEqual(marked, set(functions.changed))
+
+        self.assertTrue(self.run_quietly(functions.save_changes, "test")[0])
+        functions = self.restart()
+        self.assertEqual(len(functions._fetch_history()), 1)
+        self.assertIn("pay rent", self.to_do())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from support import ProgrammeTestCase
+
+
+class BulkTargetTest(ProgrammeTestCase):
+    """The task commands accept several positions and ranges of them, resolved in one pass over the displayed list."""
+
+    def setUp(self):
+        super().setUp()
+        for name in ("ask", "bake", "call", "dust", "email"):
+            self.create(name, "daily")
+        self.to_do()
+
+    def finish(self, *words):
+        return self.command(self.functions.finish, target_task=list(words))
+
+    def finished(self):
+        return sorted(node.name for node in self.functions.finished_today)
+
+    def test_positions_and_ranges(self):
+        printed = self.finish("1-3", "5")
+        self.assertIn("4 of 4 tasks finished.", printed)
+        self.assertEqual(self.finished(), ["ask", "bake", "call", "email"])
+        self.assertEqual([node.name for node in self.functions.due], ["dust"])
+
+    def test_reversed_and_overlapping_ranges(self):
+        self.finish("4-2", "3-5")
+        self.assertEqual(self.finished(), ["bake", "call", "dust", "email"])
+
+    def test_adjacent_ranges(self):
+        self.assertEqual(self.functions._parse_positions(["4-5", "1", "2-3", "9"]), [(1, 5), (9, 9)])
+        self.finish("1-2", "3")
+        self.assertEqual(self.finished(), ["ask", "bake", "call"])
+
+    def test_range_of_one_position(self):
+        printed = self.finish("3-3")
+        self.assertIn("Task status change successful.", printed)
+        self.assertEqual(self.finished(), ["call"])
+
+    def test_repeated_position(self):
+        self.finish("2", "2")
+        self.assertEqual(self.finished(), ["bake"])
+        self.assertEqual(self.functions.due.size, 4)
+
+    def test_invalid_position(self):
+        self.assertIn("Error: Invalid position. Aborting process.", self.finish("4-9"))
+        self.assertIn("Error: Invalid position. Aborting process.", self.finish("0", "1"))
+        self.assertIn("Error: Invalid position. Aborting process.", self.finish("1-999999999"))   # Never expanded
+        self.assertEqual(self.finished(), [])
+
+    def test_stale_list(self):
+        self.finish("1")
+        printed = self.finish("1", "2")
+        self.assertIn("The tasks changed since the last list was displayed", printed)
+        self.assertEqual(self.finished(), ["ask"])
+
+    def test_name(self):
+        self.finish("dust")
+        self.assertEqual(self.finished(), ["dust"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import unittest
+
+from support import ROOT, ProgrammeTestCase
+
+BASELINE = os.path.join(ROOT, "tests", "data", "baseline")
+
+# The files in data/baseline were saved by the first version of TO-DO-IQ (before task IDs, tags, descriptions kept
+# apart from the tasks, frequency codes and the storage manifest), by running its main.py with:
+#   create water_plants daily due -d twice if hot
+#   create pay_rent monthly overdue
+#   create call_mum sunday asleep  (3 days)
+#   create buy_milk once due
+#   create buy_milk weekly finished
+#   create dentist 03-14 due -d bring the card
+#   create gym weekly finished
+#   save
+
+
+class BaselineDataTest(ProgrammeTestCase):
+    """Starts the programme on the lists saved by the first version, which it has to migrate."""
+    data = BASELINE
+
+    def test_tasks_get_matching_ids(self):
+        functions = self.functions
+        self.assertTrue(functions.config["id_keys"])
+        frequency_copies = {}
+        for frequency in functions._stored_frequencies():
+            for node in functions._pull_file(frequency):
+                self.assertIsNotNone(node.id)
+                self.assertIs(functions._pull_file(frequency).fetch_node(node.id), node)
+                frequency_copies[node.id] = node
+        self.assertEqual(len(frequency_copies), 7)
+        self.assertEqual(functions.config["next_task_id"], 8)
+
+        for status, status_list in functions.statuses.items():
+            for node in status_list:
+                frequency_copy = frequency_copies[node.id]
+                self.assertIs(status_list.fetch_node(node.id), node)
+                self.assertEqual((node.name, node.frequency, node.status),
+                                 (frequency_copy.name, frequency_copy.frequency, status))
+
+    def test_tasks_can_be_used(self):
+        functions = self.functions
+        _, found = self.run_quietly(functions.search, argparse.Namespace(query=["milk"], limit=20))
+        self.assertEqual(found.count("buy milk"), 2)
+        dentist = functions.due.fetch_nodes_named("dentist")[0]
+        self.assertEqual(functions._description_of(dentist), "bring the card")
+
+        self.run_quietly(functions.display_list, "weekly", "all")
+        self.run_quietly(functions.renew, argparse.Namespace(target_task=["buy", "milk"]))
+        self.assertEqual(len(functions.due.fetch_nodes_named("buy milk")), 2)       # Same name, two tasks
+
+        self.run_quietly(functions.save_changes, "test")
+        functions = self.restart()
+        self.assertEqual(len(functions.due.fetch_nodes_named("buy milk")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import indexes
+from support import ProgrammeTestCase
+
+
+class InvertedIndexTest(unittest.TestCase):
+
+    def test_update_keeps_the_description(self):
+        index = indexes.InvertedIndex()
+        index.add(1, "water plants", 2, "plants in the garden")
+        self.assertTrue(index.update(1, "water flowers", 3))
+        self.assertEqual(index.documents[1][2], {"water": 3, "flowers": 3, "plants": 1, "in": 1, "the": 1,
+                                                 "garden": 1})
+        self.assertEqual(index.search("garden"), [(1, "water flowers", 3)])
+        self.assertIsNone(index.update(2, "read", 2))
+
+
+class DescriptionStoreTest(ProgrammeTestCase):
+    """The description store is only loaded by the commands reading or changing a description."""
+
+    def setUp(self):
+        super().setUp()
+        self.create("water plants", "daily", description="the ones in the garden", tags=frozenset({"home"}))
+        self.create("pay rent", "daily")
+        self.command(self.functions.search, query=["rent"], limit=None)     # Builds the indexes
+        self.run_quietly(self.functions.save_changes, "test")
+        self.functions = self.restart()
+
+    def test_search_tags_and_rename_do_not_load_the_store(self):
+        functions = self.functions
+        printed = self.command(functions.to_do, offset=0, limit=None, top=None, tags="home")
+        self.assertIn("water plants", printed)
+        self.assertNotIn("pay rent", printed)
+        self.command(functions.change_name, target_task=["1"], new="water flowers")
+        printed = self.command(functions.search, query=["garden"], limit=None)
+        self.assertIn("water flowers", printed)
+        self.assertIsNone(functions.descriptions)
+
+        printed = self.command(functions.description, target_task=["water", "flowers"])
+        self.assertIn("the ones in the garden", printed)
+        self.assertIsNotNone(functions.descriptions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import unittest
+from datetime import date
+
+import history
+from support import ProgrammeTestCase, SimulatedDate
+
+
+class HistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.history = history.History()
+        for task_id, day, event, frequency in [(1, 10, history.FINISHED, 2), (2, 10, history.OVERDUE, 3),
+                                               (1, 11, history.FINISHED, 2), (3, 13, history.FINISHED, 3),
+                                               (1, 14, history.FINISHED, 2)]:
+            self.history.append(task_id, day, event, frequency)
+
+    def test_round_trip(self):
+        data = self.history.to_bytes() + self.history.to_bytes()
+        events = history.History.from_bytes(data)
+        self.assertEqual(len(events), 10)
+        self.assertEqual(list(events.ids[5:]), [1, 2, 1, 3, 1])
+        self.assertEqual(history.complete_length(data), len(data))
+
+    def test_aggregates(self):
+        self.assertEqual(self.history.span(11, 13), (2, 4))
+        self.assertEqual(self.history.counts(10, 11), {(2, history.FINISHED): 2, (3, history.OVERDUE): 1})
+        self.assertEqual(self.history.completion_rates(10, 13), {2: (2, 0, 1.0), 3: (1, 1, 0.5)})
+        self.assertEqual(self.history.streaks(14), (2, 2))
+        self.assertEqual(self.history.streaks(16), (0, 2))
+
+    def test_torn_block(self):
+        complete = self.history.to_bytes()
+        for torn in (complete[:2], complete[:-1], complete[:len(complete) // 2]):
+            data = complete + torn
+            self.assertEqual(history.complete_length(data), len(complete))
+            self.assertEqual(len(history.History.from_bytes(data)), 5)
+        self.assertEqual(history.complete_length(b""), 0)
+
+
+class HistoryFileTest(ProgrammeTestCase):
+    """The events are appended to the history file on every save; a block torn by a crash is cut off first."""
+
+    def setUp(self):
+        super().setUp()
+        SimulatedDate.current = date(2024, 1, 1)
+        self.functions.config["last_refresh"] = SimulatedDate.current
+        self.create("water plants", "daily")
+        self.create("pay rent", "daily")
+        self.to_do()
+
+    def finish_and_save(self, position):
+        self.command(self.functions.finish, target_task=[position])
+        self.run_quietly(self.functions.save_changes, "test")
+
+    def test_events_are_appended(self):
+        self.finish_and_save("1")
+        self.to_do()
+        self.finish_and_save("1")
+        functions = self.restart()
+        events = functions._fetch_history()
+        self.assertEqual(len(events), 2)
+        self.assertEqual(list(events.events), [history.FINISHED, history.FINISHED])
+        self.assertEqual(list(events.days), [date(2024, 1, 1).toordinal()] * 2)
+
+    def test_torn_block_is_cut_off(self):
+        functions = self.functions
+        self.finish_and_save("1")
+        size = os.path.getsize(functions.HISTORY_FILE)
+        with open(functions.HISTORY_FILE, "ab") as f:
+            f.write(history.History().to_bytes()[:2])       # An append interrupted by a crash
+
+        functions = self.restart()
+        self.to_do()
+        self.finish_and_save("1")
+        with open(functions.HISTORY_FILE, "rb") as f:
+            data = f.read()
+        self.assertEqual(history.complete_length(data), len(data))
+        self.assertGreater(len(data), size)
+        self.assertEqual(list(functions._fetch_history().ids), [1, 2])
+
+    def test_overtaking_save_keeps_the_days_sorted(self):
+        functions = self.functions
+        self.command(functions.finish, target_task=["1"])
+        with functions.state_lock:
+            older = functions._snapshot_changes()       # Taken by the autosave, which is then overtaken
+        SimulatedDate.current = date(2024, 1, 2)
+        self.to_do()
+        self.command(functions.finish, target_task=["1"])
+        with functions.state_lock:
+            newer = functions._snapshot_changes()
+
+        functions._write_snapshot(newer)
+        self.assertEqual(len(functions._fetch_history()), 1)     # The held block, the older one is still unwritten
+        self.assertEqual(len(history.History.from_bytes(functions.storage.read_file(functions.HISTORY_FILE))), 0)
+        functions._write_snapshot(older)
+
+        events = self.restart()._fetch_history()
+        self.assertEqual(list(events.ids), [1, 2])
+        self.assertEqual(list(events.days), [date(2024, 1, 1).toordinal(), date(2024, 1, 2).toordinal()])
+
+
+if __name__ == "__main__":
+    unittest.main()
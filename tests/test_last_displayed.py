@@ -0,0 +1,80 @@
+import unittest
+from datetime import date, timedelta
+
+from support import ProgrammeTestCase, SimulatedDate
+
+
+class StalenessTest(ProgrammeTestCase):
+    """The tasks of the last displayed list are only accessible by position while the list has not changed."""
+
+    def setUp(self):
+        super().setUp()
+        SimulatedDate.current = date(2024, 1, 1)     # A Monday
+        self.functions.config["last_refresh"] = SimulatedDate.current
+        self.create("water plants", "weekly")
+        self.create("pay rent", "weekly")
+
+    def finish_first_and_display(self):
+        self.to_do()
+        self.command(self.functions.finish, target_task=["1"])
+        self.command(self.functions.display_status_list, command="finished_today", offset=0, limit=None,
+                     tags=None)
+
+    def test_refresh_makes_the_finished_list_stale(self):
+        functions = self.functions
+        self.finish_first_and_display()
+        SimulatedDate.current += timedelta(7)
+        self.run_quietly(functions.refresh_to_do, "test")
+
+        printed = self.command(functions.renew, target_task=["1"])     # Used to raise KeyError
+        self.assertIn("The tasks changed since the last list was displayed", printed)
+        self.assertEqual(functions.finished_today.size, 0)
+        self.assertEqual((functions.due.size, functions.overdue.size), (1, 1))
+
+    def test_refresh_makes_a_finished_member_stale(self):
+        functions = self.functions
+        self.to_do()
+        self.command(functions.finish, target_task=["1"])
+        self.run_quietly(functions.display_list, "weekly", "finished_today")
+        SimulatedDate.current += timedelta(7)
+        self.run_quietly(functions.refresh_to_do, "test")
+
+        printed = self.command(functions.renew, target_task=["1"])
+        self.assertIn("The tasks changed since the last list was displayed", printed)
+
+    def test_midnight_rollover_forgets_the_displayed_list(self):
+        functions = self.functions
+        self.finish_first_and_display()
+        SimulatedDate.current += timedelta(1)
+        self.run_quietly(functions._midnight_rollover)
+
+        self.assertIsNone(functions.last_displayed)
+        printed = self.command(functions.renew, target_task=["1"])
+        self.assertIn("Please display a list first", printed)
+
+    def test_failed_midnight_rollover_is_rescheduled(self):
+        functions = self.functions
+        functions.config["auto_refresh"] = True
+        SimulatedDate.current += timedelta(1)
+
+        def refresh(frequency):
+            raise OSError("Permission denied")
+        functions._refresh_frequency = refresh
+        try:
+            printed = self.run_quietly(functions._midnight_rollover)[1]
+            self.assertIn("Error: The midnight refresh failed -- reason: Permission denied", printed)
+            self.assertTrue(functions._midnight_timer.is_alive())
+        finally:
+            functions._midnight_timer.cancel()
+
+    def test_unchanged_list_stays_accessible(self):
+        functions = self.functions
+        self.to_do()
+        self.assertFalse(functions.last_displayed.is_stale())
+        self.assertEqual(functions.last_displayed.fetch_node_at_position(2).name, "pay rent")
+        self.command(functions.finish, target_task=["1"])
+        self.assertTrue(functions.last_displayed.is_stale())
+
+
+if __name__ == "__main__":
+    unittest.main()
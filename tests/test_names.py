@@ -0,0 +1,76 @@
+import unittest
+
+import dltl
+from support import ProgrammeTestCase
+
+
+class PrefixIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = dltl.PrefixIndex()
+        for task_id, name in enumerate(["water plants", "wash car", "walk", "water plants", "read"], 1):
+            self.index.add(name, task_id)
+
+    def test_fetch_named(self):
+        self.assertEqual(self.index.fetch_named("water plants"), [1, 4])
+        self.assertEqual(self.index.fetch_named("water"), [])
+
+    def test_fetch_with_prefix(self):
+        self.assertEqual(self.index.fetch_with_prefix("wa"),
+                         [("walk", 3), ("wash car", 2), ("water plants", 1), ("water plants", 4)])
+        self.assertEqual(self.index.fetch_with_prefix("wa", 2), [("walk", 3), ("wash car", 2)])
+        self.assertEqual(self.index.fetch_with_prefix("x"), [])
+
+    def test_count_with_prefix(self):
+        self.assertEqual(self.index.count_with_prefix("wa"), 4)
+        self.assertEqual(self.index.count_with_prefix("water"), 2)
+        self.assertEqual(self.index.count_with_prefix(""), 5)
+        self.assertEqual(self.index.count_with_prefix("z"), 0)
+
+    def test_remove(self):
+        self.index.remove("water plants", 1)
+        self.index.remove("water plants", 9)     # Not there, nothing happens
+        self.assertEqual(self.index.fetch_named("water plants"), [4])
+
+
+class NameAccessTest(ProgrammeTestCase):
+    """Tasks of the last displayed list can be accessed by their name or a unique prefix of it."""
+
+    def setUp(self):
+        super().setUp()
+        for name in ("water plants", "wash car", "read"):
+            self.create(name, "daily")
+        self.create("water plants", "weekly")
+        self.to_do()
+
+    def fetch(self, name):
+        return self.run_quietly(self.functions._fetch_from_ld, name.split())
+
+    def test_unique_prefix(self):
+        node, _ = self.fetch("wash")
+        self.assertEqual(node.name, "wash car")
+        node, _ = self.fetch("r")
+        self.assertEqual(node.name, "read")
+
+    def test_ambiguous_prefix(self):
+        node, printed = self.fetch("wa")
+        self.assertIsNone(node)
+        self.assertIn('Several tasks start with "wa"', printed)
+
+    def test_shared_name(self):
+        node, printed = self.fetch("water plants")
+        self.assertIsNone(node)
+        self.assertIn('2 tasks are named "water plants"', printed)
+
+    def test_unknown_name(self):
+        node, printed = self.fetch("cook")
+        self.assertIsNone(node)
+        self.assertIn("Task not found.", printed)
+
+    def test_completion(self):
+        self.assertEqual(self.functions.task_names_with_prefix("wa"), ["wash car", "water plants"])
+        self.assertEqual(self.functions.task_names_with_prefix("wa", 1), ["wash car"])
+
+
+if __name__ == "__main__":
+    unittest.main()
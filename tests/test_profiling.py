@@ -0,0 +1,25 @@
+import argparse
+import unittest
+
+from support import ProgrammeTestCase
+
+
+class OperationCountTest(ProgrammeTestCase):
+    """The list operations traced in dltl are counted towards the command that caused them."""
+
+    def test_traced_operations_are_counted_per_command(self):
+        functions = self.functions
+        self.command(functions.stats, enable=True, disable=False, reset=False, profile=None)
+        self.create("water plants", "daily")
+        self.to_do()
+        functions.profiling.reset()
+
+        self.run_quietly(functions.profiling.run, "finish", functions.finish,
+                         argparse.Namespace(target_task=["1"]))
+        operations = functions.profiling.summary()["finish"][6]
+        self.assertGreater(operations["list operations"], 0)
+        self.assertGreater(operations["glossary hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
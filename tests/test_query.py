@@ -0,0 +1,75 @@
+import unittest
+from datetime import date
+
+from support import ProgrammeTestCase, SimulatedDate
+
+
+class QueryTest(ProgrammeTestCase):
+    """The query command finds the candidates in the cheapest way it knows of, and its plan can be explained."""
+
+    def setUp(self):
+        super().setUp()
+        SimulatedDate.current = date(2024, 1, 1)
+        self.functions.config["last_refresh"] = SimulatedDate.current
+        self.create("water plants", "daily")
+        self.create("wash car", "weekly", "overdue")
+        self.create("read", "daily")
+        self.create("walk dog", "weekly")
+        self.to_do()
+        self.functions.input = lambda prompt="": "2024-01-05"
+        self.command(self.functions.set_asleep, target_task=["4"])
+
+    def query(self, *terms, limit=None):
+        return self.command(self.functions.query_tasks, terms=list(terms), limit=limit, explain=True)
+
+    def test_status_groups(self):
+        printed = self.query("status=due,overdue")
+        self.assertIn("Plan: reading the overdue and due task lists, estimated to visit 3 tasks.", printed)
+        self.assertIn("1)   wash car   (weekly, overdue)", printed)
+        self.assertIn("3)   read   (daily, due)", printed)
+
+    def test_explanation_does_not_depend_on_the_order_of_the_statuses(self):
+        for terms in ("status=due,overdue", "status=overdue,due", "status=due,overdue,due"):
+            _, plan, _, _ = self.functions._plan_query(self.functions._parse_query([terms]))
+            self.assertEqual(plan, "the overdue and due task lists")
+
+    def test_name_prefix(self):
+        printed = self.query("status=due,overdue", "name=wa*")
+        self.assertIn('Plan: reading the overdue and due tasks starting with "wa", estimated to visit 2 tasks.',
+                      printed)
+        self.assertIn("2)   water plants   (daily, due)", printed)
+        self.assertNotIn("3)", printed)
+
+    def test_sleepers_by_wake_up_date(self):
+        printed = self.query("status=asleep", "until<=+7")
+        self.assertIn("Plan: reading the sleepers, ordered by their wake-up date", printed)
+        self.assertIn("1)   walk dog   (weekly, asleep, until 2024-01-05)", printed)
+        self.assertIn("No tasks to display.", self.query("status=asleep", "until<=+3"))
+
+    def test_frequency_lists(self):
+        printed = self.query("freq=daily")
+        self.assertIn("Plan: reading 1 frequency list(s), estimated to visit 2 tasks.", printed)
+        self.assertIn("2)   read   (daily, due)", printed)
+
+    def test_unloaded_lists_cost_more(self):
+        self.run_quietly(self.functions.save_changes, "test")
+        functions = self.restart()
+        cost, plan, _, _ = functions._plan_query(functions._parse_query(["freq=weekly"]))
+        self.assertEqual(plan, "1 frequency list(s)")
+        self.assertEqual(cost, functions._UNLOADED_LIST_COST + 2)
+        self.assertNotIn(functions.WEEKLY, functions.in_memory)      # Planning alone loads nothing
+
+    def test_found_tasks_can_be_accessed(self):
+        functions = self.functions
+        self.query("status=due,overdue", "name=wa*")
+        self.command(functions.finish, target_task=["2"])
+        self.assertEqual(functions.finished_today.fetch_nodes_named("water plants")[0].name, "water plants")
+
+    def test_invalid_term(self):
+        printed = self.query("bogus")
+        self.assertIn('Error: Did not understand the query term "bogus". Aborting process.', printed)
+        self.assertIn('is not a valid range of dates', self.query("freq=02-01..daily"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import unittest
+from datetime import date, timedelta
+
+from support import ProgrammeTestCase, SimulatedDate
+
+
+class TierTest(ProgrammeTestCase):
+    """Rarely used lists are stored in the cold tier, promoted to the hot one once used and demoted when unused."""
+
+    def setUp(self):
+        super().setUp()
+        SimulatedDate.current = date(2024, 1, 1)
+        self.functions.config["last_refresh"] = SimulatedDate.current
+        self.create("renew passport", "yearly")
+        self.create("water plants", "daily")
+        self.run_quietly(self.functions.save_changes, "test")
+        self.functions = self.restart(reload_storage=True)
+
+    def tier(self):
+        return self.functions.storage.tier_of("yearly")
+
+    def test_new_rarely_used_list_is_cold(self):
+        storage = self.functions.storage
+        self.assertEqual(self.tier(), storage.COLD)
+        self.assertEqual(storage.tier_of("daily"), storage.HOT)
+        self.assertTrue(os.path.exists("yearly.pkl.z"))
+
+    def test_used_list_is_promoted(self):
+        functions = self.functions
+        self.run_quietly(functions.display_list, "yearly", "all")
+        self.assertEqual(self.tier(), functions.storage.HOT)
+        self.assertTrue(os.path.exists("yearly.pkl"))
+        self.assertFalse(os.path.exists("yearly.pkl.z"))
+
+        self.command(functions.renew, target_task=["1"])      # A change keeps it hot
+        self.run_quietly(functions.save_changes, "test")
+        functions = self.restart(reload_storage=True)
+        self.assertEqual(self.tier(), functions.storage.HOT)
+        self.assertEqual(functions.storage.load("yearly").size, 1)
+
+    def test_walk_over_all_lists_does_not_promote(self):
+        functions = self.functions
+        self.run_quietly(functions._display_all, False, 0, 10)
+        self.assertIn(functions.YEARLY, functions.in_memory)
+        self.assertEqual(self.tier(), functions.storage.COLD)
+
+    def test_on_demand_load_is_summed_up(self):
+        functions = self.functions
+        before = functions.storage.io_totals()
+        self.assertIsNone(functions.load_summary(before))
+        functions._pull_file(functions.YEARLY, promote=False)
+        self.assertRegex(functions.load_summary(before), r"^Loaded 1 files \(\d+\.\d KiB\) in \d+\.\d ms\.$")
+
+    def test_unused_list_is_demoted_by_refresh(self):
+        functions = self.functions
+        self.run_quietly(functions.display_list, "yearly", "all")
+        functions = self.restart(reload_storage=True)
+        self.assertEqual(self.tier(), functions.storage.HOT)
+
+        SimulatedDate.current += timedelta(1)
+        self.run_quietly(functions.refresh_to_do, "test")
+        self.assertEqual(self.tier(), functions.storage.COLD)
+        self.assertFalse(os.path.exists("yearly.pkl"))
+        functions = self.restart(reload_storage=True)
+        self.assertEqual(functions._pull_file(functions.YEARLY, promote=False).size, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import importlib
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from time import perf_counter
+
+try:
+    import resource     # Not available on every platform, the peak memory is not reported then
+except ImportError:
+    resource = None
+
+PHASES = ("startup", "refresh", "to_do", "finish", "sleep", "save")
+
+
+class _SimulatedDate(date):
+    """Stands in for datetime.date inside functions.py, so that date.today() returns the simulated day."""
+    current = None      # Not "day", which would hide the attribute of the dates
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+class _IOTotals:
+    """Sums up the I/O statistics kept by storage.py over the sessions (reloading storage.py resets them)."""
+
+    def __init__(self):
+        self.totals = [0, 0, 0.0, 0, 0, 0.0, 0.0]
+
+    def collect(self, storage):
+        self.totals = [a + b for a, b in zip(self.totals, storage.io_totals())]
+        storage.io_stats.clear()
+
+
+def _frequencies(rng, functions):
+    """Returns a function choosing a random task frequency: a category (ordinary, week, months, seasons, intervals or
+    dates) is chosen first, then a frequency within it."""
+    categories = [list(functions.ordinary.values()), list(functions.week.values()), list(functions.months.values()),
+                  list(functions.seasons.values())]
+
+    def choose():
+        category = rng.randrange(len(categories) + 2)
+        if category == len(categories):
+            return f'every_{rng.randint(2, 30)}_days'
+        if category == len(categories) + 1:
+            day = date(2020, 1, 1) + timedelta(rng.randrange(366))     # A leap year, so 02-29 is included
+            return f'{day.month:02}-{day.day:02}'
+        return rng.choice(categories[category])
+    return choose
+
+
+def _session(io, reload):
+    """Starts a session of the programme in the current directory, as if main.py was launched. With 'reload', the
+    storage and functions modules are reloaded, so that everything is read from the disk again."""
+    storage = importlib.import_module("storage")
+    if reload:
+        io.collect(storage)
+        importlib.reload(storage)
+    if "functions" in sys.modules and reload:
+        functions = importlib.reload(sys.modules["functions"])
+    else:
+        functions = importlib.import_module("functions")
+    functions.date = _SimulatedDate
+    return functions
+
+
+def _timed(timings, phase, function, *args):
+    start = perf_counter()
+    result = function(*args)
+    timings[phase].append(perf_counter() - start)
+    return result
+
+
+def _sample_positions(rng, functions, rate):
+    """Returns a random sample of the positions of the last displayed list, as the words the user would type."""
+    size = len(functions.last_displayed) if functions.ld_origin == "to_do" else 0
+    count = sum(rng.random() < rate for _ in range(size))
+    return [str(position) for position in sorted(rng.sample(range(1, size + 1), count))]
+
+
+def run(tasks, days, start, seed, finish_rate, sleep_rate, restart):
+    """Creates the tasks on the day before 'start', then replays 'days' days of use. Returns the timings of each
+    phase ({phase: [seconds]}) and the I/O totals. Has to be called in an empty directory."""
+    rng = random.Random(seed)
+    io = _IOTotals()
+    timings = {phase: [] for phase in PHASES}
+    answers = []        # The answers to the questions asked by set_asleep
+    no_paging = argparse.Namespace(offset=0, limit=None, top=None, tags=None)
+
+    _SimulatedDate.current = start - timedelta(1)
+    functions = _timed(timings, "startup", _session, io, False)
+    functions.input = lambda prompt="": answers.pop(0)
+    functions.config["last_refresh"] = _SimulatedDate.current
+    choose = _frequencies(rng, functions)
+    creation = perf_counter()
+    for i in range(tasks):
+        functions.create_task(f'task {i}', choose())
+    creation = perf_counter() - creation
+    functions.save_changes("workload")
+
+    for day in range(days):
+        _SimulatedDate.current = start + timedelta(day)
+        if restart and day > 0:
+            functions = _timed(timings, "startup", _session, io, True)
+
+        _timed(timings, "refresh", functions.refresh_to_do, "workload")
+        _timed(timings, "to_do", functions.to_do, no_paging)
+        if positions := _sample_positions(rng, functions, finish_rate):
+            _timed(timings, "finish", functions.finish, argparse.Namespace(target_task=positions))
+            _timed(timings, "to_do", functions.to_do, no_paging)
+        if positions := _sample_positions(rng, functions, sleep_rate):
+            answers += ["days", str(rng.randint(1, 14))]
+            _timed(timings, "sleep", functions.set_asleep, argparse.Namespace(target_task=positions))
+        _timed(timings, "save", functions.save_changes, "workload")
+    io.collect(functions.storage)
+    return creation, timings, io
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _peak_memory():
+    """Returns the peak resident set size of the process in MiB, or None if it cannot be measured here."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024     # Bytes on macOS, KiB elsewhere
+
+
+def report(tasks, days, creation, timings, io, disk):
+    print(f'{tasks} tasks created in {creation:.2f} s, {days} days replayed.')
+    print()
+    print(f'{"phase":<10}{"calls":>7}{"total s":>10}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}')
+    for phase, seconds in timings.items():
+        if not seconds:
+            continue
+        ordered = sorted(seconds)
+        print(f'{phase:<10}{len(ordered):>7}{sum(ordered):>10.2f}{sum(ordered) / len(ordered) * 1000:>10.2f}'
+              f'{_percentile(ordered, 0.5) * 1000:>10.2f}{_percentile(ordered, 0.95) * 1000:>10.2f}'
+              f'{ordered[-1] * 1000:>10.2f}')
+    print()
+    reads, read_size, read_time, writes, written_size, write_time, synced = io.totals
+    print(f'Read {reads} files ({read_size / 1024 ** 2:.2f} MiB, {read_time:.2f} s), wrote {writes} files '
+          f'({written_size / 1024 ** 2:.2f} MiB, {write_time:.2f} s, {synced:.2f} s of which in fsync). '
+          f'{disk / 1024:.1f} KiB on the disk at the end.')
+    peak = _peak_memory()
+    print("Peak memory: unavailable on this platform." if peak is None else f'Peak memory (RSS): {peak:.1f} MiB.')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of TO-DO-IQ over a synthetic year. Creates "
+                                                 "tasks of all kinds of frequencies in a temporary directory, then "
+                                                 "replays a day of use (refresh, to-do, finishing, sleeping, saving) "
+                                                 "for every day of the year.")
+    parser.add_argument("--tasks", "-n", type=int, default=1000, help="The number of tasks. (Default = 1000)")
+    parser.add_argument("--days", type=int, default=365, help="The number of days to replay. (Default = 365)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1),
+                        help="The first replayed day, YYYY-MM-DD. (Default = 2024-01-01)")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random choices. (Default = 0)")
+    parser.add_argument("--finish-rate", type=float, default=0.5, help="The chance of each task on the agenda "
+                                                                       "being finished on a day. (Default = 0.5)")
+    parser.add_argument("--sleep-rate", type=float, default=0.02, help="The chance of each remaining task on the "
+                                                                       "agenda being set asleep. (Default = 0.02)")
+    parser.add_argument("--one-session", action="store_true", help="Keeps the programme running for the whole "
+                                                                   "year, instead of restarting it every day.")
+    namespace = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))      # The directory is changed below
+    origin = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="to-do-iq-workload-") as directory:
+        os.chdir(directory)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                creation, timings, io = run(namespace.tasks, namespace.days, namespace.start, namespace.seed,
+                                            namespace.finish_rate, namespace.sleep_rate, not namespace.one_session)
+            disk = sum(os.path.getsize(name) for name in os.listdir("."))
+        finally:
+            os.chdir(origin)
+    report(namespace.tasks, namespace.days, creation, timings, io, disk)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())